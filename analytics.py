@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Rolling trend analytics over the daily metrics.
+
+For every metric in the MetricsStore this keeps, per logged day:
+
+- 7/14/30-day simple moving averages over calendar days (the logged values
+  dated within the last N days, so gaps such as an unlogged day shrink the
+  sample instead of shifting the window), read in O(1) from the metric's
+  prefix sums;
+- an exponentially weighted trend (the "trend weight" of the Hacker's Diet,
+  alpha = 0.1 per day). Days without a value carry the trend, and the next
+  value is weighted as if one daily step had passed for every calendar day
+  since the last logged value.
+
+Both are stored as float64 arrays aligned with the metrics store and
+maintained the same way: a new store copies the arrays up to the first
+changed day and re-fills the tail, so stores held by older dataset
+snapshots are never modified. Appending a day computes one new value per
+metric (the window start only moves forward), with no rescan of the
+history.
+"""
+
+import threading
+from array import array
+from bisect import bisect_left
+from datetime import date
+from typing import Dict, List, Optional
+
+from metrics_store import METRICS, NAN
+
+SMA_WINDOWS = (7, 14, 30)
+EWMA_ALPHA = 0.1
+
+# Names accepted where a single trend is selected (e.g. /api/series?trend=)
+TREND_KINDS = tuple(f'sma{n}' for n in SMA_WINDOWS) + ('ewma',)
+
+
+def _clean(value: float, digits: int = 2) -> Optional[float]:
+    return None if value != value else round(value, digits)
+
+
+class TrendStore:
+    """Per-day SMA and EWMA columns for every metric, aligned with a MetricsStore"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.ordinals = array('q')
+        # Position of the first day inside each window, per day (depends only on dates)
+        self._starts: Dict[int, array] = {n: array('q') for n in SMA_WINDOWS}
+        self.sma: Dict[str, Dict[int, array]] = {
+            name: {n: array('d') for n in SMA_WINDOWS} for name in METRICS
+        }
+        self.ewma: Dict[str, array] = {name: array('d') for name in METRICS}
+        # Position of the latest day at or before each day that logged the metric (-1 = none)
+        self._last_logged: Dict[str, array] = {name: array('q') for name in METRICS}
+
+    def __len__(self) -> int:
+        return len(self.ordinals)
+
+    def updated(self, store, first_changed: Optional[int]) -> 'TrendStore':
+        """Trends re-filled from `first_changed` onwards for `store`, the MetricsStore updated from this one's
+
+        Returns a new TrendStore (self when nothing changed); the days before
+        `first_changed` are copied, so this one is left as it was.
+        """
+        if first_changed is None:
+            return self
+        trends = TrendStore()
+        with self._lock:
+            trends.ordinals = self.ordinals[:first_changed]
+            for n in SMA_WINDOWS:
+                trends._starts[n] = self._starts[n][:first_changed]
+            for name in METRICS:
+                trends.sma[name] = {n: column[:first_changed] for n, column in self.sma[name].items()}
+                trends.ewma[name] = self.ewma[name][:first_changed]
+                trends._last_logged[name] = self._last_logged[name][:first_changed]
+        first_changed = len(trends.ordinals)
+        # Not published yet, and `store` is never modified: no locks needed to fill it
+        trends._fill_from(store, first_changed)
+        return trends
+
+    def _fill_from(self, store, first_changed: int):
+        for date_str in store.dates[first_changed:]:
+            try:
+                ordinal = date.fromisoformat(date_str).toordinal()
+            except (TypeError, ValueError):
+                ordinal = 0
+            # Keep ordinals non-decreasing so window starts stay valid
+            if self.ordinals:
+                ordinal = max(ordinal, self.ordinals[-1])
+            self.ordinals.append(ordinal)
+
+        size = len(self.ordinals)
+        for n in SMA_WINDOWS:
+            starts = self._starts[n]
+            for i in range(first_changed, size):
+                cutoff = self.ordinals[i] - n + 1
+                if i == first_changed:
+                    start = bisect_left(self.ordinals, cutoff, 0, i + 1)
+                else:
+                    start = starts[-1]
+                    while self.ordinals[start] < cutoff:
+                        start += 1
+                starts.append(start)
+
+        for name in METRICS:
+            self._fill(name, store, first_changed, size)
+
+    def _fill(self, name: str, store, first: int, size: int):
+        values = store.columns[name]
+        prefix_sum = store.prefix_sum[name]
+        prefix_count = store.prefix_count[name]
+        for n, column in self.sma[name].items():
+            starts = self._starts[n]
+            for i in range(first, size):
+                start = starts[i]
+                count = prefix_count[i + 1] - prefix_count[start]
+                column.append((prefix_sum[i + 1] - prefix_sum[start]) / count if count else NAN)
+
+        ewma = self.ewma[name]
+        last_logged = self._last_logged[name]
+        decay = 1 - EWMA_ALPHA
+        for i in range(first, size):
+            value = values[i]
+            previous = ewma[i - 1] if i else NAN
+            last = last_logged[i - 1] if i else -1
+            if not value > 0:
+                ewma.append(previous)
+                last_logged.append(last)
+                continue
+            if last < 0:
+                ewma.append(value)
+            else:
+                # Every calendar day since the last logged value counts as a step
+                gap = max(1, self.ordinals[i] - self.ordinals[last])
+                ewma.append(previous + (1 - decay ** gap) * (value - previous))
+            last_logged.append(i)
+
+    def column(self, name: str, kind: str) -> array:
+        """The per-day column of one trend kind (sma7, sma14, sma30 or ewma)"""
+        if kind == 'ewma':
+            return self.ewma[name]
+        return self.sma[name][int(kind[3:])]
+
+    def at(self, name: str, position: int) -> Dict[str, Optional[float]]:
+        """{sma7, sma14, sma30, ewma} of a metric as of day `position` (None when unknown)"""
+        with self._lock:
+            if not 0 <= position < len(self.ordinals):
+                return {kind: None for kind in TREND_KINDS}
+            return {kind: _clean(self.column(name, kind)[position]) for kind in TREND_KINDS}
+
+    def values(self, name: str, kind: str, start: int = 0, stop: Optional[int] = None) -> List[Optional[float]]:
+        """One trend of a metric for days [start, stop), None where unknown"""
+        with self._lock:
+            return [_clean(value) for value in self.column(name, kind)[start:stop]]
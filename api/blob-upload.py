@@ -1,10 +1,17 @@
 from http.server import BaseHTTPRequestHandler
 import json
 import os
+import sys
+from pathlib import Path
+
+# Shared streaming upload client (blob_store.py) lives in the parent directory
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import blob_store
 
 class handler(BaseHTTPRequestHandler):
     def do_POST(self):
-        """Handle file upload to Vercel Blob"""
+        """Handle file upload to Vercel Blob (streamed in chunks, duplicates skipped)"""
         try:
             # Get content length
             content_length = int(self.headers.get('Content-Length', 0))
@@ -12,9 +19,6 @@ class handler(BaseHTTPRequestHandler):
                 self._send_json_response(400, {'error': 'No file data'})
                 return
             
-            # Read file data
-            file_data = self.rfile.read(content_length)
-            
             # Get blob token
             blob_token = os.getenv('BLOB_READ_WRITE_TOKEN')
             if not blob_token:
@@ -24,34 +28,28 @@ class handler(BaseHTTPRequestHandler):
             # Get filename from headers
             filename = self.headers.get('X-Filename') or self.headers.get('x-filename', 'upload.jpg')
             
-            # Import requests
+            # Hash the body while spooling it off the socket, never all in memory
             try:
-                import requests
-            except ImportError:
-                self._send_json_response(500, {'error': 'requests library not available'})
+                upload = blob_store.spool(self.rfile, length=content_length)
+            except blob_store.UploadTooLarge as e:
+                self.close_connection = True
+                self._send_json_response(413, {'error': str(e)})
                 return
             
-            # Upload to Vercel Blob using PUT
-            response = requests.put(
-                f'https://blob.vercel-storage.com/{filename}',
-                data=file_data,
-                headers={
-                    'Authorization': f'Bearer {blob_token}',
-                    'Content-Type': self.headers.get('Content-Type', 'image/jpeg')
-                },
-                params={'access': 'public'},
-                timeout=30
-            )
+            try:
+                result = blob_store.store(blob_token).upload_photo(
+                    upload, filename, self.headers.get('Content-Type', 'image/jpeg'))
+            except blob_store.BlobError as e:
+                self._send_json_response(502, {'error': f'Upload failed: {e}'})
+                return
+            finally:
+                upload.close()
             
-            if response.status_code == 200:
-                result = response.json()
-                blob_url = result.get('url') or result.get('downloadUrl') or f'https://blob.vercel-storage.com/{filename}'
-                self._send_json_response(200, {'success': True, 'url': blob_url})
-            else:
-                error_text = response.text
-                self._send_json_response(response.status_code, {
-                    'error': f'Upload failed: {response.status_code} - {error_text}'
-                })
+            self._send_json_response(200, {
+                'success': True,
+                'url': result['url'],
+                'duplicate': result['duplicate'],
+            })
                 
         except Exception as e:
             self._send_json_response(500, {'error': str(e)})
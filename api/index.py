@@ -2,11 +2,20 @@
 """
 Vercel serverless function entry point for Flask app
 Using BaseHTTPRequestHandler pattern that works on Vercel
+
+The handler is a streaming WSGI bridge: the request body is handed to Flask
+as a reader that pulls bounded chunks from the socket (Content-Length or
+chunked transfer encoding), and the response iterable is written out as it
+is produced - with the app's Content-Length when it sets one, chunked
+otherwise. Neither side is ever held in memory as a whole, so photo uploads
+and large JSON responses don't double the function's footprint.
 """
 import sys
 import os
+import json
 from pathlib import Path
 from http.server import BaseHTTPRequestHandler
+from urllib.parse import unquote_to_bytes
 
 # Add parent directory to path to import app
 current_dir = Path(__file__).parent
@@ -16,13 +25,17 @@ sys.path.insert(0, str(parent_dir))
 # Change to parent directory so relative paths work
 os.chdir(str(parent_dir))
 
+# Serverless cold starts: quiet ingest logging, precompiled templates
+# (see cold_start.py). Set COLD_START_MODE=0 for the full diagnostics.
+os.environ.setdefault('COLD_START_MODE', '1')
+
 # Debug: Log paths for troubleshooting
-import sys
-sys.stderr.write(f"api/index.py: current_dir = {current_dir}\n")
-sys.stderr.write(f"api/index.py: parent_dir = {parent_dir}\n")
-sys.stderr.write(f"api/index.py: cwd = {os.getcwd()}\n")
-sys.stderr.write(f"api/index.py: public/data exists = {(parent_dir / 'public' / 'data').exists()}\n")
-sys.stderr.flush()
+if os.environ['COLD_START_MODE'] != '1':
+    sys.stderr.write(f"api/index.py: current_dir = {current_dir}\n")
+    sys.stderr.write(f"api/index.py: parent_dir = {parent_dir}\n")
+    sys.stderr.write(f"api/index.py: cwd = {os.getcwd()}\n")
+    sys.stderr.write(f"api/index.py: public/data exists = {(parent_dir / 'public' / 'data').exists()}\n")
+    sys.stderr.flush()
 
 # Import Flask app
 try:
@@ -30,16 +43,123 @@ try:
 except Exception as e:
     # If import fails, create minimal error handler
     from flask import Flask, jsonify
+    import_error = str(e)
     app = Flask(__name__)
     @app.route('/<path:path>')
     @app.route('/')
     def error_handler(path=''):
-        return jsonify({'error': f'App import failed: {str(e)}', 'path': path}), 500
+        return jsonify({'error': f'App import failed: {import_error}', 'path': path}), 500
+
+# Largest read from the socket at once
+CHUNK_SIZE = 64 * 1024
+
+# Statuses that never carry a body (RFC 9110)
+NO_BODY_STATUSES = {204, 304}
+
+
+class RequestBodyReader:
+    """wsgi.input over the request socket, never reading past the body
+
+    With a Content-Length the body is that many bytes; with chunked transfer
+    encoding the chunks are decoded as they are read and the end of the body
+    reads as EOF (wsgi.input_terminated). Each socket read is at most
+    CHUNK_SIZE bytes, whatever size the caller asks for.
+    """
+
+    def __init__(self, rfile, content_length=None, chunked=False):
+        self._rfile = rfile
+        self._chunked = chunked
+        # Bytes left in the body (Content-Length) or in the current chunk (chunked)
+        self._remaining = 0 if chunked else max(content_length or 0, 0)
+        self._done = not chunked and self._remaining == 0
+        self._buffer = b''
+
+    @property
+    def exhausted(self):
+        return self._done and not self._buffer
+
+    def _next_chunk(self):
+        """Start the next chunk of a chunked body; False at the last chunk"""
+        line = self._rfile.readline(CHUNK_SIZE)
+        if self._remaining == 0 and line in (b'\r\n', b'\n'):
+            # CRLF closing the previous chunk's data
+            line = self._rfile.readline(CHUNK_SIZE)
+        try:
+            size = int(line.split(b';', 1)[0].strip(), 16)
+        except ValueError:
+            raise ValueError(f"invalid chunk size line: {line[:40]!r}")
+        if size == 0:
+            # Skip trailers up to the blank line
+            line = self._rfile.readline(CHUNK_SIZE)
+            while line not in (b'\r\n', b'\n', b''):
+                line = self._rfile.readline(CHUNK_SIZE)
+            return False
+        self._remaining = size
+        return True
+
+    def _fill(self, wanted):
+        """Read up to min(wanted, CHUNK_SIZE) more body bytes into the buffer"""
+        if self._done:
+            return
+        if self._remaining == 0:
+            if not self._chunked or not self._next_chunk():
+                self._done = True
+                return
+        data = self._rfile.read(min(wanted, self._remaining, CHUNK_SIZE))
+        if not data:
+            # Client went away mid-body
+            self._done = True
+            return
+        self._remaining -= len(data)
+        if not self._chunked and self._remaining == 0:
+            self._done = True
+        self._buffer += data
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            parts = [self._buffer]
+            self._buffer = b''
+            while not self._done:
+                self._fill(CHUNK_SIZE)
+                parts.append(self._buffer)
+                self._buffer = b''
+            return b''.join(parts)
+        while len(self._buffer) < size and not self._done:
+            self._fill(size - len(self._buffer))
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+    def readline(self, size=-1):
+        limit = size if size is not None and size >= 0 else None
+        while b'\n' not in self._buffer and not self._done and (limit is None or len(self._buffer) < limit):
+            self._fill(CHUNK_SIZE)
+        end = self._buffer.find(b'\n') + 1 or len(self._buffer)
+        if limit is not None:
+            end = min(end, limit)
+        line, self._buffer = self._buffer[:end], self._buffer[end:]
+        return line
+
+    def readlines(self, hint=-1):
+        return list(self)
+
+    def __iter__(self):
+        while True:
+            line = self.readline()
+            if not line:
+                return
+            yield line
+
 
 class handler(BaseHTTPRequestHandler):
+    # HTTP/1.1 so responses without a Content-Length can be sent chunked
+    protocol_version = 'HTTP/1.1'
+
     def do_GET(self):
         self._handle_request()
     
+    def do_HEAD(self):
+        self._handle_request()
+    
     def do_POST(self):
         self._handle_request()
     
@@ -52,88 +172,148 @@ class handler(BaseHTTPRequestHandler):
     def do_PATCH(self):
         self._handle_request()
     
-    def _handle_request(self):
-        try:
-            # Parse path and query string
-            path_parts = self.path.split('?', 1)
-            path = path_parts[0]
-            query_string = path_parts[1] if len(path_parts) > 1 else ''
-            
-            # On Vercel, static files in public/ should be served automatically
-            # But if they reach here (shouldn't happen), let Flask serve them
-            # Flask's static_folder is set to 'public/static' so it can serve them
-            
-            # Read request body if present
-            content_length = int(self.headers.get('Content-Length', 0))
-            body = self.rfile.read(content_length) if content_length > 0 else b''
-            
-            # Convert Vercel's request to WSGI environment
-            environ = {
-                'REQUEST_METHOD': self.command,
-                'PATH_INFO': path,
-                'QUERY_STRING': query_string,
-                'SERVER_NAME': 'localhost',
-                'SERVER_PORT': '80',
-                'wsgi.version': (1, 0),
-                'wsgi.url_scheme': 'https',
-                'wsgi.input': type('obj', (object,), {
-                    'read': lambda size=-1: body[:size] if size > 0 else body,
-                    'readline': lambda: b'',
-                })(),
-                'wsgi.errors': sys.stderr,
-                'wsgi.multithread': False,
-                'wsgi.multiprocess': False,
-                'wsgi.run_once': False,
-            }
-            
-            # Add headers to environ
-            for header, value in self.headers.items():
-                key = 'HTTP_' + header.upper().replace('-', '_')
+    def _environ(self, body):
+        """WSGI environ for the current request (PEP 3333)"""
+        path, _, query_string = self.path.partition('?')
+        host = self.headers.get('Host', 'localhost')
+        server_name, _, server_port = host.partition(':')
+        scheme = self.headers.get('X-Forwarded-Proto', 'https').split(',')[0].strip()
+        environ = {
+            'REQUEST_METHOD': self.command,
+            'SCRIPT_NAME': '',
+            # Percent-decoded, as bytes carried in a latin-1 str
+            'PATH_INFO': unquote_to_bytes(path).decode('latin-1'),
+            'QUERY_STRING': query_string,
+            'SERVER_NAME': server_name or 'localhost',
+            'SERVER_PORT': server_port or ('443' if scheme == 'https' else '80'),
+            'SERVER_PROTOCOL': self.request_version,
+            'REMOTE_ADDR': self.client_address[0] if self.client_address else '',
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': scheme,
+            'wsgi.input': body,
+            # Chunked bodies have no length; reading to EOF is safe
+            'wsgi.input_terminated': True,
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': False,
+            'wsgi.multiprocess': False,
+            'wsgi.run_once': False,
+        }
+        
+        # Add headers to environ
+        for header, value in self.headers.items():
+            key = header.upper().replace('-', '_')
+            if key in ('CONTENT_LENGTH', 'CONTENT_TYPE'):
                 environ[key] = value
-            
-            # Add Content-Length if present
-            if 'Content-Length' in self.headers:
-                environ['CONTENT_LENGTH'] = self.headers['Content-Length']
-            
-            # Add Content-Type if present
-            if 'Content-Type' in self.headers:
-                environ['CONTENT_TYPE'] = self.headers['Content-Type']
-            
-            # Call Flask app
-            response_status = []
-            response_headers = []
-            
-            def start_response(status, headers):
-                response_status.append(status)
-                response_headers.extend(headers)
-            
-            # Get response from Flask
-            response = app(environ, start_response)
-            
-            # Parse status code
-            status_code = int(response_status[0].split()[0]) if response_status else 200
-            
-            # Send response
-            self.send_response(status_code)
-            
-            # Send headers
-            for header, value in response_headers:
+            else:
+                key = 'HTTP_' + key
+                # Repeated headers are joined, as CGI does
+                environ[key] = f"{environ[key]},{value}" if key in environ else value
+        environ.pop('HTTP_TRANSFER_ENCODING', None)
+        return environ
+    
+    def _handle_request(self):
+        state = {'status': None, 'headers': None, 'sent': False, 'chunked': False}
+        
+        def start_response(status, headers, exc_info=None):
+            if exc_info:
+                try:
+                    if state['sent']:
+                        # Too late to change the status - let the error propagate
+                        raise exc_info[1].with_traceback(exc_info[2])
+                finally:
+                    exc_info = None
+            elif state['status'] is not None:
+                raise AssertionError("start_response called twice without exc_info")
+            state['status'] = status
+            state['headers'] = headers
+            return write
+        
+        def send_headers():
+            status_code = int(state['status'].split()[0])
+            self.send_response(status_code, state['status'].partition(' ')[2] or None)
+            has_length = False
+            for header, value in state['headers']:
+                name = header.lower()
+                if name in ('transfer-encoding', 'connection'):
+                    # Hop-by-hop: framing is decided here
+                    continue
+                if name == 'content-length':
+                    has_length = True
                 self.send_header(header, value)
+            can_have_body = (self.command != 'HEAD' and status_code >= 200
+                             and status_code not in NO_BODY_STATUSES)
+            if not has_length and can_have_body:
+                if self.request_version >= 'HTTP/1.1':
+                    self.send_header('Transfer-Encoding', 'chunked')
+                    state['chunked'] = True
+                else:
+                    # HTTP/1.0 client: the end of the body is the end of the connection
+                    self.close_connection = True
+            if self.close_connection:
+                self.send_header('Connection', 'close')
             self.end_headers()
+            state['sent'] = True
+        
+        def write(data):
+            if not state['sent']:
+                send_headers()
+            if not data or self.command == 'HEAD':
+                return
+            if state['chunked']:
+                self.wfile.write(f"{len(data):X}\r\n".encode('ascii') + data + b"\r\n")
+            else:
+                self.wfile.write(data)
+        
+        chunked = 'chunked' in self.headers.get('Transfer-Encoding', '').lower()
+        content_length = self.headers.get('Content-Length')
+        try:
+            content_length = int(content_length) if content_length and not chunked else 0
+            if content_length < 0:
+                raise ValueError
+        except ValueError:
+            # Unparseable framing: the rest of the connection can't be trusted either
+            self.close_connection = True
+            self._send_error_json(400, f"Invalid Content-Length: {content_length!r}")
+            return
+        
+        result = None
+        try:
+            body = RequestBodyReader(self.rfile, content_length=content_length, chunked=chunked)
             
-            # Send body
-            for chunk in response:
-                if isinstance(chunk, bytes):
-                    self.wfile.write(chunk)
-                else:
-                    self.wfile.write(chunk.encode('utf-8'))
+            # Get response from Flask, sending each piece as it is produced
+            result = app(self._environ(body), start_response)
+            for chunk in result:
+                if chunk:
+                    write(chunk if isinstance(chunk, bytes) else chunk.encode('utf-8'))
+            if not state['sent']:
+                # Empty body: headers still go out
+                send_headers()
+            if state['chunked']:
+                self.wfile.write(b"0\r\n\r\n")
+            self.wfile.flush()
+            
+            if not body.exhausted:
+                # The app left part of the body unread; don't parse it as the next request
+                self.close_connection = True
         except Exception as e:
             # Error handling
             import traceback
             error_msg = f"Error handling request: {str(e)}\n{traceback.format_exc()}"
             sys.stderr.write(error_msg)
             sys.stderr.flush()
-            self.send_response(500)
-            self.send_header('Content-Type', 'application/json')
-            self.end_headers()
-            self.wfile.write(json.dumps({'error': str(e)}).encode())
+            self.close_connection = True
+            if not state['sent']:
+                self._send_error_json(500, str(e))
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+    
+    def _send_error_json(self, status_code, message):
+        """JSON error response that also closes the connection"""
+        payload = json.dumps({'error': message}).encode()
+        self.send_response(status_code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.wfile.write(payload)
@@ -1,27 +1,71 @@
 from http.server import BaseHTTPRequestHandler
 import json
 import os
+import sys
+from pathlib import Path
+
+# Shared Blob client (blob_store.py) lives in the parent directory
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import blob_store
 
 class handler(BaseHTTPRequestHandler):
-    def do_GET(self):
-        """Generate upload token for client-side upload"""
+    def do_POST(self):
+        """Generate a scoped, short-lived upload token for one client-side upload
+
+        Body: {filename, contentType, size, sha256 (optional)}. The token only
+        allows a PUT of the returned pathname, of that size and content type,
+        for a minute; the read-write token never leaves the server.
+        """
         blob_token = os.getenv('BLOB_READ_WRITE_TOKEN')
-        
+
         if not blob_token:
-            self.send_response(500)
-            self.send_header('Content-Type', 'application/json')
-            self.end_headers()
-            self.wfile.write(json.dumps({
-                'error': 'BLOB_READ_WRITE_TOKEN not set'
-            }).encode())
+            self._send_json_response(500, {'error': 'BLOB_READ_WRITE_TOKEN not set'})
+            return
+
+        try:
+            content_length = int(self.headers.get('Content-Length', 0))
+            body = json.loads(self.rfile.read(content_length) or b'{}') if content_length else {}
+            if not isinstance(body, dict):
+                raise ValueError('expected a JSON object')
+        except ValueError as e:
+            self._send_json_response(400, {'error': f'Invalid request body: {e}'})
+            return
+
+        scheme = self.headers.get('X-Forwarded-Proto', 'https').split(',')[0].strip()
+        callback_url = (os.getenv('UPLOAD_CALLBACK_URL')
+                        or f"{scheme}://{self.headers.get('Host')}/api/upload-complete")
+        try:
+            grant = blob_store.store(blob_token).grant_upload(
+                body.get('filename'),
+                body.get('contentType'),
+                body.get('size'),
+                sha256=body.get('sha256'),
+                callback_url=callback_url,
+            )
+        except blob_store.UploadTooLarge as e:
+            self._send_json_response(413, {'error': str(e)})
+            return
+        except ValueError as e:
+            self._send_json_response(400, {'error': str(e)})
             return
-        
-        # Return token for client-side upload
-        self.send_response(200)
+        except Exception as e:
+            self._send_json_response(500, {'error': str(e)})
+            return
+
+        self._send_json_response(200, {'success': True, **grant})
+
+    def do_GET(self):
+        """The raw read-write token is no longer handed out"""
+        self._send_json_response(405, {'error': 'POST {filename, contentType, size} to get an upload token'})
+
+    def _send_json_response(self, status_code, data):
+        """Helper to send JSON response"""
+        body = json.dumps(data).encode()
+        self.send_response(status_code)
         self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-store')
         self.send_header('Access-Control-Allow-Origin', '*')
         self.end_headers()
-        self.wfile.write(json.dumps({
-            'token': blob_token
-        }).encode())
-
+        self.wfile.write(body)
@@ -4,16 +4,38 @@ Transformation Log Web App with Grok Integration
 Flask web application to visualize transformation progress and get AI advice
 """
 
-from flask import Flask, render_template, jsonify, request, session, redirect, url_for, send_from_directory
+from flask import Flask, render_template, jsonify, request, session, redirect, url_for, send_from_directory, g
+from flask.json.provider import DefaultJSONProvider
 import re
 import json
-from datetime import datetime, timedelta
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Dict, List, Optional
 import os
 import hashlib
-from functools import wraps
+from functools import lru_cache, wraps
 import tempfile
+import threading
+import uuid
+from collections import deque
+
+from analytics import TREND_KINDS, TrendStore
+import blob_store
+from body_scans import BodyScanRepository
+import cold_start
+import dataset_snapshot
+import exercise_catalog
+import json_codec
+import progression
+import series
+from data_watcher import JsonDirectoryIndex
+from models import SLIM_FIELDS, DayIndex, DayRecord
+from photo_manifest import MAX_PAGE_SIZE, PhotoManifest
+from metrics_store import METRICS, MetricsStore
+from prerender import PrerenderedResponses
+from response_cache import ResponseCache, available_encodings
+from training_index import TrainingIndex
 
 """
 Flask application entrypoint.
@@ -29,6 +51,31 @@ app = Flask(
     static_url_path='/static',
     template_folder='templates',
 )
+# Precompiled templates in cold-start mode (see cold_start.py)
+cold_start.install(app)
+
+
+class CodecJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by json_codec (orjson/msgspec when installed)
+    
+    Keeps Flask's defaults: sorted keys, and Flask's own handling of dates,
+    dataclasses, UUIDs etc. via the `default` hook. Output is UTF-8 rather
+    than ASCII-escaped.
+    """
+    
+    def dumps(self, obj, **kwargs) -> str:
+        return json_codec.dumps(
+            obj,
+            indent=kwargs.get('indent'),
+            sort_keys=kwargs.get('sort_keys', self.sort_keys),
+            default=kwargs.get('default', self.default)
+        ).decode('utf-8')
+    
+    def loads(self, s, **kwargs):
+        return json_codec.loads(s)
+
+
+app.json = CodecJSONProvider(app)
 
 
 @app.route('/favicon.ico')
@@ -205,179 +252,548 @@ class TransformationLogParser:
         }
 
 
+DEFAULT_MASTER_FILE = "public/data/master-health-file.json"
+DEFAULT_DAILY_LOGS_DIR = "public/data/daily-logs"
+
+
+class DataPathResolver:
+    """Resolve the master file, daily-logs and body-scans locations once per process.
+
+    Local dev, Vercel and Lambda lay the bundle out differently, so a list of
+    candidate roots is probed on first use. The result is memoized and only
+    re-probed when a previously found path disappears (e.g. a redeploy
+    swapping the bundle under a warm worker), instead of on every request.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._resolved = {}
+
+    @staticmethod
+    def _candidate_roots() -> List[Path]:
+        """Project roots to probe, in priority order"""
+        # Strategy 1: Use __file__ from app.py (this file)
+        try:
+            app_root = Path(__file__).parent
+        except Exception:
+            app_root = Path.cwd()
+        
+        # Strategy 2: Check if we're in api/ directory and go up
+        if app_root.name == 'api':
+            app_root = app_root.parent
+        
+        # Strategy 3: Use current working directory (set by api/index.py)
+        try:
+            cwd = Path.cwd()
+        except Exception:
+            cwd = app_root
+        
+        roots = [
+            app_root,
+            cwd,
+            cwd.parent if cwd.name == 'api' else cwd,
+        ]
+        
+        # Strategy 4: On Vercel, files are in /var/task or /var/runtime
+        # Also check LAMBDA_TASK_ROOT environment variable
+        lambda_root = os.getenv('LAMBDA_TASK_ROOT')
+        if os.getenv('VERCEL') == '1' or lambda_root:
+            roots.extend([
+                Path('/var/task'),  # Vercel serverless function directory
+                Path('/var/runtime'),  # Alternative Vercel location
+            ])
+            if lambda_root:
+                roots.append(Path(lambda_root))
+        
+        # Drop duplicates while keeping priority order
+        unique = []
+        for root in roots:
+            if root not in unique:
+                unique.append(root)
+        return unique
+
+    @staticmethod
+    def _first_existing(candidates: List[Path], is_dir: bool) -> Optional[Path]:
+        for path in candidates:
+            try:
+                if (path.is_dir() if is_dir else path.is_file()):
+                    return path
+            except Exception:
+                continue
+        return None
+
+    def _probe(self, master_file: str, daily_logs_dir: str) -> Dict:
+        """Probe every candidate location and pick the first existing one"""
+        roots = self._candidate_roots()
+        
+        # On Vercel, try api/data first (files copied to function bundle),
+        # then fall back to public/data (for local development)
+        # (api/index.py sets cwd to the project root, so check cwd first and
+        # then relative to this file)
+        vercel_first = []
+        if os.getenv('VERCEL') == '1':
+            vercel_first = [Path.cwd() / "api" / "data", Path(__file__).parent / "api" / "data"]
+        
+        possible_master = [d / "master-health-file.json" for d in vercel_first]
+        possible_logs = [d / "daily-logs" for d in vercel_first]
+        for root in roots:
+            possible_master.extend([
+                root / master_file,
+                root / "public" / "data" / "master-health-file.json",
+                root / "data" / "master-health-file.json",  # Without public prefix
+            ])
+            possible_logs.extend([
+                root / daily_logs_dir,
+                root / "public" / "data" / "daily-logs",
+                root / "data" / "daily-logs",  # Without public prefix
+            ])
+        # Also try relative to current working directory
+        possible_master.extend([
+            Path(master_file),
+            Path("public/data/master-health-file.json"),
+            Path("data/master-health-file.json"),
+        ])
+        possible_logs.extend([
+            Path(daily_logs_dir),
+            Path("public/data/daily-logs"),
+            Path("data/daily-logs"),
+        ])
+        
+        # Body scans have always preferred the api/data copy
+        possible_scans = []
+        for root in roots:
+            possible_scans.extend([
+                root / "api" / "data" / "body-scans",
+                root / "public" / "data" / "body-scans",
+            ])
+        possible_scans.extend([
+            Path("api/data/body-scans"),
+            Path("public/data/body-scans"),
+        ])
+        
+        master = self._first_existing(possible_master, is_dir=False)
+        logs = self._first_existing(possible_logs, is_dir=True)
+        scans = self._first_existing(possible_scans, is_dir=True)
+        
+        found = {
+            'master_file': master is not None,
+            'daily_logs_dir': logs is not None,
+            'body_scans_dir': scans is not None,
+        }
+        paths = {
+            # Use first candidate as default, but make sure it's absolute
+            'master_file': master or possible_master[0].resolve(),
+            'daily_logs_dir': logs or possible_logs[0].resolve(),
+            'body_scans_dir': scans,
+        }
+        
+        if cold_start.ENABLED:
+            # One line; /api/debug/data-paths has the details
+            print("Data paths resolved: " + ", ".join(f"{name}={path} ({found[name]})" for name, path in paths.items()))
+        else:
+            print("Data paths resolved:")
+            for name, path in paths.items():
+                print(f"  {name}: {path} (exists: {found[name]})")
+            print(f"  VERCEL env: {os.getenv('VERCEL')}, LAMBDA_TASK_ROOT: {os.getenv('LAMBDA_TASK_ROOT')}, cwd: {Path.cwd()}")
+        
+        return {
+            'paths': paths,
+            'found': found,
+            'resolved_at': datetime.now().isoformat(),
+        }
+
+    def _is_stale(self, entry: Dict) -> bool:
+        """True when a path that existed at resolution time has since disappeared"""
+        for name, was_found in entry['found'].items():
+            if was_found and not entry['paths'][name].exists():
+                return True
+        return False
+
+    def resolve(self, master_file: str = DEFAULT_MASTER_FILE, daily_logs_dir: str = DEFAULT_DAILY_LOGS_DIR) -> Dict[str, Optional[Path]]:
+        """Return the memoized master_file / daily_logs_dir / body_scans_dir paths"""
+        key = (master_file, daily_logs_dir)
+        entry = self._resolved.get(key)
+        if entry is not None and not self._is_stale(entry):
+            return entry['paths']
+        with self._lock:
+            entry = self._resolved.get(key)
+            if entry is None or self._is_stale(entry):
+                entry = self._probe(master_file, daily_logs_dir)
+                self._resolved[key] = entry
+            return entry['paths']
+
+    def diagnostics(self) -> List[Dict]:
+        """Resolved locations for every configuration seen so far"""
+        result = []
+        for (master_file, daily_logs_dir), entry in list(self._resolved.items()):
+            result.append({
+                'requested': {'master_file': master_file, 'daily_logs_dir': daily_logs_dir},
+                'paths': {name: str(path) if path else None for name, path in entry['paths'].items()},
+                'found': entry['found'],
+                'resolved_at': entry['resolved_at'],
+            })
+        return result
+
+
+_data_paths = DataPathResolver()
+
+
+@dataclass
+class DatasetSnapshot:
+    """Consistent view of the dataset handed to a TransformationDataLoader"""
+    master_data: Dict
+    daily_logs: List[Dict]
+    day_records: List[DayRecord]
+    days: DayIndex
+    metrics: MetricsStore
+    trends: TrendStore
+    training: TrainingIndex
+    body_scans: List[Dict]
+    scans: Optional[BodyScanRepository]
+    # Monotonic per-process counter, bumped whenever anything on disk changes
+    version: int
+    # "<instance>-<version>": what clients hand back to /api/data/changes
+    version_token: str
+    # Content validator shared by every worker serving the same files and build
+    etag: str
+    last_modified: Optional[datetime]
+
+
+# Identifies the deployed code, so a redeploy with unchanged data still changes ETags
+BUILD_ID = os.getenv('VERCEL_GIT_COMMIT_SHA') or str(int(Path(__file__).stat().st_mtime))
+
+
+class DatasetCache:
+    """Process-wide cache of the parsed master file, daily logs and body scans.
+
+    Every request builds a TransformationDataLoader, so the parsed dataset is
+    kept here. The master file is reloaded only when its mtime/size changes,
+    and the daily-logs and body-scans directories are ingested incrementally:
+    only added, modified or deleted files are parsed, and `day` is renumbered
+    only from the first affected position onwards. Any change bumps the
+    dataset version and recomputes the ETag from the file signatures.
+
+    On the first load, sections still described by a dataset snapshot
+    (dataset_snapshot.py) are decoded from its mmap instead of being read
+    file by file; incremental ingestion carries on from there.
+
+    A bounded log of what each version changed backs the /api/data/changes
+    delta feed. Versions are per process, so tokens carry an instance id and a
+    token from another worker (or older than the log) asks for a full resync.
+    """
+
+    # Versions of history kept for the change feed
+    CHANGE_LOG_SIZE = 256
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._key = None
+        self._version = 0
+        self._instance = uuid.uuid4().hex[:8]
+        self._reset()
+
+    def _reset(self):
+        self._master_signature = None
+        self._master_data = None
+        self._logs_index = None
+        self._scans = None
+        self._daily_logs = []
+        self._body_scans = []
+        self._days = DayIndex()
+        self._metrics = MetricsStore()
+        self._trends = TrendStore()
+        self._training = TrainingIndex()
+        self._snapshot = None
+        # section -> (signature, content digest), for content_version()
+        self._section_digests = {}
+        # Deltas are only known from the first load after a reset onwards
+        self._changes = deque()
+        self._changes_floor = self._version + 1
+
+    @staticmethod
+    def _file_signature(path: Optional[Path]):
+        """(mtime_ns, size) for a file, or None if it can't be stat'ed"""
+        try:
+            st = os.stat(path)
+            return (st.st_mtime_ns, st.st_size)
+        except (OSError, TypeError):
+            return None
+
+    def load(self, loader: 'TransformationDataLoader') -> DatasetSnapshot:
+        """Return the dataset for the loader's paths, applying any pending changes"""
+        key = (str(loader.master_file), str(loader.daily_logs_dir), str(loader.body_scans_dir))
+        with self._lock:
+            if key != self._key:
+                self._key = key
+                self._reset()
+                self._logs_index = JsonDirectoryIndex(loader.daily_logs_dir, TransformationDataLoader._read_daily_log)
+                print(f"Daily logs ingestion ({self._logs_index.mode}): {loader.daily_logs_dir}")
+                if loader.body_scans_dir:
+                    self._scans = BodyScanRepository(loader.body_scans_dir, TransformationDataLoader._read_body_scan)
+                self._seed_from_snapshot(loader)
+            changed = False
+            delta = {'master': set(), 'daily_logs': set(), 'body_scans': set()}
+
+            # Take the signature before reading so a write that races the load
+            # invalidates the entry on the next request instead of being missed
+            signature = self._file_signature(loader.master_file)
+            if self._master_data is None or signature != self._master_signature:
+                previous = self._master_data or {}
+                self._master_data = loader._load_master()
+                self._master_signature = signature
+                delta['master'] = {
+                    field for field in set(previous) | set(self._master_data)
+                    if previous.get(field) != self._master_data.get(field)
+                }
+                changed = True
+
+            first_changed = self._logs_index.refresh()
+            day_records = self._logs_index.records
+            if first_changed is not None:
+                # Day numbers follow file order, so only entries at or after the
+                # first change can shift. Shifted records are replaced by
+                # renumbered copies: older snapshots still hold the originals.
+                renumbered = {
+                    position: day_records[position].renumbered(position + 1)
+                    for position in range(first_changed, len(day_records))
+                    if day_records[position].day != position + 1
+                }
+                self._logs_index.replace(renumbered)
+                day_records = self._logs_index.records
+                delta['daily_logs'] = (self._logs_index.last_upserted | self._logs_index.last_deleted |
+                                       {self._logs_index.names[position] for position in renumbered})
+                self._daily_logs = [record.raw for record in day_records]
+                self._days = self._days.updated(day_records, first_changed)
+                self._metrics = self._metrics.updated(day_records, first_changed)
+                self._trends = self._trends.updated(self._metrics, first_changed)
+                print(f"Daily logs updated from position {first_changed}: {len(day_records)} days loaded")
+                changed = True
+
+            # Editing the exercise alias table regroups every session
+            catalog = exercise_catalog.catalog()
+            if catalog is not self._training.catalog:
+                changed = True
+            self._training = self._training.updated(day_records, first_changed, catalog)
+
+            if self._scans is not None and self._scans.refresh():
+                self._body_scans = self._scans.scans
+                delta['body_scans'] = self._scans.index.last_upserted | self._scans.index.last_deleted
+                changed = True
+
+            if changed or self._snapshot is None:
+                initial = self._snapshot is None
+                self._snapshot = self._build_snapshot(day_records)
+                if not initial:
+                    self._record_change(self._snapshot.version, delta)
+            return self._snapshot
+
+    def _seed_from_snapshot(self, loader: 'TransformationDataLoader'):
+        """Take every section the snapshot still describes from its mmap"""
+        reader = dataset_snapshot.open_snapshot(loader.master_file)
+        if reader is None:
+            return
+        try:
+            trust_sizes = dataset_snapshot.trust_sizes()
+            base = reader.path.parent
+            used = []
+
+            def location(section: str, actual: Optional[Path]) -> Optional[Path]:
+                # Sections only apply to the files laid out next to the snapshot
+                expected = base / dataset_snapshot.SECTIONS[section]
+                if actual is None or Path(actual).resolve() != expected.resolve():
+                    return None
+                return actual
+
+            known = reader.validate('master', location('master', loader.master_file), trust_sizes)
+            if known:
+                (entry,) = reader.entries('master')
+                self._master_data = reader.record(entry)
+                self._master_signature = known[entry['name']]
+                self._seed_digest(reader, 'master', self._master_signature)
+                used.append('master')
+
+            known = reader.validate('daily_logs', location('daily_logs', loader.daily_logs_dir), trust_sizes)
+            if known is not None:
+                records = []
+                for entry in reader.entries('daily_logs'):
+                    day_data = reader.record(entry)
+                    day_data['day'] = None
+                    records.append((entry['name'], DayRecord.from_log(day_data)))
+                self._logs_index.seed(records, known)
+                self._seed_digest(reader, 'daily_logs', tuple(sorted(known.items())))
+                used.append('daily_logs')
+
+            if self._scans is not None:
+                known = reader.validate('body_scans', location('body_scans', loader.body_scans_dir), trust_sizes)
+                if known is not None:
+                    self._scans.index.seed(
+                        [(entry['name'], reader.record(entry)) for entry in reader.entries('body_scans')], known
+                    )
+                    self._seed_digest(reader, 'body_scans', tuple(sorted(known.items())))
+                    used.append('body_scans')
+            print(f"Dataset snapshot {reader.path}: using {', '.join(used) or 'nothing (stale)'}")
+        except Exception as e:
+            # Anything the snapshot didn't seed is read from the files as usual
+            print(f"Error reading dataset snapshot {reader.path}: {e}")
+            import traceback
+            traceback.print_exc()
+        finally:
+            reader.close()
+
+    def _seed_digest(self, reader: 'dataset_snapshot.SnapshotReader', section: str, signature):
+        digest = reader.digest(section)
+        if digest:
+            self._section_digests[section] = (signature, digest)
+
+    def content_version(self, loader: 'TransformationDataLoader') -> Optional[str]:
+        """Digest of the dataset's content, identical on every host serving the same files
+
+        Unlike the ETag it ignores mtimes and the build; prerender.py joins it
+        with a digest of the app's code to key pre-rendered responses, so
+        they follow both the data and the build. Sections seeded from
+        the dataset snapshot reuse its digests; the others are hashed once
+        per signature. Covers the exercise alias table, which /api/training
+        depends on.
+        """
+        with self._lock:
+            if self._logs_index is None:
+                return None
+            sections = (
+                ('master', self._master_signature, loader.master_file),
+                ('daily_logs', self._logs_index.signature, loader.daily_logs_dir),
+                ('body_scans', self._scans.signature if self._scans else (), loader.body_scans_dir),
+                ('aliases', self._training.catalog_signature, exercise_catalog.ALIASES_FILE),
+            )
+            digests = []
+            for section, signature, location in sections:
+                known = self._section_digests.get(section)
+                if known is None or known[0] != signature:
+                    # Single files (master, aliases) are listed like the master section
+                    kind = section if section in ('daily_logs', 'body_scans') else 'master'
+                    try:
+                        files = dataset_snapshot.section_files(kind, location)
+                        known = (signature, dataset_snapshot.content_digest(files))
+                    except OSError:
+                        return None
+                    self._section_digests[section] = known
+                digests.append(known[1])
+            return hashlib.sha1(':'.join(digests).encode('utf-8')).hexdigest()[:20]
+
+    def _record_change(self, version: int, delta: Dict):
+        self._changes.append((version, delta))
+        if len(self._changes) > self.CHANGE_LOG_SIZE:
+            dropped_version, _ = self._changes.popleft()
+            self._changes_floor = dropped_version + 1
+
+    def changes_since(self, token: Optional[str]) -> Optional[Dict]:
+        """Everything added, modified or deleted after the version in `token`
+        
+        Returns None when the delta can't be computed (unknown instance, token
+        older than the change log, or a token from the future) and the client
+        should reload /api/data instead.
+        """
+        with self._lock:
+            instance, _, number = (token or '').rpartition('-')
+            if instance != self._instance or not number.isdigit() or self._snapshot is None:
+                return None
+            since = int(number)
+            if since < self._changes_floor - 1 or since > self._version:
+                return None
+            
+            merged = {'master': set(), 'daily_logs': set(), 'body_scans': set()}
+            for version, delta in self._changes:
+                if version > since:
+                    for part, names in delta.items():
+                        merged[part] |= names
+            
+            master = {
+                'upserted': {f: self._master_data[f] for f in sorted(merged['master']) if f in self._master_data},
+                'deleted': sorted(f for f in merged['master'] if f not in self._master_data),
+            }
+            return {
+                'master': master,
+                'daily_logs': self._collect(self._logs_index, merged['daily_logs'], lambda record: record.raw),
+                'body_scans': self._collect(self._scans.index if self._scans else None, merged['body_scans'], lambda scan: scan),
+            }
+
+    @staticmethod
+    def _collect(index: Optional[JsonDirectoryIndex], names: set, payload) -> Dict:
+        """Current payload of still-present files; deleted ones by file stem (the date)"""
+        upserted, deleted = [], []
+        for name in sorted(names):
+            record = index.get(name) if index else None
+            if record is not None:
+                upserted.append(payload(record))
+            else:
+                deleted.append(Path(name).stem)
+        return {'upserted': upserted, 'deleted': deleted}
+
+    def _build_snapshot(self, day_records: List[DayRecord]) -> DatasetSnapshot:
+        self._version += 1
+        scans_signature = self._scans.signature if self._scans else ()
+        digest = hashlib.sha1(repr((
+            BUILD_ID, self._master_signature, self._logs_index.signature, scans_signature,
+            self._training.catalog_signature
+        )).encode('utf-8')).hexdigest()[:20]
+        newest_ns = max(
+            (self._master_signature or (0, 0))[0],
+            self._logs_index.last_modified_ns,
+            self._scans.last_modified_ns if self._scans else 0,
+        )
+        return DatasetSnapshot(
+            master_data=self._master_data,
+            daily_logs=self._daily_logs,
+            day_records=day_records,
+            days=self._days,
+            metrics=self._metrics,
+            trends=self._trends,
+            training=self._training,
+            body_scans=self._body_scans,
+            scans=self._scans,
+            version=self._version,
+            version_token=f"{self._instance}-{self._version}",
+            etag=digest,
+            last_modified=datetime.fromtimestamp(newest_ns / 1e9, tz=timezone.utc) if newest_ns else None,
+        )
+
+    def invalidate(self):
+        """Drop the cached dataset so the next request reloads from disk"""
+        with self._lock:
+            self._key = None
+            self._reset()
+
+
+_dataset_cache = DatasetCache()
+
+
 class TransformationDataLoader:
     """Load data from JSON files: master file + daily logs"""
     
-    def __init__(self, master_file: str = "public/data/master-health-file.json", daily_logs_dir: str = "public/data/daily-logs"):
+    def __init__(self, master_file: str = DEFAULT_MASTER_FILE, daily_logs_dir: str = DEFAULT_DAILY_LOGS_DIR):
         """Initialize data loader with robust error handling to prevent crashes"""
-        # On Vercel, try api/data first (files copied to function bundle)
-        # Then fall back to public/data (for local development)
-        vercel_env = os.getenv('VERCEL')
-        if vercel_env == '1':
-            # Try api/data first on Vercel
-            # On Vercel, api/index.py sets cwd to parent_dir (project root)
-            # So from app.py's perspective, api/data is at: cwd/api/data
-            # But also try relative to app.py's location
-            cwd = Path.cwd()
-            api_master_from_cwd = cwd / "api" / "data" / "master-health-file.json"
-            api_logs_from_cwd = cwd / "api" / "data" / "daily-logs"
-            api_master_from_file = Path(__file__).parent / "api" / "data" / "master-health-file.json"
-            api_logs_from_file = Path(__file__).parent / "api" / "data" / "daily-logs"
-            
-            print(f"Checking api/data paths on Vercel:")
-            print(f"  cwd: {cwd}")
-            print(f"  __file__ parent: {Path(__file__).parent}")
-            print(f"  api_master_from_cwd: {api_master_from_cwd} (exists: {api_master_from_cwd.exists()})")
-            print(f"  api_logs_from_cwd: {api_logs_from_cwd} (exists: {api_logs_from_cwd.exists()})")
-            print(f"  api_master_from_file: {api_master_from_file} (exists: {api_master_from_file.exists()})")
-            print(f"  api_logs_from_file: {api_logs_from_file} (exists: {api_logs_from_file.exists()})")
-            
-            # Try cwd first (set by api/index.py), then file location
-            if api_master_from_cwd.exists():
-                master_file = str(api_master_from_cwd)
-                print(f"Using Vercel api/data master file (from cwd): {master_file}")
-            elif api_master_from_file.exists():
-                master_file = str(api_master_from_file)
-                print(f"Using Vercel api/data master file (from __file__): {master_file}")
-            
-            if api_logs_from_cwd.exists():
-                daily_logs_dir = str(api_logs_from_cwd)
-                print(f"Using Vercel api/data logs dir (from cwd): {daily_logs_dir}")
-            elif api_logs_from_file.exists():
-                daily_logs_dir = str(api_logs_from_file)
-                print(f"Using Vercel api/data logs dir (from __file__): {daily_logs_dir}")
-        
         try:
-            # Use absolute paths from app root
-            # On Vercel, we need to find the project root
-            # Try multiple strategies to find the correct path
-            
-            # Strategy 1: Use __file__ from app.py (this file)
-            try:
-                app_root = Path(__file__).parent
-            except Exception:
-                app_root = Path.cwd()
-            
-            # Strategy 2: Check if we're in api/ directory and go up
-            if app_root.name == 'api':
-                app_root = app_root.parent
-            
-            # Strategy 3: Use current working directory (set by api/index.py)
-            try:
-                cwd = Path.cwd()
-            except Exception:
-                cwd = app_root
-            
-            # Strategy 4: Try to find public/ directory
-            # On Vercel, files are in /var/task or /var/runtime
-            # Also check LAMBDA_TASK_ROOT environment variable
-            lambda_root = os.getenv('LAMBDA_TASK_ROOT')
-            vercel_env = os.getenv('VERCEL')
-            
-            possible_roots = [
-                app_root,
-                cwd,
-                app_root.parent if app_root.name == 'api' else app_root,
-                cwd.parent if cwd.name == 'api' else cwd,
-            ]
-            
-            # Add Vercel-specific paths
-            if vercel_env == '1' or lambda_root:
-                possible_roots.extend([
-                    Path('/var/task'),  # Vercel serverless function directory
-                    Path('/var/runtime'),  # Alternative Vercel location
-                ])
-                if lambda_root:
-                    possible_roots.append(Path(lambda_root))
-            
-            # Try multiple possible paths for master file
-            possible_master = []
-            for root in possible_roots:
-                try:
-                    possible_master.extend([
-                        root / master_file,
-                        root / "public" / "data" / "master-health-file.json",
-                        root / "data" / "master-health-file.json",  # Without public prefix
-                    ])
-                except Exception:
-                    continue
-            # Also try relative to current working directory
-            try:
-                possible_master.extend([
-                    Path(master_file),
-                    Path("public/data/master-health-file.json"),
-                    Path("data/master-health-file.json"),  # Without public prefix
-                ])
-            except Exception:
-                pass
-            
-            # Try multiple possible paths for daily logs
-            possible_logs = []
-            for root in possible_roots:
-                try:
-                    possible_logs.extend([
-                        root / daily_logs_dir,
-                        root / "public" / "data" / "daily-logs",
-                        root / "data" / "daily-logs",  # Without public prefix
-                    ])
-                except Exception:
-                    continue
-            # Also try relative to current working directory
-            try:
-                possible_logs.extend([
-                    Path(daily_logs_dir),
-                    Path("public/data/daily-logs"),
-                    Path("data/daily-logs"),  # Without public prefix
-                ])
-            except Exception:
-                pass
-            
-            # Find the first existing path
-            self.master_file = None
-            for path in possible_master:
-                try:
-                    if path.exists():
-                        self.master_file = path
-                        break
-                except Exception:
-                    continue
-            if not self.master_file:
-                # Use first as default, but make sure it's absolute
-                try:
-                    self.master_file = Path(possible_master[0]).resolve() if possible_master else Path(master_file)
-                except Exception:
-                    self.master_file = Path(master_file)
-            
-            self.daily_logs_dir = None
-            for path in possible_logs:
-                try:
-                    if path.exists() and path.is_dir():
-                        self.daily_logs_dir = path
-                        break
-                except Exception:
-                    continue
-            if not self.daily_logs_dir:
-                # Use first as default, but make sure it's absolute
-                try:
-                    self.daily_logs_dir = Path(possible_logs[0]).resolve() if possible_logs else Path(daily_logs_dir)
-                except Exception:
-                    self.daily_logs_dir = Path(daily_logs_dir)
-            
-            # Safe debug printing
-            try:
-                print(f"TransformationDataLoader initialized:")
-                print(f"  Master file: {self.master_file} (exists: {self.master_file.exists() if self.master_file else False})")
-                print(f"  Daily logs dir: {self.daily_logs_dir} (exists: {self.daily_logs_dir.exists() if self.daily_logs_dir else False})")
-                print(f"  App root (from __file__): {Path(__file__).parent}")
-                print(f"  Current working dir: {Path.cwd()}")
-                print(f"  VERCEL env: {os.getenv('VERCEL')}")
-                print(f"  LAMBDA_TASK_ROOT: {os.getenv('LAMBDA_TASK_ROOT')}")
-            except Exception as e:
-                print(f"Debug print error (non-fatal): {e}")
-            
-            # Load data with error handling
-            self.master_data = self._load_master()
-            self.daily_logs = self._load_daily_logs()
+            # Locations are probed once per process by the shared resolver
+            paths = _data_paths.resolve(master_file, daily_logs_dir)
+            self.master_file = paths['master_file']
+            self.daily_logs_dir = paths['daily_logs_dir']
+            self.body_scans_dir = paths['body_scans_dir']
+            
+            # Load data with error handling (served from the process-wide cache
+            # when nothing on disk has changed since the last request)
+            snapshot = _dataset_cache.load(self)
+            self.master_data = snapshot.master_data
+            self.daily_logs = snapshot.daily_logs
+            self.day_records = snapshot.day_records
+            self.days = snapshot.days
+            self.metrics = snapshot.metrics
+            self.trends = snapshot.trends
+            self.training = snapshot.training
+            self.body_scans = snapshot.body_scans
+            self.scans = snapshot.scans
+            self.version = snapshot.version
+            self.version_token = snapshot.version_token
+            self.etag = snapshot.etag
+            self.last_modified = snapshot.last_modified
         except Exception as e:
             # If initialization fails completely, set defaults to prevent crashes
             print(f"CRITICAL: TransformationDataLoader init failed: {e}")
@@ -385,6 +801,7 @@ class TransformationDataLoader:
             traceback.print_exc()
             self.master_file = Path(master_file)
             self.daily_logs_dir = Path(daily_logs_dir)
+            self.body_scans_dir = None
             self.master_data = {
                 'baseline': {},
                 'targets': {},
@@ -392,6 +809,18 @@ class TransformationDataLoader:
                 'protocol': {}
             }
             self.daily_logs = []
+            self.day_records = []
+            self.days = DayIndex()
+            self.metrics = MetricsStore()
+            self.trends = TrendStore()
+            self.training = TrainingIndex()
+            self.body_scans = []
+            self.scans = None
+            # Never matches a client validator, so errors are not cached
+            self.version = 0
+            self.version_token = None
+            self.etag = f"error-{datetime.now().timestamp()}"
+            self.last_modified = None
     
     def _load_master(self) -> Dict:
         """Load master health file"""
@@ -405,7 +834,7 @@ class TransformationDataLoader:
                     'goal': {},
                     'protocol': {}
                 }
-            return json.loads(self.master_file.read_text(encoding='utf-8'))
+            return json_codec.load_file(self.master_file)
         except Exception as e:
             print(f"Error loading master file: {e}")
             import traceback
@@ -418,48 +847,36 @@ class TransformationDataLoader:
                 'protocol': {}
             }
     
-    def _load_daily_logs(self) -> List[Dict]:
-        """Load all daily log JSON files, sorted by date"""
-        days = []
+    @staticmethod
+    def _read_daily_log(json_file: Path) -> Optional[DayRecord]:
+        """Parse and normalize one daily log JSON file; `day` is assigned by the dataset cache"""
         try:
-            if not self.daily_logs_dir or not self.daily_logs_dir.exists():
-                print(f"Daily logs directory does not exist: {self.daily_logs_dir}")
-                return days
-            
-            # Get all JSON files
-            json_files = sorted(self.daily_logs_dir.glob("*.json"))
-            print(f"Found {len(json_files)} JSON files in {self.daily_logs_dir}")
-            
-            for json_file in json_files:
-                try:
-                    content = json_file.read_text(encoding='utf-8')
-                    day_data = json.loads(content)
-                    # Add day number based on order
-                    day_data['day'] = len(days) + 1
-                    # Parse date for display
-                    try:
-                        date_obj = datetime.strptime(day_data['date'], '%Y-%m-%d')
-                        day_data['date_display'] = date_obj.strftime('%b %d, %Y')
-                    except Exception as e:
-                        print(f"Error parsing date {day_data.get('date')}: {e}")
-                        day_data['date_display'] = day_data.get('date', 'Unknown')
-                    days.append(day_data)
-                    print(f"Loaded {json_file.name}: Day {day_data['day']}, Protein: {day_data.get('protein')}")
-                except Exception as e:
-                    print(f"Error loading {json_file}: {e}")
-                    import traceback
-                    traceback.print_exc()
-                    # Continue loading other files even if one fails
-                    continue
-            
-            print(f"Total days loaded: {len(days)}")
+            day_data = json_codec.load_file(json_file)
+            day_data['day'] = None
+            record = DayRecord.from_log(day_data)
+            if not cold_start.ENABLED:
+                print(f"Loaded {json_file.name}: Protein: {record.totals.protein}")
+            return record
         except Exception as e:
-            print(f"Error in _load_daily_logs: {e}")
+            print(f"Error loading {json_file}: {e}")
             import traceback
             traceback.print_exc()
-            # Return empty list instead of crashing
-            return []
-        return days
+            # Skip this file; the others still load
+            return None
+    
+    @staticmethod
+    def _read_body_scan(json_file: Path) -> Optional[Dict]:
+        """Parse one body scan JSON file"""
+        try:
+            scan_data = json_codec.load_file(json_file)
+            if not cold_start.ENABLED:
+                print(f"Loaded scan: {json_file.name} - Date: {scan_data.get('date')}")
+            return scan_data
+        except Exception as e:
+            print(f"Error loading {json_file}: {e}")
+            import traceback
+            traceback.print_exc()
+            return None
     
     def get_baseline(self) -> Dict:
         """Get baseline metrics from master file"""
@@ -502,6 +919,42 @@ class TransformationDataLoader:
         """Get all daily logs"""
         return self.daily_logs
     
+    def get_day_records(self) -> List[DayRecord]:
+        """Get all daily logs as normalized DayRecords"""
+        return self.day_records
+    
+    def get_day(self, date: str) -> Optional[DayRecord]:
+        """Get the daily log for a YYYY-MM-DD date (O(1))"""
+        return self.days.get(date)
+    
+    def get_day_index(self) -> DayIndex:
+        """Date index over the daily logs, for single days and date ranges"""
+        return self.days
+    
+    def get_metrics(self) -> MetricsStore:
+        """Get the columnar per-metric store for the daily logs"""
+        return self.metrics
+    
+    def get_trends(self) -> TrendStore:
+        """Get the moving-average / trend-weight columns for the daily metrics"""
+        return self.trends
+    
+    def get_training(self) -> TrainingIndex:
+        """Get the per-exercise progression index"""
+        return self.training
+    
+    def get_content_version(self) -> Optional[str]:
+        """Host-independent digest of the dataset content (see DatasetCache.content_version)"""
+        return _dataset_cache.content_version(self)
+
+    def get_scan_repository(self) -> Optional[BodyScanRepository]:
+        """Get the body scan repository (None when no scans directory exists)"""
+        return self.scans
+    
+    def get_body_scans(self) -> List[Dict]:
+        """Get all body scans, sorted by date"""
+        return self.body_scans
+    
     def get_streak(self) -> int:
         """Calculate current streak"""
         return len(self.daily_logs)
@@ -653,32 +1106,231 @@ def body_scans():
     return render_template('body-scans.html')
 
 
+def _request_loader() -> 'TransformationDataLoader':
+    """One TransformationDataLoader per request, shared by the validators and the view"""
+    if 'data_loader' not in g:
+        g.data_loader = TransformationDataLoader()
+    return g.data_loader
+
+
+# Serialized (and gzip/br compressed) bodies of the large read endpoints
+_response_cache = ResponseCache(int(os.getenv('RESPONSE_CACHE_MAX_BYTES', 16 * 1024 * 1024)))
+
+
+def cached_response(view):
+    """Serve the view's JSON from the response cache, negotiating Accept-Encoding
+    
+    Entries are keyed by path, query string and dataset ETag, so the view only
+    runs (and jsonify only serializes) once per dataset version and query.
+    Views flag error payloads with `g.skip_response_cache` to keep them out.
+    """
+    @wraps(view)
+    def wrapped(*args, **kwargs):
+        loader = _request_loader()
+        key = (request.path, request.query_string, loader.etag)
+        encoding = request.accept_encodings.best_match(available_encodings() + ('identity',), default='identity')
+        
+        cached = _response_cache.get(key, encoding)
+        if cached is None:
+            response = app.make_response(view(*args, **kwargs))
+            if response.status_code != 200 or g.get('skip_response_cache'):
+                return response
+            _response_cache.put(key, response.get_data(), response.mimetype)
+            cached = _response_cache.get(key, encoding)
+            if cached is None:
+                # Larger than the whole budget - serve it uncached
+                return response
+        
+        body, coding, mimetype = cached
+        response = app.response_class(body, mimetype=mimetype)
+        if coding != 'identity':
+            response.headers['Content-Encoding'] = coding
+        response.vary.add('Accept-Encoding')
+        return response
+    return wrapped
+
+
+# Responses written by prerender.py for the current dataset content
+_prerendered = PrerenderedResponses()
+
+
+def prerendered(view):
+    """Serve the pre-rendered body when it was rendered from exactly this dataset
+    
+    Only plain requests (no query string) are pre-rendered. The files are
+    matched on the dataset content version and the code that rendered them,
+    so after any data or code change the view runs as usual until
+    prerender.py is run again.
+    """
+    @wraps(view)
+    def wrapped(*args, **kwargs):
+        if request.query_string or not _prerendered.has_versions():
+            return view(*args, **kwargs)
+        loader = _request_loader()
+        accepted = [e for e in available_encodings() if request.accept_encodings[e]] + ['identity']
+        found = _prerendered.lookup(loader.get_content_version(), request.path, accepted)
+        if found is None:
+            return view(*args, **kwargs)
+        body, coding = found
+        response = app.response_class(body, mimetype='application/json')
+        if coding != 'identity':
+            response.headers['Content-Encoding'] = coding
+        response.vary.add('Accept-Encoding')
+        response.headers['X-Prerendered'] = '1'
+        return response
+    return wrapped
+
+
+def conditional_get(view):
+    """Serve 304 Not Modified when the client already has the current dataset version
+    
+    The ETag and Last-Modified validators come from the dataset cache, so a
+    matching If-None-Match / If-Modified-Since is answered before the view
+    does any computation or serialization. Successful responses carry the
+    validators plus `Cache-Control: no-cache` so browsers and CDNs revalidate
+    instead of re-downloading. ETags are weak because the same version may be
+    served gzip-, br- or un-encoded.
+    """
+    @wraps(view)
+    def wrapped(*args, **kwargs):
+        loader = _request_loader()
+        etag = loader.etag
+        last_modified = loader.last_modified
+        
+        # If-None-Match takes precedence over If-Modified-Since (RFC 9110)
+        if request.if_none_match:
+            not_modified = request.if_none_match.contains_weak(etag)
+        else:
+            not_modified = bool(
+                request.if_modified_since and last_modified and
+                last_modified.replace(microsecond=0) <= request.if_modified_since
+            )
+        if not_modified:
+            response = app.response_class(status=304)
+        else:
+            response = app.make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+        
+        response.set_etag(etag, weak=True)
+        if last_modified:
+            response.last_modified = last_modified
+        response.headers['Cache-Control'] = 'no-cache'
+        if loader.version_token:
+            response.headers['X-Dataset-Version'] = loader.version_token
+        return response
+    return wrapped
+
+
+# Identity keys included in every projected day
+DAY_IDENTITY_FIELDS = ('date', 'day', 'date_display')
+
+
+def _project_day(record: DayRecord, fields: Optional[set]) -> Dict:
+    """Serialize one day: the full log, or only the requested fields
+    
+    `totals` is the normalized macro block (either schema); any other name is
+    a top-level key of the log file. Requests that fit in the slim payload are
+    served from the record's cached slim dict.
+    """
+    if not fields:
+        return record.raw
+    if fields.issubset(SLIM_FIELDS):
+        slim = record.slim()
+        return {key: slim[key] for key in SLIM_FIELDS if key in DAY_IDENTITY_FIELDS or key in fields}
+    day = {key: record.raw.get(key) for key in DAY_IDENTITY_FIELDS}
+    for key in fields:
+        if key == 'totals':
+            day['totals'] = record.slim()['totals']
+        elif key in record.raw:
+            day[key] = record.raw[key]
+    return day
+
+
+def _data_page(loader: 'TransformationDataLoader'):
+    """Apply ?fields=&since=&until=&limit=&cursor= to the daily logs
+    
+    Returns (days, next_cursor). The cursor is the date of the last day on the
+    previous page, so pages stay stable when new days are appended.
+    """
+    fields_arg = request.args.get('fields', '')
+    since = request.args.get('since')
+    until = request.args.get('until')
+    limit_arg = request.args.get('limit')
+    cursor = request.args.get('cursor')
+    
+    fields = {f.strip() for f in fields_arg.split(',') if f.strip()} or None
+    for value in (since, until, cursor):
+        if value:
+            datetime.strptime(value, '%Y-%m-%d')
+    limit = None
+    if limit_arg:
+        if not limit_arg.isdigit() or int(limit_arg) <= 0:
+            raise ValueError(f"Invalid limit={limit_arg} (expected a positive integer)")
+        limit = int(limit_arg)
+    
+    records = loader.get_day_records()
+    days = loader.get_day_index()
+    start, stop = days.date_range(since, until)
+    if cursor:
+        start = max(start, days.date_range(None, cursor)[1])
+    next_cursor = None
+    if limit is not None and stop - start > limit:
+        stop = start + limit
+        next_cursor = records[stop - 1].date
+    
+    return [_project_day(record, fields) for record in records[start:stop]], next_cursor
+
+
 @app.route('/api/data')
+@conditional_get
+@prerendered
+@cached_response
 def get_data():
-    """API endpoint to get all transformation data - public access"""
+    """API endpoint to get all transformation data - public access
+    
+    Optional parameters for the daily logs:
+    - fields=totals,fastedWeight: project each day to these keys (plus date/day)
+    - since=/until=YYYY-MM-DD: inclusive date filter
+    - limit=N&cursor=<next_cursor>: page through the logs in date order
+    """
     try:
-        loader = TransformationDataLoader()
+        loader = _request_loader()
         
         baseline = loader.get_baseline()
         targets = loader.get_targets()
-        daily_logs = loader.get_daily_logs()
+        all_logs = loader.get_daily_logs()
         streak = loader.get_streak()
         goal_info = loader.get_goal_info()
         
+        paged = any(request.args.get(arg) for arg in ('fields', 'since', 'until', 'limit', 'cursor'))
+        next_cursor = None
+        if paged:
+            try:
+                daily_logs, next_cursor = _data_page(loader)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+        else:
+            daily_logs = all_logs
+        
         print(f"API /api/data: Returning {len(daily_logs)} daily logs, streak: {streak}")
         
-        return jsonify({
+        payload = {
             'baseline': baseline,
             'targets': targets,
             'daily_logs': daily_logs,
             'streak': streak,
             'goal': goal_info,
-            'total_days': len(daily_logs)
-        })
+            'total_days': len(all_logs)
+        }
+        if paged:
+            payload['next_cursor'] = next_cursor
+        return jsonify(payload)
     except Exception as e:
         print(f"Error in /api/data: {e}")
         import traceback
         traceback.print_exc()
+        g.skip_response_cache = True
         # Return empty data with 200 status instead of 500 to prevent crashes
         return jsonify({
             'error': str(e),
@@ -691,6 +1343,176 @@ def get_data():
         }), 200
 
 
+@app.route('/api/data/changes')
+def get_data_changes():
+    """Delta sync for dashboards: what changed since ?since=<version token>
+    
+    The token comes from the X-Dataset-Version header of any read API (or the
+    `version` of a previous call). When the delta can't be served the response
+    has `full_resync: true` and the client should reload /api/data.
+    """
+    try:
+        loader = _request_loader()
+        since = request.args.get('since')
+        changes = _dataset_cache.changes_since(since) if since else None
+        
+        payload = {
+            'version': loader.version_token,
+            'full_resync': changes is None,
+            'streak': loader.get_streak(),
+            'total_days': len(loader.get_daily_logs())
+        }
+        if changes is not None:
+            payload.update(changes)
+        return jsonify(payload)
+    except Exception as e:
+        print(f"Error in /api/data/changes: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'error': str(e), 'full_resync': True}), 500
+
+
+@lru_cache(maxsize=None)
+def _grok_functions() -> tuple:
+    """Function schemas offered to Grok, built on the first chat request"""
+    return (
+        {
+            "name": "upload_photo",
+            "description": "Upload a progress photo. User will provide the photo file.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "description": {
+                        "type": "string",
+                        "description": "Description of the photo (e.g., 'Day 4 progress photo', 'Fish plate')"
+                    }
+                },
+                "required": ["description"]
+            }
+        },
+        {
+            "name": "add_day_entry",
+            "description": "Add a new day entry to the transformation log",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "day": {
+                        "type": "integer",
+                        "description": "Day number"
+                    },
+                    "date": {
+                        "type": "string",
+                        "description": "Date in format 'Month Day, Year' (e.g., 'Nov 24, 2025')"
+                    },
+                    "protein": {
+                        "type": "number",
+                        "description": "Protein in grams"
+                    },
+                    "carbs": {
+                        "type": "number",
+                        "description": "Carbs in grams"
+                    },
+                    "fat": {
+                        "type": "number",
+                        "description": "Fat in grams"
+                    },
+                    "kcal": {
+                        "type": "number",
+                        "description": "Calories"
+                    },
+                    "seafood_kg": {
+                        "type": "number",
+                        "description": "Seafood in kilograms"
+                    },
+                    "training": {
+                        "type": "string",
+                        "description": "Training description (e.g., '2hr surfing + gym')"
+                    },
+                    "supplements": {
+                        "type": "string",
+                        "description": "Supplements taken (e.g., 'All', 'All except NAC')"
+                    },
+                    "feeling": {
+                        "type": "string",
+                        "description": "How you felt (e.g., 'Great energy', 'Legendary start')"
+                    },
+                    "notes": {
+                        "type": "string",
+                        "description": "Additional notes"
+                    }
+                },
+                "required": ["day", "date", "protein", "carbs", "fat"]
+            }
+        },
+        {
+            "name": "update_day_entry",
+            "description": "Update an existing day entry in the transformation log",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "day": {
+                        "type": "integer",
+                        "description": "Day number to update"
+                    },
+                    "protein": {
+                        "type": "number",
+                        "description": "Updated protein in grams"
+                    },
+                    "carbs": {
+                        "type": "number",
+                        "description": "Updated carbs in grams"
+                    },
+                    "fat": {
+                        "type": "number",
+                        "description": "Updated fat in grams"
+                    },
+                    "kcal": {
+                        "type": "number",
+                        "description": "Updated calories"
+                    },
+                    "seafood_kg": {
+                        "type": "number",
+                        "description": "Updated seafood in kilograms"
+                    },
+                    "training": {
+                        "type": "string",
+                        "description": "Updated training description"
+                    },
+                    "feeling": {
+                        "type": "string",
+                        "description": "Updated feeling"
+                    }
+                },
+                "required": ["day"]
+            }
+        },
+        {
+            "name": "get_current_data",
+            "description": "Get current transformation data (baseline, recent days, stats)",
+            "parameters": {
+                "type": "object",
+                "properties": {},
+                "required": []
+            }
+        },
+        {
+            "name": "get_photos",
+            "description": "Get list of uploaded progress photos",
+            "parameters": {
+                "type": "object",
+                "properties": {},
+                "required": []
+            }
+        }
+    )
+
+
+@lru_cache(maxsize=None)
+def _grok_tools() -> tuple:
+    """_grok_functions() in the tools format"""
+    return tuple({"type": "function", "function": f} for f in _grok_functions())
+
+
 @app.route('/api/chat', methods=['POST'])
 def chat_with_grok():
     """Chat endpoint with Grok AI - supports function calling for app actions"""
@@ -709,138 +1531,6 @@ def chat_with_grok():
         if not user_message:
             return jsonify({'error': 'No message provided'}), 400
         
-        # Prepare function definitions for Grok
-        functions = [
-            {
-                "name": "upload_photo",
-                "description": "Upload a progress photo. User will provide the photo file.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "description": {
-                            "type": "string",
-                            "description": "Description of the photo (e.g., 'Day 4 progress photo', 'Fish plate')"
-                        }
-                    },
-                    "required": ["description"]
-                }
-            },
-            {
-                "name": "add_day_entry",
-                "description": "Add a new day entry to the transformation log",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "day": {
-                            "type": "integer",
-                            "description": "Day number"
-                        },
-                        "date": {
-                            "type": "string",
-                            "description": "Date in format 'Month Day, Year' (e.g., 'Nov 24, 2025')"
-                        },
-                        "protein": {
-                            "type": "number",
-                            "description": "Protein in grams"
-                        },
-                        "carbs": {
-                            "type": "number",
-                            "description": "Carbs in grams"
-                        },
-                        "fat": {
-                            "type": "number",
-                            "description": "Fat in grams"
-                        },
-                        "kcal": {
-                            "type": "number",
-                            "description": "Calories"
-                        },
-                        "seafood_kg": {
-                            "type": "number",
-                            "description": "Seafood in kilograms"
-                        },
-                        "training": {
-                            "type": "string",
-                            "description": "Training description (e.g., '2hr surfing + gym')"
-                        },
-                        "supplements": {
-                            "type": "string",
-                            "description": "Supplements taken (e.g., 'All', 'All except NAC')"
-                        },
-                        "feeling": {
-                            "type": "string",
-                            "description": "How you felt (e.g., 'Great energy', 'Legendary start')"
-                        },
-                        "notes": {
-                            "type": "string",
-                            "description": "Additional notes"
-                        }
-                    },
-                    "required": ["day", "date", "protein", "carbs", "fat"]
-                }
-            },
-            {
-                "name": "update_day_entry",
-                "description": "Update an existing day entry in the transformation log",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "day": {
-                            "type": "integer",
-                            "description": "Day number to update"
-                        },
-                        "protein": {
-                            "type": "number",
-                            "description": "Updated protein in grams"
-                        },
-                        "carbs": {
-                            "type": "number",
-                            "description": "Updated carbs in grams"
-                        },
-                        "fat": {
-                            "type": "number",
-                            "description": "Updated fat in grams"
-                        },
-                        "kcal": {
-                            "type": "number",
-                            "description": "Updated calories"
-                        },
-                        "seafood_kg": {
-                            "type": "number",
-                            "description": "Updated seafood in kilograms"
-                        },
-                        "training": {
-                            "type": "string",
-                            "description": "Updated training description"
-                        },
-                        "feeling": {
-                            "type": "string",
-                            "description": "Updated feeling"
-                        }
-                    },
-                    "required": ["day"]
-                }
-            },
-            {
-                "name": "get_current_data",
-                "description": "Get current transformation data (baseline, recent days, stats)",
-                "parameters": {
-                    "type": "object",
-                    "properties": {},
-                    "required": []
-                }
-            },
-            {
-                "name": "get_photos",
-                "description": "Get list of uploaded progress photos",
-                "parameters": {
-                    "type": "object",
-                    "properties": {},
-                    "required": []
-                }
-            }
-        ]
-        
         # Get full transformation log context
         loader = TransformationDataLoader()
         baseline = loader.get_baseline()
@@ -1028,7 +1718,7 @@ When adding day entries, use the exact markdown format from the daily template.
                 }
                 
                 # Try new tools format first
-                payload["tools"] = [{"type": "function", "function": f} for f in functions]
+                payload["tools"] = list(_grok_tools())
                 payload["tool_choice"] = "auto"
                 
                 response = requests.post(
@@ -1378,25 +2068,55 @@ def get_advice():
     })
 
 
+def _last_days(metrics: MetricsStore, last: str, param: str = 'last'):
+    """Resolve a dashboard timeframe (7, 30d, all) to the [start, stop) of the last N logged days"""
+    if last == 'all':
+        return 0, len(metrics)
+    days = last[:-1] if last.endswith('d') else last
+    if not days.isdigit() or int(days) <= 0:
+        raise ValueError(f"Invalid {param}={last} (expected e.g. 7d, 30d, 90d or all)")
+    return metrics.last(int(days))
+
+
+def _stats_window(metrics: MetricsStore):
+    """Resolve ?from=&to= (inclusive YYYY-MM-DD) or ?last=30d (last N logged days) to [start, stop)"""
+    last = request.args.get('last')
+    from_date = request.args.get('from')
+    to_date = request.args.get('to')
+    if last:
+        return _last_days(metrics, last)
+    if from_date or to_date:
+        for value in (from_date, to_date):
+            if value:
+                datetime.strptime(value, '%Y-%m-%d')
+        return metrics.date_range(from_date, to_date)
+    return None
+
+
 @app.route('/api/stats')
+@conditional_get
+@prerendered
 def get_stats():
-    """API endpoint for aggregated statistics - public access"""
+    """API endpoint for aggregated statistics - public access
+    
+    Optional window: ?from=YYYY-MM-DD&to=YYYY-MM-DD or ?last=30d (the last 30
+    logged days, like the dashboard timeframes). Every figure is served from
+    the metric prefix sums, so any window costs the same. `trends` holds the
+    7/14/30-day moving averages and EWMA trend of each metric as of the
+    window's last day.
+    """
     try:
-        loader = TransformationDataLoader()
-        daily_logs = loader.get_daily_logs()
+        loader = _request_loader()
+        metrics = loader.get_metrics()
         
-        # Calculate total fish demolished (handle both old and new schema)
-        total_fish_kg = 0
         try:
-            for day in daily_logs:
-                # Handle both old and new schema
-                total_obj = day.get('total', {})
-                fish = total_obj.get('seafoodKg') or total_obj.get('seafood_kg') or day.get('seafoodKg') or day.get('seafood_kg') or 0
-                if fish:
-                    total_fish_kg += float(fish)
-        except Exception as e:
-            print(f"Error calculating total fish: {e}")
-            total_fish_kg = 0
+            window = _stats_window(metrics)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        start, stop = window or (0, len(metrics))
+        
+        # Calculate total fish demolished
+        _, total_fish_kg = metrics.aggregate('seafoodKg', start, stop)
         
         # Get baseline ALT for countdown
         baseline = loader.get_baseline()
@@ -1404,62 +2124,44 @@ def get_stats():
         target_alt = 100  # Countdown to <100
         alt_remaining = max(0, current_alt - target_alt)
         
-        # Initialize stats dict
-        stats = {}
-        
-        # Calculate averages (handle both old and new schema)
-        if daily_logs:
-            try:
-                proteins = []
-                carbs = []
-                fats = []
-                for d in daily_logs:
-                    # Handle both old and new schema
-                    total_obj = d.get('total', {})
-                    if total_obj:
-                        p = total_obj.get('protein') or d.get('protein')
-                        c = total_obj.get('carbs') or d.get('carbs')
-                        f = total_obj.get('fat') or d.get('fat')
-                    else:
-                        p = d.get('protein')
-                        c = d.get('carbs')
-                        f = d.get('fat')
-                    
-                    if p:
-                        proteins.append(float(p))
-                    if c:
-                        carbs.append(float(c))
-                    if f:
-                        fats.append(float(f))
-                
-                seafoods = []
-                for d in daily_logs:
-                    total_obj = d.get('total', {})
-                    fish = total_obj.get('seafoodKg') or total_obj.get('seafood_kg') or d.get('seafoodKg') or d.get('seafood_kg')
-                    if fish:
-                        seafoods.append(float(fish))
-                
-                stats['avg_protein'] = round(sum(proteins) / len(proteins), 1) if proteins else 0
-                stats['avg_carbs'] = round(sum(carbs) / len(carbs), 1) if carbs else 0
-                stats['avg_fat'] = round(sum(fats) / len(fats), 1) if fats else 0
-                stats['avg_seafood'] = round(sum(seafoods) / len(seafoods), 2) if seafoods else 0
-            except Exception as e:
-                print(f"Error calculating averages: {e}")
-                stats['avg_protein'] = 0
-                stats['avg_carbs'] = 0
-                stats['avg_fat'] = 0
-                stats['avg_seafood'] = 0
-        else:
-            stats['avg_protein'] = 0
-            stats['avg_carbs'] = 0
-            stats['avg_fat'] = 0
-            stats['avg_seafood'] = 0
+        # Averages over the days that logged each value (vectorized over the metric columns)
+        avg_protein = metrics.mean('protein', start, stop)
+        avg_carbs = metrics.mean('carbs', start, stop)
+        avg_fat = metrics.mean('fat', start, stop)
+        avg_seafood = metrics.mean('seafoodKg', start, stop)
+        
+        stats = {
+            'avg_protein': round(avg_protein, 1) if avg_protein else 0,
+            'avg_carbs': round(avg_carbs, 1) if avg_carbs else 0,
+            'avg_fat': round(avg_fat, 1) if avg_fat else 0,
+            'avg_seafood': round(avg_seafood, 2) if avg_seafood else 0,
+        }
         
         stats['total_fish_kg'] = round(total_fish_kg, 2)
         stats['alt_current'] = current_alt
         stats['alt_target'] = target_alt
         stats['alt_remaining'] = alt_remaining
         
+        # Moving averages and trend weight as of the last day in the window
+        trends = loader.get_trends()
+        stats['trends_as_of'] = metrics.dates[stop - 1] if stop > start else None
+        stats['trends'] = {name: trends.at(name, stop - 1 if stop > start else -1) for name in METRICS}
+        
+        if window is not None:
+            stats['range'] = {
+                'from': metrics.dates[start] if stop > start else None,
+                'to': metrics.dates[stop - 1] if stop > start else None,
+                'days': max(0, stop - start)
+            }
+            stats['metrics'] = {}
+            for name in METRICS:
+                count, total = metrics.aggregate(name, start, stop)
+                stats['metrics'][name] = {
+                    'avg': round(total / count, 2) if count else None,
+                    'total': round(total, 2),
+                    'days_logged': count
+                }
+        
         return jsonify(stats)
     except Exception as e:
         print(f"Error in /api/stats: {e}")
@@ -1562,6 +2264,21 @@ def update_log():
         }), 500
 
 
+def _record_uploaded_photo(url):
+    """Store the uploaded photo URL in a simple text file for retrieval
+    
+    This is a fallback if Blob list API doesn't work
+    """
+    date = datetime.now().isoformat()
+    try:
+        photos_file = Path('uploaded_photos.txt')
+        with open(photos_file, 'a') as f:
+            f.write(f"{url}|{date}\n")
+    except Exception as e:
+        print(f"Could not save photo URL to file: {e}")
+    _photo_manifest.add(url, date)
+
+
 @app.route('/api/upload-photo', methods=['POST'])
 def upload_photo():
     """Upload photo to Vercel Blob storage - Public access"""
@@ -1592,6 +2309,8 @@ def upload_photo():
                 filepath = upload_folder / filename
                 file.save(filepath)
                 url = f"/static/uploads/{filename}"
+                # Listed from static/uploads on the next rebuild; show it until then
+                _photo_manifest.add(url)
                 return jsonify({'success': True, 'url': url})
             except Exception as e:
                 return jsonify({
@@ -1599,58 +2318,32 @@ def upload_photo():
                     'error': f'Failed to save file locally: {str(e)}'
                 }), 500
         
-        # Try uploading to Vercel Blob
+        # Upload to Vercel Blob, streamed from the request in chunks
         try:
-            import requests
-            
-            filename = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{file.filename}"
-            file_data = file.read()
-            
-            # Use PUT method with filename in URL
-            response = requests.put(
-                f'https://blob.vercel-storage.com/{filename}',
-                data=file_data,
-                headers={
-                    'Authorization': f'Bearer {blob_token}',
-                    'Content-Type': file.content_type or 'image/jpeg'
-                },
-                params={'access': 'public'},
-                timeout=30
-            )
-            
-            if response.status_code == 200:
-                result = response.json()
-                # Vercel Blob returns different formats - handle all possibilities
-                blob_url = (result.get('url') or 
-                           result.get('downloadUrl') or 
-                           result.get('pathname') or
-                           f'https://blob.vercel-storage.com/{filename}')
-                
-                # Ensure full URL
-                if not blob_url.startswith('http'):
-                    blob_url = f'https://blob.vercel-storage.com/{blob_url}'
-                
-                # Store the uploaded photo URL in a simple text file for retrieval
-                # This is a fallback if Blob list API doesn't work
-                try:
-                    photos_file = Path('uploaded_photos.txt')
-                    with open(photos_file, 'a') as f:
-                        f.write(f"{blob_url}|{datetime.now().isoformat()}\n")
-                except Exception as e:
-                    print(f"Could not save photo URL to file: {e}")
-                
-                # Log for debugging
-                print(f"Upload successful: {blob_url}")
-                # Return the URL - client will store it in localStorage
-                return jsonify({
-                    'success': True, 
-                    'url': blob_url,
-                    'filename': filename,
-                    'message': 'Photo uploaded successfully'
-                })
-            else:
-                error_msg = response.text or f"Status {response.status_code}"
-                raise Exception(f"Blob upload failed: {response.status_code} - {error_msg}")
+            try:
+                upload = blob_store.spool(file.stream)
+            except blob_store.UploadTooLarge as e:
+                return jsonify({'success': False, 'error': str(e)}), 413
+            try:
+                result = blob_store.store(blob_token).upload_photo(upload, file.filename, file.content_type)
+            finally:
+                upload.close()
+            blob_url = result['url']
+            
+            if not result['duplicate']:
+                _record_uploaded_photo(blob_url)
+            
+            # Log for debugging
+            print(f"Upload {'skipped (duplicate)' if result['duplicate'] else 'successful'}: "
+                  f"{blob_url} ({result['size']} bytes)")
+            # Return the URL - client will store it in localStorage
+            return jsonify({
+                'success': True, 
+                'url': blob_url,
+                'filename': result['pathname'],
+                'duplicate': result['duplicate'],
+                'message': 'Photo already uploaded' if result['duplicate'] else 'Photo uploaded successfully'
+            })
                 
         except Exception as e:
             error_msg = str(e)
@@ -1666,364 +2359,166 @@ def upload_photo():
         return jsonify({'success': False, 'error': error_msg}), 500
 
 
+@app.route('/api/upload-token', methods=['POST'])
+def upload_token():
+    """Scoped, short-lived token for a direct browser upload of one photo to Vercel Blob
+    
+    Body: {filename, contentType, size, sha256 (optional)}. The browser PUTs the
+    file to `uploadUrl` with `Authorization: Bearer <token>` and
+    `x-content-type: <contentType>`; Blob then calls /api/upload-complete. With
+    a sha256 of content that is already stored, the stored photo is returned
+    ({duplicate: true, url}) and there is nothing to upload.
+    """
+    blob_token = os.getenv('BLOB_READ_WRITE_TOKEN')
+    if not blob_token:
+        return jsonify({'success': False, 'error': 'BLOB_READ_WRITE_TOKEN not set'}), 500
+    
+    body = request.get_json(silent=True) or {}
+    try:
+        grant = blob_store.store(blob_token).grant_upload(
+            body.get('filename'),
+            body.get('contentType'),
+            body.get('size'),
+            sha256=body.get('sha256'),
+            callback_url=os.getenv('UPLOAD_CALLBACK_URL') or url_for('upload_complete', _external=True),
+        )
+    except blob_store.UploadTooLarge as e:
+        return jsonify({'success': False, 'error': str(e)}), 413
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        error_msg = str(e)
+        print(f"Upload token error: {error_msg}")
+        return jsonify({'success': False, 'error': error_msg}), 500
+    
+    response = jsonify({'success': True, **grant})
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+
+@app.route('/api/upload-complete', methods=['POST'])
+def upload_complete():
+    """Vercel Blob callback after a direct browser upload: registers the photo"""
+    blob_token = os.getenv('BLOB_READ_WRITE_TOKEN')
+    if not blob_token:
+        return jsonify({'error': 'BLOB_READ_WRITE_TOKEN not set'}), 500
+    
+    try:
+        photo = blob_store.store(blob_token).complete_upload(
+            request.get_data(), request.headers.get('x-vercel-signature'))
+    except ValueError as e:
+        return jsonify({'error': f'Invalid upload callback: {e}'}), 400
+    if photo is None:
+        return jsonify({'error': 'Invalid signature'}), 403
+    
+    _record_uploaded_photo(photo['url'])
+    print(f"Direct upload registered: {photo['url']} ({photo['size']} bytes)")
+    return jsonify({'success': True, 'url': photo['url']})
+
+
+@app.route('/api/series/<metric>')
+@conditional_get
+@cached_response
+def get_series(metric):
+    """API endpoint for a downsampled chart series of one daily metric - public access
+    
+    ?timeframe=7|30d|all (last N logged days, default all) and ?points=N (default
+    200). Points are picked with Largest-Triangle-Three-Buckets so the chart keeps
+    its shape; responses are cached per query and dataset version. ?trend=sma7|
+    sma14|sma30|ewma adds that day's moving average / trend value to each point.
+    """
+    column = series.SERIES_METRICS.get(metric)
+    if column is None:
+        return jsonify({
+            'error': f'Unknown metric: {metric}',
+            'metrics': sorted(series.SERIES_METRICS)
+        }), 404
+    
+    try:
+        loader = _request_loader()
+        metrics = loader.get_metrics()
+        timeframe = request.args.get('timeframe', 'all')
+        points_arg = request.args.get('points', str(series.DEFAULT_POINTS))
+        trend = request.args.get('trend')
+        try:
+            start, stop = _last_days(metrics, timeframe, 'timeframe')
+            if not points_arg.isdigit() or not 3 <= int(points_arg) <= series.MAX_POINTS:
+                raise ValueError(f"Invalid points={points_arg} (expected 3-{series.MAX_POINTS})")
+            if trend and trend not in TREND_KINDS:
+                raise ValueError(f"Invalid trend={trend} (expected one of {', '.join(TREND_KINDS)})")
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        dates, values = metrics.window(column, start, stop)
+        days = [record.day for record in loader.get_day_records()[start:stop]]
+        data, logged = series.downsample(dates, values, int(points_arg), days)
+        if trend:
+            # Days are 1-based positions in the log, aligned with the trend columns
+            trend_values = loader.get_trends().values(column, trend, start, stop)
+            for point in data:
+                position = point['day'] - 1 - start
+                point['trend'] = trend_values[position] if 0 <= position < len(trend_values) else None
+        return jsonify({
+            'metric': metric,
+            'timeframe': timeframe,
+            'trend': trend,
+            'points': len(data),
+            'logged_points': logged,
+            'series': data
+        })
+    except Exception as e:
+        print(f"Error in /api/series/{metric}: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'error': str(e), 'series': []}), 500
+
 @app.route('/api/training')
+@conditional_get
+@prerendered
+@cached_response
 def get_training_data():
-    """API endpoint to get all training data grouped by exercise - public access"""
+    """API endpoint to get all training data grouped by exercise - public access
+    
+    Optional filters: ?exercise=<name> (canonical name or an alias) and
+    ?category=<body part> limit the response to matching exercises and the
+    days they were trained on.
+    
+    `progressions` carries each exercise's next-weight suggestion, best e1RM
+    and per-session chart points (progression.chart_summary), so the tracker
+    renders every card from this one response.
+    """
     try:
-        loader = TransformationDataLoader()
-        daily_logs = loader.get_daily_logs()
-        
-        # Parse training data from all logs
-        training_data = []
-        
-        for log in daily_logs:
-            date = log.get('date', '')
-            day = log.get('day', 0)
-            training = log.get('training', '')
-            
-            if not training:
-                continue
-            
-            # Handle both string and object formats
-            if isinstance(training, str):
-                # Simple string format - try to extract basic info
-                training_data.append({
-                    'date': date,
-                    'day': day,
-                    'type': 'string',
-                    'content': training,
-                    'exercises': []
-                })
-            elif isinstance(training, dict):
-                # Structured format
-                session = training.get('session', '')
-                workout = training.get('workout', [])
-                
-                exercises = []
-                for exercise_obj in workout:
-                    exercise_name = exercise_obj.get('exercise', '')
-                    sets = exercise_obj.get('sets', [])
-                    notes = exercise_obj.get('notes', '')
-                    
-                    # Preserve all weight fields (both kg and lbs) for later processing
-                    exercises.append({
-                        'name': exercise_name,
-                        'weight_each_side_lbs': exercise_obj.get('weight_each_side_lbs'),
-                        'total_added_weight_lbs': exercise_obj.get('total_added_weight_lbs'),
-                        'weight_each_side_kg': exercise_obj.get('weight_each_side_kg'),
-                        'total_added_weight_kg': exercise_obj.get('total_added_weight_kg'),
-                        'sets': sets,
-                        'notes': notes
-                    })
-                
-                training_data.append({
-                    'date': date,
-                    'day': day,
-                    'type': 'structured',
-                    'session': session,
-                    'exercises': exercises
-                })
-        
-        # Normalize exercise names to group similar exercises together
-        def normalize_exercise_name(name, has_weight_each_side=False):
-            """Normalize exercise names to group similar exercises"""
-            if not name:
-                return name
-            
-            name_lower = name.lower().strip()
-            
-            # Bench press variations - check for dumbbells first
-            if any(x in name_lower for x in ['bench chest press', 'bench press', 'chest press']):
-                # If it has weight_each_side, it's dumbbells (even if named "machine")
-                if has_weight_each_side:
-                    if 'decline' in name_lower:
-                        return 'Decline Bench Press with Dumbbells'
-                    elif 'incline' in name_lower:
-                        return 'Incline Bench Press with Dumbbells'
-                    else:
-                        return 'Bench Press with Dumbbells'
-                # Check if it's a machine (has total_added_weight but no weight_each_side)
-                elif 'machine' in name_lower or 'mts' in name_lower:
-                    if 'decline' in name_lower:
-                        return 'Decline Chest Press Machine'
-                    elif 'incline' in name_lower:
-                        return 'Incline Chest Press Machine'
-                    else:
-                        return 'Chest Press Machine'
-                # If no weight_each_side, it's likely a machine (bench press machine)
-                elif not has_weight_each_side:
-                    if 'decline' in name_lower:
-                        return 'Decline Bench Press Machine'
-                    elif 'incline' in name_lower:
-                        return 'Incline Bench Press Machine'
-                    else:
-                        return 'Bench Press Machine'
-                elif 'decline' in name_lower:
-                    return 'Decline Bench Press'
-                elif 'incline' in name_lower:
-                    return 'Incline Bench Press'
-                else:
-                    return 'Bench Press'
-            
-            # Incline press variations
-            if 'incline' in name_lower and 'press' in name_lower:
-                if has_weight_each_side:
-                    return 'Incline Bench Press with Dumbbells'
-                elif 'machine' in name_lower:
-                    return 'Incline Press Machine'
-                else:
-                    return 'Incline Bench Press'
-            
-            # Chest press variations
-            if 'chest press' in name_lower:
-                if 'decline' in name_lower:
-                    return 'Decline Chest Press'
-                elif 'machine' in name_lower:
-                    return 'Chest Press Machine'
-                else:
-                    return 'Chest Press'
-            
-            # Weighted dips variations
-            if 'weighted dip' in name_lower or 'dip' in name_lower:
-                return 'Weighted Dips'
-            
-            # Biceps variations
-            if 'bicep' in name_lower or 'biceps' in name_lower:
-                if 'curl' in name_lower:
-                    return 'Biceps Curls'
-                else:
-                    return 'Biceps'
-            
-            # Cable work variations
-            if 'cable' in name_lower:
-                if 'fly' in name_lower or 'flies' in name_lower:
-                    return 'Cable Flies'
-                else:
-                    return 'Cable Work'
-            
-            # Pec fly variations
-            if 'pec' in name_lower and 'fly' in name_lower:
-                return 'Pectoral Fly Machine'
-            
-            # Keep original if no match (capitalize first letter)
-            return name.strip().title()
-        
-        # Categorize exercises by body part
-        def categorize_exercise(name):
-            """Categorize exercise by body part"""
-            if not name:
-                return 'Other'
-            
-            name_lower = name.lower().strip()
-            
-            # Arms - check FIRST to catch biceps/triceps before "curl" matches legs
-            if any(x in name_lower for x in ['bicep', 'tricep', 'arm']):
-                return 'Arms'
-            
-            # Leg exercises - check for specific leg movements BEFORE checking "back" keyword
-            # Include deadlift and back squat here
-            if any(x in name_lower for x in ['squat', 'deadlift', 'leg curl', 'leg press', 'leg extension', 'glute', 'hip', 'abductor', 'adductor', 'calf', 'hamstring', 'quad', 'lunge']):
-                return 'Legs'
-            
-            # Chest exercises - check for cable flies and other chest movements
-            if any(x in name_lower for x in ['chest', 'bench', 'press', 'pec', 'fly', 'dip', 'cable']):
-                return 'Chest'
-            
-            # Back exercises - but exclude deadlift and back squat (already handled above)
-            if any(x in name_lower for x in ['row', 'pulldown', 'lat', 'pull-up', 'pullup', 'chin-up']):
-                return 'Back'
-            # Back exercises that don't conflict with legs
-            if 'back' in name_lower and 'squat' not in name_lower and 'deadlift' not in name_lower:
-                return 'Back'
-            
-            # Shoulders
-            if any(x in name_lower for x in ['shoulder', 'lateral', 'rear delt', 'delt', 'overhead']):
-                return 'Shoulders'
-            
-            return 'Other'
-        
-        # Group exercises by normalized name for progression tracking
-        exercise_groups = {}
-        exercise_categories = {}  # Track which category each exercise belongs to
-        
-        for entry in training_data:
-            if entry['type'] == 'structured':
-                for ex in entry['exercises']:
-                    ex_name = ex['name']
-                    if not ex_name:
-                        continue
-                    
-                    # Check if it's dumbbells (has weight_each_side)
-                    has_weight_each_side = bool(ex.get('weight_each_side_lbs') or ex.get('weight_each_side_kg'))
-                    
-                    # Normalize exercise name
-                    normalized_name = normalize_exercise_name(ex_name, has_weight_each_side)
-                    
-                    # Categorize exercise
-                    category = categorize_exercise(normalized_name)
-                    
-                    if normalized_name not in exercise_groups:
-                        exercise_groups[normalized_name] = []
-                        exercise_categories[normalized_name] = category
-                    
-                    # Extract weight info - keep kg as kg, lbs as lbs
-                    weight = None
-                    weight_each_side = None
-                    weight_unit = None
-                    weight_each_side_unit = None
-                    
-                    # Check for lbs values first
-                    if ex.get('total_added_weight_lbs'):
-                        weight = ex['total_added_weight_lbs']
-                        weight_unit = 'lbs'
-                    elif ex.get('weight_each_side_lbs'):
-                        weight_each_side = ex['weight_each_side_lbs']
-                        weight_each_side_unit = 'lbs'
-                        weight = ex['weight_each_side_lbs'] * 2  # Approximate total
-                        weight_unit = 'lbs'
-                    
-                    # Check for kg values - keep as kg (don't convert)
-                    if weight is None:
-                        if ex.get('total_added_weight_kg'):
-                            weight = ex['total_added_weight_kg']
-                            weight_unit = 'kg'
-                        elif ex.get('weight_each_side_kg'):
-                            weight_each_side = ex['weight_each_side_kg']
-                            weight_each_side_unit = 'kg'
-                            weight = ex['weight_each_side_kg'] * 2  # Approximate total
-                            weight_unit = 'kg'
-                    
-                    # Extract sets/reps - handle flexible structures
-                    sets_reps = []
-                    sets_data = ex.get('sets', [])
-                    
-                    # Handle case where sets might be an integer (number of sets) instead of array
-                    if isinstance(sets_data, int):
-                        # If sets is just a number, create placeholder entries
-                        for i in range(sets_data):
-                            sets_reps.append({
-                                'set': i + 1,
-                                'reps': None,
-                                'distance': None,
-                                'weight_each_side_kg': None,
-                                'weight_each_side_lbs': None
-                            })
-                    elif isinstance(sets_data, list):
-                        # Normal case: sets is an array of set objects
-                        # Track first set weight to propagate to subsequent sets if needed
-                        first_set_weight_lbs = None
-                        first_set_weight_kg = None
-                        first_set_weight_each_side_lbs = None
-                        first_set_weight_each_side_kg = None
-                        
-                        for idx, s in enumerate(sets_data):
-                            # Handle case where set item might be a dict or other structure
-                            if isinstance(s, dict):
-                                set_info = {
-                                    'set': s.get('set', 0),
-                                    'reps': s.get('reps'),
-                                    'distance': s.get('distance'),
-                                    'weight_each_side_lbs': s.get('weight_each_side_lbs'),
-                                    'weight_each_side_kg': s.get('weight_each_side_kg'),
-                                    'total_added_weight_lbs': s.get('total_added_weight_lbs'),
-                                    'total_added_weight_kg': s.get('total_added_weight_kg')
-                                }
-                                
-                                # If first set, capture its weight
-                                if idx == 0:
-                                    first_set_weight_lbs = set_info['total_added_weight_lbs'] or set_info['weight_each_side_lbs']
-                                    first_set_weight_kg = set_info['total_added_weight_kg'] or set_info['weight_each_side_kg']
-                                    first_set_weight_each_side_lbs = set_info['weight_each_side_lbs']
-                                    first_set_weight_each_side_kg = set_info['weight_each_side_kg']
-                                
-                                # If set doesn't have weight, try to get from exercise level or first set
-                                has_weight = (set_info['total_added_weight_lbs'] is not None and set_info['total_added_weight_lbs'] > 0) or \
-                                            (set_info['total_added_weight_kg'] is not None and set_info['total_added_weight_kg'] > 0) or \
-                                            (set_info['weight_each_side_lbs'] is not None and set_info['weight_each_side_lbs'] > 0) or \
-                                            (set_info['weight_each_side_kg'] is not None and set_info['weight_each_side_kg'] > 0)
-                                
-                                if not has_weight:
-                                    # First try exercise level weight
-                                    if ex.get('total_added_weight_lbs'):
-                                        set_info['total_added_weight_lbs'] = ex['total_added_weight_lbs']
-                                    elif ex.get('total_added_weight_kg'):
-                                        set_info['total_added_weight_kg'] = ex['total_added_weight_kg']
-                                    elif ex.get('weight_each_side_lbs'):
-                                        set_info['weight_each_side_lbs'] = ex['weight_each_side_lbs']
-                                    elif ex.get('weight_each_side_kg'):
-                                        set_info['weight_each_side_kg'] = ex['weight_each_side_kg']
-                                    # If still no weight, propagate from first set
-                                    elif first_set_weight_lbs:
-                                        set_info['total_added_weight_lbs'] = first_set_weight_lbs
-                                    elif first_set_weight_kg:
-                                        set_info['total_added_weight_kg'] = first_set_weight_kg
-                                    elif first_set_weight_each_side_lbs:
-                                        set_info['weight_each_side_lbs'] = first_set_weight_each_side_lbs
-                                    elif first_set_weight_each_side_kg:
-                                        set_info['weight_each_side_kg'] = first_set_weight_each_side_kg
-                                
-                                sets_reps.append(set_info)
-                            else:
-                                # Fallback: treat as simple value
-                                sets_reps.append({
-                                    'set': len(sets_reps) + 1,
-                                    'reps': s if isinstance(s, (int, float)) else None,
-                                    'distance': None,
-                                    'weight_each_side_kg': None,
-                                    'weight_each_side_lbs': None
-                                })
-                    
-                    exercise_groups[normalized_name].append({
-                        'date': entry['date'],
-                        'day': entry['day'],
-                        'weight_lbs': weight if weight_unit == 'lbs' else None,
-                        'weight_kg': weight if weight_unit == 'kg' else None,
-                        'weight_each_side_lbs': weight_each_side if weight_each_side_unit == 'lbs' else None,
-                        'weight_each_side_kg': weight_each_side if weight_each_side_unit == 'kg' else (ex.get('weight_each_side_kg')),
-                        'total_added_weight_lbs': ex.get('total_added_weight_lbs'),
-                        'total_added_weight_kg': ex.get('total_added_weight_kg'),
-                        'sets_reps': sets_reps,
-                        'notes': ex.get('notes', ''),
-                        'original_name': ex_name  # Keep original for reference
-                    })
-        
-        # Sort each exercise group by date
-        for ex_name in exercise_groups:
-            exercise_groups[ex_name].sort(key=lambda x: x['date'])
-        
-        # Organize exercises by category
-        exercises_by_category = {
-            'Chest': [],
-            'Back': [],
-            'Legs': [],
-            'Shoulders': [],
-            'Arms': [],
-            'Other': []
-        }
-        
-        for ex_name, sessions in exercise_groups.items():
-            category = exercise_categories.get(ex_name, 'Other')
-            if category in exercises_by_category:
-                exercises_by_category[category].append({
-                    'name': ex_name,
-                    'sessions': sessions
-                })
-        
-        # Sort exercises within each category by name
-        for category in exercises_by_category:
-            exercises_by_category[category].sort(key=lambda x: x['name'])
-        
-        # Debug logging
-        print(f"Training API: Found {len(training_data)} training sessions")
-        print(f"Training API: Found {len(exercise_groups)} exercise groups")
-        for category, exercises in exercises_by_category.items():
-            if exercises:
-                print(f"  {category}: {len(exercises)} exercises")
+        loader = _request_loader()
+        index = loader.get_training()
+        training_data = index.training_data
+        exercise_groups = index.exercise_groups
+        
+        exercise = request.args.get('exercise', '').strip()
+        category = request.args.get('category', '').strip()
+        if exercise or category:
+            names = list(exercise_groups)
+            if exercise:
+                match = index.find_exercise(exercise)
+                if match is None:
+                    return jsonify({'error': f'Unknown exercise: {exercise}'}), 404
+                names = [match]
+            if category:
+                wanted = category.lower()
+                if not any(c.lower() == wanted for c in index.exercises_by_category()):
+                    return jsonify({'error': f'Unknown category: {category}'}), 400
+                names = [name for name in names if index.categories.get(name, 'Other').lower() == wanted]
+            exercise_groups = {name: exercise_groups[name] for name in names}
+            dates = {session['date'] for sessions in exercise_groups.values() for session in sessions}
+            training_data = [entry for entry in training_data if entry['date'] in dates]
+            exercises_by_category = index.exercises_by_category(names)
+        else:
+            exercises_by_category = index.exercises_by_category()
         
         return jsonify({
             'training_data': training_data,
             'exercise_groups': exercise_groups,
             'exercises_by_category': exercises_by_category,
+            'progressions': {name: progression.chart_summary(index.progression(name)) for name in exercise_groups},
             'total_sessions': len(training_data)
         })
     except Exception as e:
@@ -2037,19 +2532,32 @@ def get_training_data():
             'total_sessions': 0
         }), 500
 
+@app.route('/api/training/<path:exercise>/progression')
+@conditional_get
+@cached_response
+def get_exercise_progression(exercise):
+    """API endpoint for one exercise's top sets, estimated 1RM, tonnage and next-weight suggestion - public access"""
+    try:
+        loader = _request_loader()
+        index = loader.get_training()
+        name = index.find_exercise(exercise)
+        if name is None:
+            return jsonify({'error': f'Unknown exercise: {exercise}'}), 404
+        return jsonify(index.progression(name))
+    except Exception as e:
+        print(f"Error in /api/training/{exercise}/progression: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/day/<date>')
+@conditional_get
 def get_day_data(date):
     """API endpoint to get full day data for a specific date - public access"""
     try:
-        loader = TransformationDataLoader()
-        daily_logs = loader.get_daily_logs()
-        
-        # Find the day by date
-        day_data = None
-        for log in daily_logs:
-            if log.get('date') == date:
-                day_data = log
-                break
+        loader = _request_loader()
+        record = loader.get_day(date)
+        day_data = record.raw if record is not None else None
         
         if not day_data:
             return jsonify({
@@ -2067,78 +2575,64 @@ def get_day_data(date):
             'date': date
         }), 500
 
+@app.route('/api/days')
+@conditional_get
+@cached_response
+def get_days_range():
+    """API endpoint to get full day data for an inclusive date range - public access
+    
+    ?from=YYYY-MM-DD&to=YYYY-MM-DD (either may be omitted for an open end), so
+    date navigation can prefetch the neighbouring days in one request.
+    """
+    from_date = request.args.get('from')
+    to_date = request.args.get('to')
+    try:
+        for value in (from_date, to_date):
+            if value:
+                datetime.strptime(value, '%Y-%m-%d')
+    except ValueError as e:
+        return jsonify({'error': f'Invalid date: {e}'}), 400
+    if from_date and to_date and from_date > to_date:
+        return jsonify({'error': 'from must not be after to'}), 400
+    
+    try:
+        loader = _request_loader()
+        days = [record.raw for record in loader.get_day_index().between(from_date, to_date)]
+        return jsonify({
+            'from': from_date,
+            'to': to_date,
+            'days': days,
+            'count': len(days)
+        })
+    except Exception as e:
+        print(f"Error in /api/days: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'error': str(e), 'days': []}), 500
+
+@app.route('/api/debug/data-paths')
+def get_data_paths():
+    """Diagnostics: where the master file, daily logs and body scans were resolved to"""
+    _data_paths.resolve()
+    return jsonify({
+        'resolved': _data_paths.diagnostics(),
+        'cwd': str(Path.cwd()),
+        'vercel': os.getenv('VERCEL'),
+        'lambda_task_root': os.getenv('LAMBDA_TASK_ROOT')
+    })
+
 @app.route('/api/body-scans')
+@conditional_get
+@prerendered
+@cached_response
 def get_body_scans():
     """API endpoint to get all body scan data - public access"""
     try:
-        # Try multiple paths for body scans directory
-        vercel_env = os.getenv('VERCEL')
-        scans_dir = None
-        
-        # Strategy: Try multiple possible paths
-        possible_paths = []
-        
-        # Get app root
-        try:
-            app_root = Path(__file__).parent
-        except Exception:
-            app_root = Path.cwd()
-        
-        # If we're in api/ directory, go up one level
-        if app_root.name == 'api':
-            app_root = app_root.parent
-        
-        cwd = Path.cwd()
-        
-        # Build list of possible paths
-        possible_paths.extend([
-            app_root / "api" / "data" / "body-scans",
-            app_root / "public" / "data" / "body-scans",
-            cwd / "api" / "data" / "body-scans",
-            cwd / "public" / "data" / "body-scans",
-            Path("api/data/body-scans"),
-            Path("public/data/body-scans"),
-        ])
-        
-        # On Vercel, also try relative to current working directory
-        if vercel_env == '1':
-            possible_paths.extend([
-                Path("/var/task/api/data/body-scans"),
-                Path("/var/task/public/data/body-scans"),
-            ])
-        
-        print(f"Looking for body-scans directory in:")
-        for path in possible_paths:
-            print(f"  {path} (exists: {path.exists()})")
-        
-        # Find first existing directory
-        for path in possible_paths:
-            if path.exists() and path.is_dir():
-                scans_dir = path
-                print(f"Using scans directory: {scans_dir}")
-                break
-        
-        scans = []
-        
-        if scans_dir and scans_dir.exists():
-            json_files = sorted(scans_dir.glob("*.json"))
-            print(f"Found {len(json_files)} JSON files in {scans_dir}")
-            for json_file in json_files:
-                try:
-                    content = json_file.read_text(encoding='utf-8')
-                    scan_data = json.loads(content)
-                    scans.append(scan_data)
-                    print(f"Loaded scan: {json_file.name} - Date: {scan_data.get('date')}")
-                except Exception as e:
-                    print(f"Error loading {json_file}: {e}")
-                    import traceback
-                    traceback.print_exc()
-                    continue
-        else:
-            print(f"WARNING: Body scans directory not found. Tried: {possible_paths}")
-        
-        # Sort by date
-        scans.sort(key=lambda x: x.get('date', ''))
+        # Scans are ingested incrementally by the dataset cache, already sorted by date
+        loader = _request_loader()
+        if not loader.body_scans_dir:
+            print("WARNING: Body scans directory not found")
+        scans = loader.get_body_scans()
         
         print(f"Returning {len(scans)} scans")
         return jsonify({
@@ -2155,99 +2649,85 @@ def get_body_scans():
             'total': 0
         }), 500
 
+@app.route('/api/body-scans/latest')
+@conditional_get
+@cached_response
+def get_latest_body_scan():
+    """API endpoint to get only the most recent body scan - public access"""
+    try:
+        repository = _request_loader().get_scan_repository()
+        latest = repository.latest() if repository else None
+        if latest is None:
+            return jsonify({'error': 'No body scans found', 'scan': None}), 404
+        return jsonify({
+            'scan': latest,
+            'total': len(repository.scans)
+        })
+    except Exception as e:
+        print(f"Error in /api/body-scans/latest: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'error': str(e), 'scan': None}), 500
+
+@app.route('/api/body-scans/compare')
+@conditional_get
+@cached_response
+def compare_body_scans():
+    """API endpoint comparing two body scans - public access
+    
+    ?a=&b= take a scan date or first/baseline, previous, latest (defaults:
+    a=first, b=latest). Returns both scans and b - a for every measurement.
+    """
+    try:
+        repository = _request_loader().get_scan_repository()
+        if repository is None or not repository.scans:
+            return jsonify({'error': 'No body scans found'}), 404
+        a = repository.resolve(request.args.get('a'), 'first')
+        b = repository.resolve(request.args.get('b'), 'latest')
+        missing = [ref for ref, scan in (('a', a), ('b', b)) if scan is None]
+        if missing:
+            return jsonify({
+                'error': f"Scan not found for {', '.join(f'{ref}={request.args.get(ref)}' for ref in missing)}"
+            }), 404
+        result = dict(repository.compare(a, b))
+        result['total'] = len(repository.scans)
+        return jsonify(result)
+    except Exception as e:
+        print(f"Error in /api/body-scans/compare: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'error': str(e)}), 500
+
+_photo_manifest = PhotoManifest()
+
+
 @app.route('/api/photos')
 def get_photos():
-    """Get list of uploaded photos - public access"""
+    """Get list of uploaded photos - public access
+    
+    Served from the cached photo manifest (see photo_manifest.py). Optional
+    limit=N&cursor=<next_cursor> pages through it, newest first.
+    """
     try:
-        photos = []
-        blob_token = os.getenv('BLOB_READ_WRITE_TOKEN')
-        
-        # Try to list from Vercel Blob if token is available
-        if blob_token:
-            try:
-                import requests
-                # Vercel Blob list endpoint - try different possible formats
-                # First try: GET /list
-                response = requests.get(
-                    'https://blob.vercel-storage.com/list',
-                    headers={'Authorization': f'Bearer {blob_token}'},
-                    params={'limit': 100},
-                    timeout=10
-                )
-                
-                if response.status_code == 200:
-                    blob_data = response.json()
-                    # Handle different response formats
-                    blobs_list = []
-                    if isinstance(blob_data, list):
-                        blobs_list = blob_data
-                    elif 'blobs' in blob_data:
-                        blobs_list = blob_data['blobs']
-                    elif 'data' in blob_data:
-                        blobs_list = blob_data['data']
-                    
-                    for blob in blobs_list:
-                        # Get URL - try different possible fields
-                        url = (blob.get('url') or 
-                               blob.get('downloadUrl') or 
-                               blob.get('pathname') or
-                               blob.get('key'))
-                        
-                        if url:
-                            # Construct full URL if it's just a pathname
-                            if not url.startswith('http'):
-                                url = f'https://blob.vercel-storage.com/{url}'
-                            
-                            photos.append({
-                                'url': url,
-                                'date': (blob.get('uploadedAt') or 
-                                        blob.get('createdAt') or 
-                                        blob.get('uploaded') or
-                                        datetime.now().isoformat())
-                            })
-                else:
-                    print(f"Blob list API returned {response.status_code}: {response.text}")
-            except Exception as e:
-                print(f"Error fetching from Blob: {e}")
-                import traceback
-                traceback.print_exc()
-        
-        # Also check local uploads folder (development/fallback)
-        upload_folder = Path('static/uploads')
-        if upload_folder.exists():
-            for file in upload_folder.glob('*'):
-                if file.suffix.lower() in ['.jpg', '.jpeg', '.png', '.gif', '.webp']:
-                    photos.append({
-                        'url': f"/static/uploads/{file.name}",
-                        'date': datetime.fromtimestamp(file.stat().st_mtime).isoformat()
-                    })
-        
-        # Also check the simple text file with uploaded URLs (fallback)
-        photos_file = Path('uploaded_photos.txt')
-        if photos_file.exists():
-            try:
-                with open(photos_file, 'r') as f:
-                    for line in f:
-                        line = line.strip()
-                        if '|' in line:
-                            url, date = line.split('|', 1)
-                            # Only add if not already in photos list
-                            if not any(p.get('url') == url for p in photos):
-                                photos.append({
-                                    'url': url,
-                                    'date': date
-                                })
-            except Exception as e:
-                print(f"Error reading photos file: {e}")
-        
-        # Sort by date, newest first
-        photos.sort(key=lambda x: x['date'], reverse=True)
-        print(f"Returning {len(photos)} photos")
-        return jsonify({'photos': photos})
+        limit_arg = request.args.get('limit')
+        cursor = request.args.get('cursor')
+        if not limit_arg and not cursor:
+            photos = _photo_manifest.photos()
+            return jsonify({'photos': photos, 'total': len(photos)})
+        
+        limit = MAX_PAGE_SIZE
+        if limit_arg:
+            if not limit_arg.isdigit() or int(limit_arg) <= 0:
+                return jsonify({'photos': [], 'error': f"Invalid limit={limit_arg} (expected a positive integer)"}), 400
+            limit = min(int(limit_arg), MAX_PAGE_SIZE)
+        try:
+            photos, next_cursor, total = _photo_manifest.page(limit, cursor)
+        except ValueError as e:
+            return jsonify({'photos': [], 'error': str(e)}), 400
+        return jsonify({'photos': photos, 'next_cursor': next_cursor, 'total': total})
     except Exception as e:
         return jsonify({'photos': [], 'error': str(e)})
 
-
 if __name__ == '__main__':
     # Use PORT from environment (for production) or default to 5001 (local dev)
     port = int(os.getenv('PORT', 5001))
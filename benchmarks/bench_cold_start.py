@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark for the Vercel entry point (api/index.py).
+
+Each run is a fresh interpreter started with `-X importtime` and
+COLD_START_MODE=1. It imports the entry point, then times the first
+/api/data request (dataset load included). Bytecode is compiled beforehand
+so runs measure imports, not compilation. Reports the median of the runs
+and the modules with the largest self import time, and exits 1 when the
+median import or first-request time exceeds its budget.
+
+Usage: python benchmarks/bench_cold_start.py [runs] [import budget ms] [first request budget ms]
+(budgets also from COLD_START_IMPORT_BUDGET_MS / COLD_START_REQUEST_BUDGET_MS)
+"""
+
+import compileall
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Generous enough for a loaded CI machine; a regression like an eager NumPy or
+# requests import at module level still trips them
+DEFAULT_IMPORT_BUDGET_MS = 250
+DEFAULT_REQUEST_BUDGET_MS = 100
+
+CHILD = """
+import io, contextlib, json, sys, time
+sys.path.insert(0, 'api')
+start = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+    import index
+imported = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+    response = index.app.test_client().get('/api/data')
+done = time.perf_counter()
+print(json.dumps({
+    'import_ms': (imported - start) * 1000,
+    'request_ms': (done - imported) * 1000,
+    'status': response.status_code,
+    'numpy': 'numpy' in sys.modules,
+    'requests': 'requests' in sys.modules,
+}))
+"""
+
+
+def parse_importtime(stderr: str) -> list:
+    """[(self us, cumulative us, module)] from `-X importtime` output"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, module = line[len('import time:'):].split('|')
+        rows.append((int(self_us), int(cumulative_us), module.strip()))
+    return rows
+
+
+def run_once() -> tuple:
+    env = dict(os.environ, COLD_START_MODE='1', PYTHONDONTWRITEBYTECODE='1')
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', CHILD],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    return timings, parse_importtime(result.stderr)
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    import_budget = float(sys.argv[2]) if len(sys.argv) > 2 else float(
+        os.getenv('COLD_START_IMPORT_BUDGET_MS', DEFAULT_IMPORT_BUDGET_MS))
+    request_budget = float(sys.argv[3]) if len(sys.argv) > 3 else float(
+        os.getenv('COLD_START_REQUEST_BUDGET_MS', DEFAULT_REQUEST_BUDGET_MS))
+
+    compileall.compile_dir(str(ROOT), quiet=1, maxlevels=1)
+    compileall.compile_dir(str(ROOT / 'api'), quiet=1, maxlevels=0)
+
+    samples, modules = [], []
+    for _ in range(runs):
+        timings, modules = run_once()
+        if timings['status'] != 200:
+            print(f"/api/data returned {timings['status']}")
+            return 1
+        samples.append(timings)
+
+    import_ms = statistics.median(s['import_ms'] for s in samples)
+    request_ms = statistics.median(s['request_ms'] for s in samples)
+    print(f"{runs} cold starts of api/index.py (COLD_START_MODE=1)")
+    print(f"{'import':<24}{import_ms:>9.1f} ms  (budget {import_budget:.0f} ms)")
+    print(f"{'first /api/data':<24}{request_ms:>9.1f} ms  (budget {request_budget:.0f} ms)")
+    print(f"numpy loaded: {samples[-1]['numpy']}, requests loaded: {samples[-1]['requests']}")
+    print("largest self import times (last run):")
+    for self_us, cumulative_us, module in sorted(modules, reverse=True)[:10]:
+        print(f"  {module:<40}{self_us / 1000:>8.1f} ms self{cumulative_us / 1000:>9.1f} ms cumulative")
+
+    failed = []
+    if import_ms > import_budget:
+        failed.append(f"import {import_ms:.1f} ms > {import_budget:.0f} ms")
+    if request_ms > request_budget:
+        failed.append(f"first request {request_ms:.1f} ms > {request_budget:.0f} ms")
+    if failed:
+        print("OVER BUDGET: " + "; ".join(failed))
+        return 1
+    print("within budget")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
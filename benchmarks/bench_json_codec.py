@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark the JSON codec backends on a synthetic multi-year dataset.
+
+Clones the newest real daily log once per day for N years into a temp
+directory, then times, for every installed backend, decoding all the files
+(ingest) and encoding an /api/data-shaped payload with sorted keys (responses).
+
+Usage: python benchmarks/bench_json_codec.py [years] [repeats]
+"""
+
+import copy
+import json
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import json_codec  # noqa: E402
+
+TEMPLATE_DIRS = [Path('api/data/daily-logs'), Path('data/daily-logs'), Path('public/data/daily-logs')]
+
+
+def load_template() -> dict:
+    root = Path(__file__).resolve().parent.parent
+    for directory in TEMPLATE_DIRS:
+        files = sorted((root / directory).glob('*.json'))
+        if files:
+            return json.loads(files[-1].read_text())
+    raise FileNotFoundError("No daily log found to use as a template")
+
+
+def write_dataset(directory: Path, years: int) -> list:
+    template = load_template()
+    start = date(2025, 1, 1)
+    paths = []
+    for i in range(years * 365):
+        day = copy.deepcopy(template)
+        day['date'] = (start + timedelta(days=i)).isoformat()
+        day['fastedWeight'] = round(95 - i * 0.01, 1)
+        path = directory / f"{day['date']}.json"
+        path.write_text(json.dumps(day, indent=2))
+        paths.append(path)
+    return paths
+
+
+def best_of(repeats: int, fn) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    years = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = write_dataset(Path(tmp), years)
+        blobs = [path.read_bytes() for path in paths]
+        size_mb = sum(len(blob) for blob in blobs) / 1e6
+        print(f"{len(paths)} daily logs, {size_mb:.1f} MB")
+
+        payload = {'daily_logs': [json.loads(blob) for blob in blobs], 'streak': len(blobs)}
+        results = {}
+        for name, codec in json_codec.available_codecs().items():
+            decode = best_of(repeats, lambda: [codec.loads(blob) for blob in blobs])
+            encode = best_of(repeats, lambda: codec.dumps(payload, sort_keys=True))
+            results[name] = (decode, encode)
+
+        stdlib = sum(results['stdlib'])
+        print(f"{'backend':<10}{'decode ms':>12}{'encode ms':>12}{'vs stdlib':>12}")
+        for name, (decode, encode) in results.items():
+            print(f"{name:<10}{decode * 1000:>12.1f}{encode * 1000:>12.1f}{stdlib / (decode + encode):>11.1f}x")
+        print(f"default backend: {json_codec.BACKEND}")
+
+if __name__ == '__main__':
+    main()
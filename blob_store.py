@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+"""
+Streaming uploads to Vercel Blob.
+
+Photos are never held in memory as a whole:
+
+- the incoming stream is hashed (SHA-256) in fixed-size chunks. A seekable
+  stream (werkzeug already spools large form uploads to disk) is hashed in
+  place; anything else is copied to a temporary file while hashing;
+- blobs are stored under a content-addressed prefix
+  (photos/<sha256[:20]>/...), so a duplicate is found with a single
+  prefix listing and not uploaded again;
+- the body is sent straight from the file, in READ_CHUNK blocks, as one PUT
+  up to MULTIPART_THRESHOLD and as a multipart upload of PART_SIZE parts
+  above it.
+
+Browsers can also upload straight to Blob, without the bytes passing
+through the app: BlobStore.grant_upload signs a client token scoped to one
+pathname, the declared size and content type, valid for CLIENT_TOKEN_TTL
+seconds, and Blob calls back (signed with the read-write token) once the
+upload is stored; BlobStore.complete_upload verifies that callback. The app
+never sees those bytes, so a hash the browser declares is only used to look
+for an already stored copy: direct uploads go under DIRECT_PREFIX, not a
+content-addressed path, and are never used as a duplicate target.
+
+BLOB_API_URL points the client at another server, e.g. fake_blob_server.py
+for local development. It is read when a client is created, not at import.
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import BinaryIO, Dict, Iterable, Optional, Tuple
+
+DEFAULT_BLOB_API_URL = 'https://blob.vercel-storage.com'
+
+# Bytes read from the client or the spool file at a time
+READ_CHUNK = 64 * 1024
+# Multipart part size (Blob, like S3, needs at least 5 MB per part but the last)
+PART_SIZE = 8 * 1024 * 1024
+MULTIPART_THRESHOLD = int(os.getenv('BLOB_MULTIPART_THRESHOLD', PART_SIZE))
+# Refuse to spool more than this
+MAX_UPLOAD_BYTES = int(os.getenv('MAX_UPLOAD_BYTES', 50 * 1024 * 1024))
+
+PHOTO_PREFIX = 'photos/'
+# Direct browser uploads: content not hashed by the app, so not content-addressed
+DIRECT_PREFIX = 'photos/direct/'
+
+# Browser uploads: content types a client token may allow, and its lifetime
+PHOTO_CONTENT_TYPES = ('image/jpeg', 'image/png', 'image/gif', 'image/webp', 'image/heic', 'image/heif')
+CLIENT_TOKEN_TTL = int(os.getenv('BLOB_CLIENT_TOKEN_TTL', 60))
+CLIENT_TOKEN_PREFIX = 'vercel_blob_client_'
+UPLOAD_COMPLETED = 'blob.upload-completed'
+
+
+class BlobError(Exception):
+    """The Blob API rejected a request"""
+
+
+class UploadTooLarge(ValueError):
+    pass
+
+
+class SpooledUpload:
+    """An upload's body as a seekable file, with its size and SHA-256"""
+
+    def __init__(self, file: BinaryIO, size: int, sha256: str, owned: bool):
+        self.file = file
+        self.size = size
+        self.sha256 = sha256
+        self._owned = owned
+
+    def close(self):
+        if self._owned:
+            self.file.close()
+
+
+def blob_api_url() -> str:
+    """The Blob API base URL: BLOB_API_URL, or Vercel Blob itself"""
+    return os.getenv('BLOB_API_URL', DEFAULT_BLOB_API_URL).rstrip('/')
+
+
+def _seekable(stream) -> bool:
+    try:
+        return stream.seekable()
+    except (AttributeError, ValueError):
+        return False
+
+
+def spool(stream: BinaryIO, max_bytes: Optional[int] = None, length: Optional[int] = None) -> SpooledUpload:
+    """Hash `stream` in READ_CHUNK pieces, keeping it (or a disk copy) for the upload
+
+    `length` bounds the read for streams without an end of their own, like a
+    request socket with a Content-Length. `max_bytes` defaults to
+    MAX_UPLOAD_BYTES.
+    """
+    if max_bytes is None:
+        max_bytes = MAX_UPLOAD_BYTES
+    if length is not None and length > max_bytes:
+        raise UploadTooLarge(f"upload exceeds {max_bytes} bytes")
+    digest = hashlib.sha256()
+    size = 0
+    if length is None and _seekable(stream):
+        start = stream.tell()
+        target, owned = stream, False
+    else:
+        target, owned = tempfile.TemporaryFile(), True
+    try:
+        while True:
+            want = READ_CHUNK if length is None else min(READ_CHUNK, length - size)
+            chunk = stream.read(want) if want > 0 else b''
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > max_bytes:
+                raise UploadTooLarge(f"upload exceeds {max_bytes} bytes")
+            digest.update(chunk)
+            if owned:
+                target.write(chunk)
+        if length is not None and size != length:
+            raise ValueError(f"upload ended after {size} of {length} bytes")
+        target.seek(0 if owned else start)
+    except Exception:
+        if owned:
+            target.close()
+        raise
+    return SpooledUpload(target, size, digest.hexdigest(), owned)
+
+
+class _FileSlice:
+    """`length` bytes of a file from its current position, read in blocks by the HTTP client"""
+
+    def __init__(self, file: BinaryIO, length: int):
+        self._file = file
+        self._left = length
+        self._length = length
+
+    def __len__(self) -> int:
+        return self._length
+
+    def read(self, size: int = -1) -> bytes:
+        if self._left <= 0:
+            return b''
+        size = self._left if size is None or size < 0 else min(size, self._left)
+        data = self._file.read(min(size, READ_CHUNK))
+        self._left -= len(data)
+        return data
+
+
+def safe_filename(filename: Optional[str]) -> str:
+    name = os.path.basename(filename or '') or 'photo.jpg'
+    return re.sub(r'[^A-Za-z0-9._-]+', '_', name)
+
+
+def photo_pathname(key: str, filename: Optional[str], prefix: str = PHOTO_PREFIX) -> str:
+    """<prefix><key[:20]>/<timestamp>_<name>; `key` is the content hash under PHOTO_PREFIX"""
+    return f"{prefix}{key[:20]}/{datetime.now().strftime('%Y%m%d_%H%M%S')}_{safe_filename(filename)}"
+
+
+def signature(token: str, data: bytes) -> str:
+    """HMAC-SHA256 of `data` keyed with a read-write token (client tokens, callbacks)"""
+    return hmac.new(token.encode(), data, hashlib.sha256).hexdigest()
+
+
+def _store_id(token: str) -> str:
+    # vercel_blob_rw_<store id>_<secret>
+    parts = token.split('_')
+    return parts[3] if len(parts) > 3 else 'local'
+
+
+def client_token(token: str, pathname: str, maximum_size: int, content_types: Iterable[str],
+                 valid_until_ms: int, callback_url: Optional[str] = None,
+                 token_payload: Optional[str] = None) -> str:
+    """A client token allowing one upload of `pathname` within the given limits
+
+    Same format as @vercel/blob's generateClientTokenFromReadWriteToken: a
+    base64 JSON payload, prefixed with its signature.
+    """
+    claims = {
+        'pathname': pathname,
+        'maximumSizeInBytes': maximum_size,
+        'allowedContentTypes': list(content_types),
+        'validUntil': valid_until_ms,
+        'addRandomSuffix': False,
+    }
+    if callback_url:
+        claims['onUploadCompleted'] = {'callbackUrl': callback_url, 'tokenPayload': token_payload}
+    payload = base64.b64encode(json.dumps(claims, separators=(',', ':')).encode()).decode()
+    secured = f"{signature(token, payload.encode())}.{payload}"
+    return f"{CLIENT_TOKEN_PREFIX}{_store_id(token)}_{base64.b64encode(secured.encode()).decode()}"
+
+
+def read_client_token(token: str, client: str) -> Optional[Dict]:
+    """The claims of a client token signed with `token`; None if it isn't one (expiry is not checked)"""
+    prefix = f"{CLIENT_TOKEN_PREFIX}{_store_id(token)}_"
+    if not client.startswith(prefix):
+        return None
+    try:
+        signed, payload = base64.b64decode(client[len(prefix):]).decode().split('.', 1)
+        if not hmac.compare_digest(signed, signature(token, payload.encode())):
+            return None
+        return json.loads(base64.b64decode(payload))
+    except ValueError:
+        return None
+
+
+class BlobStore:
+    """Minimal Vercel Blob REST client: put, multipart upload and prefix listing"""
+
+    # sha256 -> upload result, so repeated uploads in one process skip the lookup too
+    KNOWN_MAX = 1024
+
+    def __init__(self, token: str, api_url: Optional[str] = None):
+        self.token = token
+        self.api_url = (api_url or blob_api_url()).rstrip('/')
+        self._lock = threading.Lock()
+        self._known: "OrderedDict[str, Dict]" = OrderedDict()
+
+    def _headers(self, **extra) -> Dict[str, str]:
+        headers = {'Authorization': f'Bearer {self.token}'}
+        headers.update(extra)
+        return headers
+
+    @staticmethod
+    def _check(response, action: str) -> Dict:
+        if response.status_code != 200:
+            raise BlobError(f"{action} failed: {response.status_code} - {response.text or 'no body'}")
+        return response.json()
+
+    def list(self, prefix: Optional[str] = None, limit: int = 1000, cursor: Optional[str] = None,
+             timeout: float = 10) -> Dict:
+        """One page of blobs: {blobs, cursor, hasMore}"""
+        import requests
+        params = {'limit': limit}
+        if prefix:
+            params['prefix'] = prefix
+        if cursor:
+            params['cursor'] = cursor
+        response = requests.get(self.api_url, headers=self._headers(), params=params, timeout=timeout)
+        return self._check(response, 'Blob list')
+
+    def find_duplicate(self, sha256: str) -> Optional[Dict]:
+        """The stored blob with this content, if any"""
+        with self._lock:
+            known = self._known.get(sha256)
+        if known is not None:
+            return known
+        blobs = self.list(prefix=f"{PHOTO_PREFIX}{sha256[:20]}/", limit=1).get('blobs') or []
+        return blobs[0] if blobs else None
+
+    def put(self, pathname: str, upload: SpooledUpload, content_type: str, timeout: float = 60) -> Dict:
+        """Single-request upload, streamed from the spooled file"""
+        import requests
+        response = requests.put(
+            f'{self.api_url}/{pathname}',
+            data=_FileSlice(upload.file, upload.size),
+            headers=self._headers(**{'Content-Type': content_type, 'Content-Length': str(upload.size)}),
+            params={'access': 'public'},
+            timeout=timeout,
+        )
+        return self._check(response, 'Blob upload')
+
+    def put_multipart(self, pathname: str, upload: SpooledUpload, content_type: str,
+                      part_size: Optional[int] = None, timeout: float = 60) -> Dict:
+        """Multipart upload: create, one request per part (PART_SIZE by default), complete"""
+        import requests
+        part_size = part_size or PART_SIZE
+        url = f'{self.api_url}/mpu'
+        params = {'pathname': pathname, 'access': 'public'}
+        created = self._check(requests.post(
+            url, params=params, timeout=timeout,
+            headers=self._headers(**{'x-mpu-action': 'create', 'x-content-type': content_type}),
+        ), 'Blob multipart create')
+        ids = {'x-mpu-key': created['key'], 'x-mpu-upload-id': created['uploadId']}
+
+        parts = []
+        offset = 0
+        while offset < upload.size:
+            length = min(part_size, upload.size - offset)
+            number = len(parts) + 1
+            part = self._check(requests.post(
+                url, params=params, timeout=timeout,
+                data=_FileSlice(upload.file, length),
+                headers=self._headers(**ids, **{
+                    'x-mpu-action': 'upload', 'x-mpu-part-number': str(number),
+                    'Content-Length': str(length),
+                }),
+            ), f'Blob multipart part {number}')
+            parts.append({'partNumber': number, 'etag': part['etag']})
+            offset += length
+
+        return self._check(requests.post(
+            url, params=params, timeout=timeout, json=parts,
+            headers=self._headers(**ids, **{'x-mpu-action': 'complete', 'x-content-type': content_type}),
+        ), 'Blob multipart complete')
+
+    def upload_photo(self, upload: SpooledUpload, filename: Optional[str],
+                     content_type: Optional[str]) -> Dict:
+        """Store a spooled photo unless identical content is already stored
+
+        Returns {url, pathname, sha256, size, duplicate}.
+        """
+        existing = self.find_duplicate(upload.sha256)
+        if existing is not None:
+            return self._remember(upload.sha256, upload.size, existing, duplicate=True)
+
+        content_type = content_type or 'image/jpeg'
+        pathname = photo_pathname(upload.sha256, filename)
+        if upload.size > MULTIPART_THRESHOLD:
+            result = self.put_multipart(pathname, upload, content_type)
+        else:
+            result = self.put(pathname, upload, content_type)
+        result.setdefault('pathname', pathname)
+        return self._remember(upload.sha256, upload.size, result, duplicate=False)
+
+    def grant_upload(self, filename: Optional[str], content_type: Optional[str], size,
+                     sha256: Optional[str] = None, callback_url: Optional[str] = None,
+                     ttl: int = CLIENT_TOKEN_TTL) -> Dict:
+        """A direct browser upload of one photo: {duplicate, pathname, uploadUrl, token, contentType, expiresAt}
+
+        The token only allows a PUT of `pathname`, of at most `size` bytes and
+        of `content_type`, for `ttl` seconds. With the photo's `sha256`, an
+        already stored copy is returned instead ({duplicate: True, url, pathname}).
+        The hash is the browser's claim, so it only selects a lookup: the new
+        blob goes under DIRECT_PREFIX with a random key. Raises ValueError for an unsupported type or bad size or hash, and
+        UploadTooLarge above MAX_UPLOAD_BYTES.
+        """
+        if content_type not in PHOTO_CONTENT_TYPES:
+            raise ValueError(f"unsupported content type: {content_type}")
+        if not isinstance(size, int) or isinstance(size, bool) or size <= 0:
+            raise ValueError("size must be a positive number of bytes")
+        if size > MAX_UPLOAD_BYTES:
+            raise UploadTooLarge(f"upload exceeds {MAX_UPLOAD_BYTES} bytes")
+        if sha256 is not None:
+            sha256 = str(sha256).lower()
+            if not re.fullmatch(r'[0-9a-f]{64}', sha256):
+                raise ValueError("sha256 must be 64 hex digits")
+            existing = self.find_duplicate(sha256)
+            if existing is not None:
+                return self._remember(sha256, size, existing, duplicate=True)
+
+        pathname = photo_pathname(uuid.uuid4().hex, filename, DIRECT_PREFIX)
+        expires_at = int((time.time() + ttl) * 1000)
+        token_payload = json.dumps({'size': size})
+        return {
+            'duplicate': False,
+            'pathname': pathname,
+            'uploadUrl': f'{self.api_url}/{pathname}',
+            'token': client_token(self.token, pathname, size, [content_type], expires_at,
+                                  callback_url, token_payload),
+            'contentType': content_type,
+            'expiresAt': expires_at,
+        }
+
+    def complete_upload(self, body: bytes, signed: Optional[str]) -> Optional[Dict]:
+        """The photo from a Blob upload-completed callback: {url, pathname, sha256, size, duplicate}
+
+        None when the callback isn't signed with this store's token. Raises
+        ValueError for a malformed or different event. The content was never
+        hashed here, so `sha256` is None and the photo is not remembered as a
+        duplicate target.
+        """
+        if not signed or not hmac.compare_digest(signed, signature(self.token, body)):
+            return None
+        event = json.loads(body)
+        if event.get('type') != UPLOAD_COMPLETED:
+            raise ValueError(f"unexpected callback type: {event.get('type')}")
+        payload = event.get('payload') or {}
+        blob = payload.get('blob') or {}
+        claims = json.loads(payload.get('tokenPayload') or '{}')
+        return self._remember(None, blob.get('size') or claims.get('size'), blob, duplicate=False)
+
+    def _remember(self, sha256: Optional[str], size: Optional[int], blob: Dict, duplicate: bool) -> Dict:
+        url = blob.get('url') or blob.get('downloadUrl') or blob.get('pathname')
+        # Ensure full URL
+        if url and not url.startswith('http'):
+            url = f'{self.api_url}/{url}'
+        result = {
+            'url': url,
+            'pathname': blob.get('pathname'),
+            'sha256': sha256,
+            'size': size,
+            'duplicate': duplicate,
+        }
+        if sha256:
+            with self._lock:
+                self._known[sha256] = {'url': url, 'pathname': blob.get('pathname')}
+                self._known.move_to_end(sha256)
+                while len(self._known) > self.KNOWN_MAX:
+                    self._known.popitem(last=False)
+        return result
+
+
+_stores: Dict[Tuple[str, str], BlobStore] = {}
+
+
+def store(token: str) -> BlobStore:
+    """The shared client for a token and the current BLOB_API_URL (keeps its duplicate cache across requests)"""
+    api_url = blob_api_url()
+    client = _stores.get((token, api_url))
+    if client is None:
+        client = _stores.setdefault((token, api_url), BlobStore(token, api_url))
+    return client
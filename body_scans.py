@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Body scan (DEXA / InBody) repository.
+
+Scan files are ingested through the same incremental, mtime-validated
+JsonDirectoryIndex as the daily logs, kept sorted by date, and indexed by
+date. Comparisons between two scans (numeric deltas of every measurement,
+including the segmental breakdowns) are computed once per pair and dropped
+whenever a scan file changes, so the dashboard rings can load a two-scan
+payload instead of the whole history.
+"""
+
+import threading
+from datetime import date
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from data_watcher import JsonDirectoryIndex
+
+def _number(value) -> Optional[float]:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return value
+
+
+def _delta(before, after) -> Optional[Dict]:
+    before, after = _number(before), _number(after)
+    if before is None and after is None:
+        return None
+    delta = round(after - before, 3) if before is not None and after is not None else None
+    percent = round(delta / before * 100, 2) if delta is not None and before else None
+    return {'a': before, 'b': after, 'delta': delta, 'percent': percent}
+
+
+def scan_deltas(a: Dict, b: Dict) -> Dict[str, Dict]:
+    """{field: {a, b, delta, percent}} for every numeric field of two scans
+
+    Nested groups (segmental_lean, segmental_fat_percent) are flattened to
+    dotted names. Fields missing from both scans are left out.
+    """
+    deltas = {}
+    for field in sorted(set(a) | set(b)):
+        before, after = a.get(field), b.get(field)
+        if isinstance(before, dict) or isinstance(after, dict):
+            before = before if isinstance(before, dict) else {}
+            after = after if isinstance(after, dict) else {}
+            for part in sorted(set(before) | set(after)):
+                delta = _delta(before.get(part), after.get(part))
+                if delta is not None:
+                    deltas[f'{field}.{part}'] = delta
+            continue
+        delta = _delta(before, after)
+        if delta is not None:
+            deltas[field] = delta
+    return deltas
+
+
+class BodyScanRepository:
+    """Date-sorted body scans with incremental reloads and cached comparisons"""
+
+    def __init__(self, directory: Path, load: Callable[[Path], Optional[Dict]]):
+        self.directory = Path(directory)
+        self.index = JsonDirectoryIndex(self.directory, load)
+        self._lock = threading.Lock()
+        self.scans: List[Dict] = []
+        self._by_date: Dict[str, Dict] = {}
+        self._comparisons: Dict[Tuple[str, str], Dict] = {}
+
+    def refresh(self) -> bool:
+        """Pick up added, modified or deleted scan files; True if anything changed"""
+        if self.index.refresh() is None:
+            return False
+        scans = sorted(self.index.records, key=lambda x: x.get('date', ''))
+        with self._lock:
+            self.scans = scans
+            self._by_date = {}
+            for scan in scans:
+                self._by_date.setdefault(scan.get('date', ''), scan)
+            self._comparisons = {}
+        return True
+
+    @property
+    def signature(self) -> Tuple:
+        return self.index.signature
+
+    @property
+    def last_modified_ns(self) -> int:
+        return self.index.last_modified_ns
+
+    def latest(self) -> Optional[Dict]:
+        scans = self.scans
+        return scans[-1] if scans else None
+
+    def get(self, date: str) -> Optional[Dict]:
+        return self._by_date.get(date)
+
+    def resolve(self, ref: Optional[str], default: str) -> Optional[Dict]:
+        """A scan by date or by alias (first/baseline, previous, latest)"""
+        ref = (ref or default).strip().lower()
+        scans = self.scans
+        if ref in ('first', 'baseline'):
+            return scans[0] if scans else None
+        if ref == 'latest':
+            return scans[-1] if scans else None
+        if ref == 'previous':
+            return scans[-2] if len(scans) > 1 else None
+        return self.get(ref)
+
+    def compare(self, a: Dict, b: Dict) -> Dict:
+        """Both scans and their field deltas (b - a), computed once per pair"""
+        key = (a.get('date', ''), b.get('date', ''))
+        with self._lock:
+            cached = self._comparisons.get(key)
+            if cached is not None and cached['a'] is a and cached['b'] is b:
+                return cached
+        result = {
+            'a': a,
+            'b': b,
+            'days_between': self._days_between(key[0], key[1]),
+            'deltas': scan_deltas(a, b),
+        }
+        with self._lock:
+            self._comparisons[key] = result
+        return result
+
+    @staticmethod
+    def _days_between(a: str, b: str) -> Optional[int]:
+        try:
+            return (date.fromisoformat(b) - date.fromisoformat(a)).days
+        except (TypeError, ValueError):
+            return None
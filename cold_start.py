@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Cold-start mode for the serverless entry point.
+
+api/index.py turns it on (COLD_START_MODE=1, unless the environment already
+sets it; set 0 to get the full diagnostics back). In this mode:
+
+- ingest logging is one summary line instead of one line per file, and the
+  data-path probe logs one line instead of a listing;
+- templates are loaded from Python modules precompiled by
+  `python cold_start.py` (compiled_templates/) whenever they match the
+  current template sources and were compiled by the installed Jinja
+  version, instead of being parsed and compiled on first render. The
+  modules are a build artifact, generated by the Render build and deploy.sh
+  rather than tracked in git; without them (a Vercel git build has no build
+  step) templates are compiled on first render as before;
+- NumPy is only imported for metric re-fills long enough to repay it
+  (metrics_store).
+
+Heavy work that only some requests need is deferred in every mode:
+`requests` and the Grok function schemas (the chat handlers).
+benchmarks/bench_cold_start.py keeps the startup cost in check.
+"""
+
+import hashlib
+import os
+import shutil
+import sys
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Set
+
+import jinja2
+from jinja2 import BaseLoader, FileSystemLoader, ModuleLoader, TemplateNotFound
+
+import json_codec
+
+ENABLED = os.getenv('COLD_START_MODE') == '1'
+
+COMPILED_TEMPLATES_DIR = Path(__file__).parent / 'compiled_templates'
+SOURCES_FILE = 'sources.json'
+
+
+def _digest(source: str) -> str:
+    return hashlib.sha1(source.encode('utf-8')).hexdigest()
+
+
+class CompiledTemplateLoader(BaseLoader):
+    """Precompiled template modules, for templates whose source hasn't changed since compiling
+
+    Which templates are fresh is checked once, on the first render; anything
+    stale, missing or not compiled - or everything, when the modules were
+    compiled by another Jinja version, whose generated code may not match
+    the installed runtime - loads from the template folder as usual.
+    """
+
+    def __init__(self, search_path, compiled_dir: Path = COMPILED_TEMPLATES_DIR):
+        self._source_loader = FileSystemLoader(search_path)
+        self.compiled_dir = Path(compiled_dir)
+        self._lock = threading.Lock()
+        self._modules: Optional[ModuleLoader] = None
+        self._fresh: Optional[Set[str]] = None
+
+    def get_source(self, environment, template):
+        return self._source_loader.get_source(environment, template)
+
+    def list_templates(self):
+        return self._source_loader.list_templates()
+
+    def _compiled(self, environment):
+        if self._fresh is None:
+            with self._lock:
+                if self._fresh is None:
+                    fresh = set()
+                    try:
+                        compiled = json_codec.load_file(self.compiled_dir / SOURCES_FILE)
+                        sources: Dict[str, str] = compiled.get('templates', {})
+                        if compiled.get('jinja2') != jinja2.__version__:
+                            print(f"Precompiled templates are for Jinja {compiled.get('jinja2')}, "
+                                  f"not {jinja2.__version__}; compiling from source")
+                            sources = {}
+                        for name, digest in sources.items():
+                            try:
+                                source, _, _ = self._source_loader.get_source(environment, name)
+                            except TemplateNotFound:
+                                continue
+                            if _digest(source) == digest:
+                                fresh.add(name)
+                        if fresh:
+                            self._modules = ModuleLoader(str(self.compiled_dir))
+                    except (OSError, ValueError) as e:
+                        print(f"Precompiled templates unavailable: {e}")
+                    self._fresh = fresh
+        return self._modules, self._fresh
+
+    def load(self, environment, name, globals=None):
+        modules, fresh = self._compiled(environment)
+        if modules is not None and name in fresh:
+            try:
+                return modules.load(environment, name, globals)
+            except Exception as e:
+                print(f"Precompiled template {name} failed to load: {e}")
+        return super().load(environment, name, globals)
+
+
+def install(app):
+    """Use precompiled templates for `app` (a Flask app) when in cold-start mode
+
+    The loader is handed to the Jinja environment directly: Flask's default
+    loader would only ask it for sources. The app has no blueprint templates
+    for that loader to dispatch to.
+    """
+    if ENABLED:
+        loader = CompiledTemplateLoader(os.path.join(app.root_path, app.template_folder))
+        app.jinja_options = {**app.jinja_options, 'loader': loader}
+
+
+def compile_templates(app, target: Path = COMPILED_TEMPLATES_DIR) -> int:
+    """Compile every template of `app` into `target`; returns how many were compiled"""
+    loader = FileSystemLoader(os.path.join(app.root_path, app.template_folder))
+    env = app.jinja_env.overlay(loader=loader)
+    names = [name for name in loader.list_templates() if name.endswith('.html')]
+    if target.exists():
+        shutil.rmtree(target)
+    target.mkdir(parents=True)
+    env.compile_templates(str(target), zip=None, filter_func=lambda name: name in names)
+    sources = {
+        'jinja2': jinja2.__version__,
+        'templates': {name: _digest(loader.get_source(env, name)[0]) for name in names},
+    }
+    (target / SOURCES_FILE).write_bytes(json_codec.dumps(sources, indent=2, sort_keys=True))
+    return len(names)
+
+
+def main() -> int:
+    from app import app
+    count = compile_templates(app)
+    print(f"Compiled {count} templates to {COMPILED_TEMPLATES_DIR}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -3,11 +3,13 @@
 Consolidate all training data from daily log files into a single JSON file.
 """
 
-import json
 from pathlib import Path
 from datetime import datetime
 from typing import List, Dict, Any
 
+import exercise_catalog
+import json_codec
+
 def load_all_training_data() -> Dict[str, Any]:
     """Load all training data from daily log files"""
     
@@ -47,14 +49,14 @@ def load_all_training_data() -> Dict[str, Any]:
         "sessions": []
     }
     
+    catalog = exercise_catalog.catalog()
     dates = []
     total_exercises = 0
     total_sets = 0
     
     for json_file in json_files:
         try:
-            with open(json_file, 'r', encoding='utf-8') as f:
-                day_data = json.load(f)
+            day_data = json_codec.load_file(json_file)
             
             date = day_data.get('date', '')
             if not date:
@@ -94,9 +96,16 @@ def load_all_training_data() -> Dict[str, Any]:
                     sets = exercise_obj.get('sets', [])
                     notes = exercise_obj.get('notes', '')
                     
+                    # Same grouping as /api/training
+                    normalized_name, category = catalog.lookup(
+                        exercise_name, exercise_catalog.has_weight_each_side(exercise_obj)
+                    )
+                    
                     # Collect all weight information
                     exercise_data = {
                         "exercise": exercise_name,
+                        "normalized_name": normalized_name,
+                        "category": category,
                         "weight_each_side_kg": exercise_obj.get('weight_each_side_kg'),
                         "weight_each_side_lbs": exercise_obj.get('weight_each_side_lbs'),
                         "total_added_weight_kg": exercise_obj.get('total_added_weight_kg'),
@@ -189,8 +198,7 @@ def main():
         output_file = Path('public/data/all-training-data.json')
         output_file.parent.mkdir(parents=True, exist_ok=True)
         
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(training_data, f, indent=2, ensure_ascii=False)
+        json_codec.dump_file(output_file, training_data, indent=2)
         
         print(f"\n✅ Successfully consolidated training data!")
         print(f"   Output file: {output_file}")
@@ -202,8 +210,7 @@ def main():
         # Also save to api/data
         api_output_file = Path('api/data/all-training-data.json')
         api_output_file.parent.mkdir(parents=True, exist_ok=True)
-        with open(api_output_file, 'w', encoding='utf-8') as f:
-            json.dump(training_data, f, indent=2, ensure_ascii=False)
+        json_codec.dump_file(api_output_file, training_data, indent=2)
         print(f"   Also saved to: {api_output_file}")
         
     except Exception as e:
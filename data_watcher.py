@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Incremental ingestion for directories of JSON files (daily-logs, body-scans).
+
+A watcher reports which files were added, modified or deleted since the last
+call, and JsonDirectoryIndex applies just those changes to its in-memory,
+name-sorted records. Ingest cost therefore depends on the size of the change,
+not the size of the history.
+
+inotify is used when the optional `inotify_simple` package is installed on
+Linux; otherwise the directory is polled by comparing file mtimes and sizes.
+Neither mode runs a background thread - pending changes are picked up when a
+request calls refresh(), which suits serverless workers.
+"""
+
+import os
+import threading
+from bisect import bisect_left
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+# (added, modified, deleted) file names
+Changes = Tuple[Set[str], Set[str], Set[str]]
+
+
+class PollingWatcher:
+    """Detect changes by comparing (mtime_ns, size) of every matching file"""
+
+    mode = 'polling'
+
+    def __init__(self, directory: Path, suffix: str = '.json'):
+        self.directory = Path(directory)
+        self.suffix = suffix
+        self._known: Dict[str, Tuple[int, int]] = {}
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        found = {}
+        try:
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    if not entry.name.endswith(self.suffix):
+                        continue
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    found[entry.name] = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            pass
+        return found
+
+    def poll(self) -> Changes:
+        """Return the files that changed since the previous poll"""
+        current = self._scan()
+        added = {name for name in current if name not in self._known}
+        deleted = {name for name in self._known if name not in current}
+        modified = {name for name, sig in current.items()
+                    if name in self._known and self._known[name] != sig}
+        self._known = current
+        return added, modified, deleted
+
+    def known(self) -> Dict[str, Tuple[int, int]]:
+        """(mtime_ns, size) of every matching file as of the last poll"""
+        return self._known
+
+    def prime(self, known: Dict[str, Tuple[int, int]]):
+        """Treat `known` as already seen, so only later changes are reported"""
+        self._known = dict(known)
+
+
+class InotifyWatcher(PollingWatcher):
+    """Read inotify events for the directory, rescanning only when events were lost"""
+
+    mode = 'inotify'
+
+    def __init__(self, directory: Path, suffix: str = '.json'):
+        super().__init__(directory, suffix)
+        self._inotify = None
+        self._pid = None
+        self._unavailable = False
+
+    def _start(self):
+        from inotify_simple import INotify, flags
+        if self._inotify is not None:
+            try:
+                self._inotify.close()
+            except OSError:
+                pass
+        self._inotify = INotify(nonblocking=True)
+        self._inotify.add_watch(
+            str(self.directory),
+            flags.CREATE | flags.DELETE | flags.MODIFY | flags.CLOSE_WRITE |
+            flags.MOVED_FROM | flags.MOVED_TO | flags.DELETE_SELF | flags.MOVE_SELF
+        )
+        # Inotify fds must not be shared with forked workers
+        self._pid = os.getpid()
+
+    def poll(self) -> Changes:
+        from inotify_simple import flags
+        if self._unavailable:
+            return super().poll()
+        if self._inotify is None or self._pid != os.getpid():
+            # (Re)arm the watch before the full scan so nothing slips between them
+            try:
+                self._start()
+            except OSError as e:
+                # Watch limit reached or directory missing - keep polling instead
+                print(f"inotify unavailable for {self.directory}, polling instead: {e}")
+                self._inotify = None
+                self._unavailable = True
+                self.mode = 'polling'
+            return super().poll()
+
+        names = set()
+        for event in self._inotify.read(timeout=0):
+            if event.mask & (flags.Q_OVERFLOW | flags.IGNORED | flags.DELETE_SELF | flags.MOVE_SELF):
+                # Queue overflowed or the directory itself went away - fall back to a rescan
+                self._inotify.close()
+                self._inotify = None
+                return self.poll()
+            if event.name and event.name.endswith(self.suffix):
+                names.add(event.name)
+        if not names:
+            return set(), set(), set()
+
+        added, modified, deleted = set(), set(), set()
+        for name in names:
+            try:
+                st = os.stat(self.directory / name)
+            except OSError:
+                if self._known.pop(name, None) is not None:
+                    deleted.add(name)
+                continue
+            sig = (st.st_mtime_ns, st.st_size)
+            previous = self._known.get(name)
+            self._known[name] = sig
+            if previous is None:
+                added.add(name)
+            elif previous != sig:
+                modified.add(name)
+        return added, modified, deleted
+
+
+def make_watcher(directory: Path, suffix: str = '.json') -> PollingWatcher:
+    """inotify watcher when available, mtime polling otherwise"""
+    try:
+        import inotify_simple  # noqa: F401
+        return InotifyWatcher(directory, suffix)
+    except (ImportError, OSError):
+        return PollingWatcher(directory, suffix)
+
+
+class JsonDirectoryIndex:
+    """In-memory, name-sorted records for every JSON file in a directory.
+
+    `load` parses one file and returns its record (or None to skip the file).
+    refresh() applies only the pending add/modify/delete events and returns
+    the index of the first record whose position may have shifted, so callers
+    can renumber just the affected tail.
+    """
+
+    def __init__(self, directory: Path, load: Callable[[Path], Optional[dict]], suffix: str = '.json'):
+        self.directory = Path(directory)
+        self._load = load
+        self._watcher = make_watcher(self.directory, suffix)
+        self._lock = threading.Lock()
+        self._names: List[str] = []
+        self._by_name: Dict[str, dict] = {}
+        # Replaced (never mutated in place) so readers can keep iterating an old list
+        self.records: List[dict] = []
+        # Sorted (name, (mtime_ns, size)) of every file, and the newest mtime - for validators
+        self.signature: Tuple = ()
+        self.last_modified_ns: int = 0
+        # Names (re)loaded and names dropped by the last refresh that changed anything
+        self.last_upserted: Set[str] = set()
+        self.last_deleted: Set[str] = set()
+        # Set by seed(): the next refresh reports every record as changed
+        self._seeded = False
+
+    @property
+    def names(self) -> List[str]:
+        """File names of the records, in record order"""
+        return self._names
+
+    @property
+    def mode(self) -> str:
+        return self._watcher.mode
+
+    def get(self, name: str) -> Optional[dict]:
+        return self._by_name.get(name)
+
+    def seed(self, records: List[Tuple[str, dict]], known: Dict[str, Tuple[int, int]]):
+        """Start from already-parsed records (e.g. a dataset snapshot) instead of reading files
+
+        `known` is the (mtime_ns, size) of every file the records were taken
+        from; only changes after that are picked up by refresh().
+        """
+        with self._lock:
+            pairs = sorted(((name, record) for name, record in records if record is not None), key=lambda pair: pair[0])
+            self._names = [name for name, _ in pairs]
+            self.records = [record for _, record in pairs]
+            self._by_name = dict(pairs)
+            self._watcher.prime(known)
+            self._seeded = True
+
+    def replace(self, replacements: Dict[int, dict]):
+        """Swap in new records at the given positions (same files), without mutating the old list"""
+        if not replacements:
+            return
+        with self._lock:
+            records = list(self.records)
+            for position, record in replacements.items():
+                records[position] = record
+                self._by_name[self._names[position]] = record
+            self.records = records
+
+    def refresh(self) -> Optional[int]:
+        """Apply pending changes; return the first affected index, or None if nothing changed"""
+        with self._lock:
+            added, modified, deleted = self._watcher.poll()
+            seeded, self._seeded = self._seeded, False
+            if not (added or modified or deleted or seeded):
+                return None
+
+            names = list(self._names)
+            records = list(self.records)
+            first = 0 if seeded else len(names)
+            present_before = {name for name in added | modified | deleted if name in self._by_name}
+
+            for name in deleted | modified:
+                if name in self._by_name:
+                    i = bisect_left(names, name)
+                    del names[i]
+                    del records[i]
+                    del self._by_name[name]
+                    first = min(first, i)
+
+            for name in sorted(added | modified):
+                record = self._load(self.directory / name)
+                if record is None:
+                    continue
+                i = bisect_left(names, name)
+                names.insert(i, name)
+                records.insert(i, record)
+                self._by_name[name] = record
+                first = min(first, i)
+
+            self._names = names
+            self.records = records
+            touched = added | modified | deleted
+            if seeded:
+                touched |= set(names)
+            self.last_upserted = {name for name in touched if name in self._by_name}
+            self.last_deleted = {name for name in present_before if name not in self._by_name}
+            known = self._watcher.known()
+            self.signature = tuple(sorted(known.items()))
+            self.last_modified_ns = max((mtime for mtime, _ in known.values()), default=0)
+            return first
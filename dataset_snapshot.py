@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Single-file binary snapshot of the dataset for fast cold starts.
+
+Packs the master file, every daily log and every body scan into one file
+next to the master file (dataset.snap):
+
+    b'TDSNAP01' | u32 header length | header JSON | record bytes
+
+The header lists, per section, each source file's name, size, mtime and the
+(offset, length) of its compact JSON inside the record area, plus a content
+digest of the section. At cold start the loader mmaps the snapshot, checks
+that it still describes the files on disk and decodes every record from it
+in one pass (the day index, metrics and training index need them all),
+instead of globbing, opening and parsing dozens of small pretty-printed
+files. The reader is closed once the caches are seeded.
+
+A section only counts when every file it lists is still present with the
+same size (and no other file was added), and either the mtimes match or -
+in a read-only Vercel bundle, where checkout mtimes are not preserved - the
+files' content digest matches the one recorded at build time. Otherwise the
+files are read normally.
+
+Snapshots are build artifacts (not tracked in git): the Render build
+(render.yaml) and deploy.sh run
+
+    python dataset_snapshot.py          # writes api/data and public/data snapshots
+    python dataset_snapshot.py --check  # exit 1 if a snapshot is stale
+
+Vercel builds the app from git with the @vercel/python builder, which has
+no build step, so a Vercel deployment usually has no snapshot and reads the
+files; the trust_sizes digest check covers bundles that do include one.
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import json_codec
+
+MAGIC = b'TDSNAP01'
+SNAPSHOT_NAME = 'dataset.snap'
+_HEADER_LENGTH = struct.Struct('<I')
+
+# Section -> location relative to the snapshot's directory
+SECTIONS = {
+    'master': 'master-health-file.json',
+    'daily_logs': 'daily-logs',
+    'body_scans': 'body-scans',
+}
+
+
+def snapshot_path(master_file: Path) -> Path:
+    """Where the snapshot for a master file lives (DATASET_SNAPSHOT overrides)"""
+    override = os.getenv('DATASET_SNAPSHOT')
+    return Path(override) if override else Path(master_file).parent / SNAPSHOT_NAME
+
+
+def section_files(section: str, location: Optional[Path]) -> List[Path]:
+    """The source files of a section at `location` (the master file or a directory)"""
+    if location is None:
+        return []
+    location = Path(location)
+    if section == 'master':
+        return [location] if location.is_file() else []
+    return sorted(location.glob('*.json')) if location.is_dir() else []
+
+
+def _source_files(root: Path, section: str) -> List[Path]:
+    return section_files(section, root / SECTIONS[section])
+
+
+def content_digest(files: List[Path]) -> str:
+    """sha1 over the names and bytes of `files`: the same content gives the same digest anywhere"""
+    digest = hashlib.sha1()
+    for path in files:
+        digest.update(path.name.encode('utf-8') + b'\0')
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def build(root: Path, output: Optional[Path] = None) -> Path:
+    """Write the snapshot of the data directory `root`; returns its path"""
+    root = Path(root)
+    output = Path(output) if output else root / SNAPSHOT_NAME
+    header: Dict[str, Any] = {'created_at': datetime.now().isoformat(), 'sections': {}, 'digests': {}}
+    chunks, offset, every_file = [], 0, []
+    for section in SECTIONS:
+        entries = []
+        files = _source_files(root, section)
+        header['digests'][section] = content_digest(files)
+        for path in files:
+            st = path.stat()
+            # Re-encode compactly; the decoded records are what the loader keeps anyway
+            data = json_codec.dumps(json_codec.loads(path.read_bytes()))
+            entries.append({
+                'name': path.name, 'size': st.st_size, 'mtime_ns': st.st_mtime_ns,
+                'offset': offset, 'length': len(data),
+            })
+            chunks.append(data)
+            offset += len(data)
+            every_file.append(path)
+        header['sections'][section] = entries
+    header['digest'] = content_digest(every_file)
+
+    encoded = json_codec.dumps(header)
+    tmp = output.with_name(output.name + '.tmp')
+    with open(tmp, 'wb') as f:
+        f.write(MAGIC)
+        f.write(_HEADER_LENGTH.pack(len(encoded)))
+        f.write(encoded)
+        for chunk in chunks:
+            f.write(chunk)
+    os.replace(tmp, output)
+    return output
+
+
+class SnapshotReader:
+    """Read-only mmap of a snapshot file; records are decoded by offset"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            self._mmap.close()
+            raise ValueError(f"{self.path} is not a dataset snapshot")
+        start = len(MAGIC) + _HEADER_LENGTH.size
+        (length,) = _HEADER_LENGTH.unpack_from(self._mmap, len(MAGIC))
+        self.header = json_codec.loads(self._mmap[start:start + length])
+        self._data_start = start + length
+
+    def entries(self, section: str) -> List[Dict]:
+        return self.header['sections'].get(section, [])
+
+    def digest(self, section: str) -> Optional[str]:
+        """content_digest() of a section's source files when the snapshot was built"""
+        return self.header.get('digests', {}).get(section)
+
+    def record(self, entry: Dict) -> Any:
+        """Decode one entry straight from the mapped pages"""
+        start = self._data_start + entry['offset']
+        return json_codec.loads(self._mmap[start:start + entry['length']])
+
+    def validate(self, section: str, location: Optional[Path],
+                 trust_sizes: bool) -> Optional[Dict[str, Tuple[int, int]]]:
+        """(mtime_ns, size) of every file at `location` if the section still describes them
+
+        Names and sizes must match exactly. Then the mtimes must match too,
+        or with `trust_sizes` (a read-only deploy bundle, whose mtimes are
+        meaningless) the content digest, so same-length edits are caught.
+        None when stale.
+        """
+        if location is None:
+            return None
+        location = Path(location)
+        current = {}
+        try:
+            if section == 'master':
+                st = os.stat(location)
+                current[location.name] = (st.st_mtime_ns, st.st_size)
+            else:
+                with os.scandir(location) as found:
+                    for item in found:
+                        if item.name.endswith('.json'):
+                            st = item.stat()
+                            current[item.name] = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            return None
+        expected = {entry['name']: entry for entry in self.entries(section)}
+        if set(current) != set(expected):
+            return None
+        for name, (mtime_ns, size) in current.items():
+            entry = expected[name]
+            if entry['size'] != size or (not trust_sizes and entry['mtime_ns'] != mtime_ns):
+                return None
+        if trust_sizes:
+            try:
+                digest = content_digest(section_files(section, location))
+            except OSError:
+                return None
+            if digest != self.digest(section):
+                return None
+        return current
+
+    def close(self):
+        self._mmap.close()
+
+
+def open_snapshot(master_file: Path) -> Optional[SnapshotReader]:
+    """The snapshot next to `master_file`, or None when there is no usable one"""
+    path = snapshot_path(master_file)
+    if not path.is_file():
+        return None
+    try:
+        return SnapshotReader(path)
+    except (OSError, ValueError) as e:
+        print(f"Ignoring dataset snapshot {path}: {e}")
+        return None
+
+
+def trust_sizes() -> bool:
+    """Deployed Vercel bundles are read-only and don't keep checkout mtimes (validate by digest)"""
+    return os.getenv('VERCEL') == '1'
+
+
+def _data_roots() -> List[Path]:
+    base = Path(__file__).parent
+    return [root for root in (base / 'api' / 'data', base / 'public' / 'data', base / 'data')
+            if (root / SECTIONS['master']).is_file()]
+
+
+def main(argv: List[str]) -> int:
+    check = '--check' in argv
+    roots = _data_roots()
+    if not roots:
+        print("No data directory with master-health-file.json found")
+        return 1
+    stale = 0
+    for root in roots:
+        output = root / SNAPSHOT_NAME
+        if check:
+            try:
+                reader = SnapshotReader(output)
+                current = content_digest([p for s in SECTIONS for p in _source_files(root, s)])
+                fresh = reader.header.get('digest') == current
+                reader.close()
+            except (OSError, ValueError):
+                fresh = False
+            print(f"{output}: {'up to date' if fresh else 'STALE'}")
+            stale += not fresh
+            continue
+        path = build(root, output)
+        sizes = {s: len(_source_files(root, s)) for s in SECTIONS}
+        print(f"Wrote {path} ({path.stat().st_size} bytes): "
+              f"{sizes['daily_logs']} daily logs, {sizes['body_scans']} body scans")
+    return 1 if stale else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
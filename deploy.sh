@@ -17,6 +17,15 @@ if ! git remote -v | grep -q "origin"; then
     fi
 fi
 
+# Build artifacts (not committed; the Render build generates its own, and
+# Vercel's git builds have none and fall back to the source files): the
+# dataset snapshot, and the pre-rendered API responses (local and Vercel
+# data layouts)
+python3 dataset_snapshot.py && python3 dataset_snapshot.py --check || exit 1
+python3 prerender.py && python3 prerender.py --vercel || exit 1
+# Precompiled templates for cold starts
+python3 cold_start.py || exit 1
+
 # Check for uncommitted changes
 if ! git diff-index --quiet HEAD --; then
     echo "📝 You have uncommitted changes."
@@ -42,7 +51,7 @@ echo "Option 1: Render (Recommended)"
 echo "  1. Go to https://render.com"
 echo "  2. New → Web Service"
 echo "  3. Connect your GitHub repo"
-echo "  4. Build: pip install -r requirements.txt"
+echo "  4. Build: pip install -r requirements.txt && python dataset_snapshot.py && python prerender.py && python cold_start.py"
 echo "  5. Start: gunicorn app:app"
 echo "  6. Add env var: GROK_API_KEY"
 echo ""
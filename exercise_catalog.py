@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Exercise name normalization and body-part categorisation.
+
+The naming rules live in exercise_aliases.json so new aliases can be added
+without touching code. Every keyword used by any rule is compiled into one
+regex that reports all keywords present in a name in a single pass; rules
+then only test set membership. Lookups are memoized per
+(raw name, has_weight_each_side), so a name is classified once per process
+rather than once per set per request.
+
+catalog() returns the shared catalog and reloads it when the JSON file's
+mtime changes.
+"""
+
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+import json_codec
+
+ALIASES_FILE = Path(os.getenv('EXERCISE_ALIASES_FILE', Path(__file__).parent / 'exercise_aliases.json'))
+
+
+class ExerciseCatalog:
+    """Compiled naming/category rules with memoized lookups"""
+
+    def __init__(self, table: Dict, signature: Optional[Tuple] = None):
+        self.signature = signature
+        self._names: List[Dict] = table.get('names', [])
+        self._categories: List[Dict] = table.get('categories', [])
+        self.default_category: str = table.get('default_category', 'Other')
+        self.category_order: List[str] = table.get('category_order', [])
+        self._pattern = self._compile(self._names + self._categories)
+        self._lookups: Dict[Tuple[str, bool], Tuple[str, str]] = {}
+        self._categorised: Dict[str, str] = {}
+
+    @classmethod
+    def from_file(cls, path: Path = ALIASES_FILE) -> 'ExerciseCatalog':
+        st = os.stat(path)
+        return cls(json_codec.load_file(path), (st.st_mtime_ns, st.st_size))
+
+    @staticmethod
+    def _compile(rules: List[Dict]):
+        keywords = set()
+        stack = list(rules)
+        while stack:
+            rule = stack.pop()
+            for group in rule.get('when', []):
+                keywords.update(group)
+            keywords.update(rule.get('unless', []))
+            stack.extend(rule.get('rules', []))
+        # One optional lookahead per keyword: each match position reports every
+        # keyword starting there, including ones overlapping a longer keyword
+        return re.compile(''.join(f'(?=({re.escape(k)}))?' for k in sorted(keywords)))
+
+    def _keywords(self, text: str) -> FrozenSet[str]:
+        found = set()
+        for match in self._pattern.finditer(text):
+            found.update(k for k in match.groups() if k)
+        return frozenset(found)
+
+    @staticmethod
+    def _matches(rule: Dict, found: FrozenSet[str], dumbbells: bool) -> bool:
+        if 'dumbbells' in rule and rule['dumbbells'] != dumbbells:
+            return False
+        if any(k in found for k in rule.get('unless', [])):
+            return False
+        return all(any(k in found for k in group) for group in rule.get('when', []))
+
+    def _resolve(self, rules: List[Dict], found: FrozenSet[str], dumbbells: bool,
+                 key: str) -> Optional[str]:
+        for rule in rules:
+            if not self._matches(rule, found, dumbbells):
+                continue
+            if key in rule:
+                return rule[key]
+            result = self._resolve(rule.get('rules', []), found, dumbbells, key)
+            if result is not None:
+                return result
+        return None
+
+    def normalize(self, name: str, has_weight_each_side: bool = False) -> str:
+        """Canonical exercise name (weight_each_side means dumbbells)"""
+        return self.lookup(name, has_weight_each_side)[0]
+
+    def categorize(self, name: str) -> str:
+        """Body part of a canonical exercise name"""
+        if not name:
+            return self.default_category
+        category = self._categorised.get(name)
+        if category is None:
+            found = self._keywords(name.lower().strip())
+            category = self._resolve(self._categories, found, False, 'category') or self.default_category
+            self._categorised[name] = category
+        return category
+
+    def lookup(self, name: str, has_weight_each_side: bool = False) -> Tuple[str, str]:
+        """(canonical name, category) for a raw exercise name, memoized"""
+        key = (name, bool(has_weight_each_side))
+        result = self._lookups.get(key)
+        if result is None:
+            if not name:
+                result = (name, self.default_category)
+            else:
+                found = self._keywords(name.lower().strip())
+                canonical = self._resolve(self._names, found, key[1], 'name') or name.strip().title()
+                result = (canonical, self.categorize(canonical))
+            self._lookups[key] = result
+        return result
+
+
+_lock = threading.Lock()
+_catalog: Optional[ExerciseCatalog] = None
+
+
+def catalog() -> ExerciseCatalog:
+    """The shared catalog, reloaded when exercise_aliases.json changes on disk"""
+    global _catalog
+    try:
+        st = os.stat(ALIASES_FILE)
+        signature = (st.st_mtime_ns, st.st_size)
+    except OSError:
+        signature = None
+    current = _catalog
+    if current is not None and current.signature == signature:
+        return current
+    with _lock:
+        if _catalog is None or _catalog.signature != signature:
+            try:
+                _catalog = ExerciseCatalog.from_file(ALIASES_FILE)
+            except Exception as e:
+                print(f"Error loading exercise aliases from {ALIASES_FILE}: {e}")
+                # Keep the last good rules (or none) until the file changes again
+                if _catalog is None:
+                    _catalog = ExerciseCatalog({}, signature)
+                _catalog.signature = signature
+        return _catalog
+
+
+def has_weight_each_side(exercise: Dict) -> bool:
+    """Whether a logged exercise records per-side (dumbbell) weights"""
+    return bool(exercise.get('weight_each_side_lbs') or exercise.get('weight_each_side_kg'))
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Vercel Blob API, for developing the photo upload flow.
+
+Implements the parts of the REST API the app uses, keeping blobs in memory:
+
+- PUT /<pathname>                  single upload
+- POST /mpu (x-mpu-action header)  multipart create / upload part / complete
+- GET / and GET /list              list, with prefix, limit and cursor
+- GET /blobs/<pathname>            download
+
+PUTs may also use a client token from /api/upload-token, when the server is
+started with the app's read-write token: it enforces the token's pathname,
+size, content type and expiry, and posts the signed upload-completed
+callback like Blob does.
+
+Run it and point the app at it:
+
+    python fake_blob_server.py 8765 dev
+    BLOB_API_URL=http://127.0.0.1:8765 BLOB_READ_WRITE_TOKEN=dev python app.py
+
+Every request is logged with its body size and how many reads it took, so
+streamed (chunked) uploads are easy to see; the same is recorded in
+FakeBlobStore.requests for tests (tests/test_blob_store.py).
+"""
+
+import json
+import sys
+import threading
+import time
+import urllib.request
+import uuid
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import blob_store
+
+READ_CHUNK = 64 * 1024
+
+
+class FakeBlobStore:
+    def __init__(self, token=None):
+        self.token = token
+        self.lock = threading.Lock()
+        self.blobs = {}
+        self.uploads = {}
+        # {method, action, pathname, size, reads} per request, in arrival order
+        self.requests = []
+
+    def record(self, method, action, pathname, size=0, reads=0):
+        with self.lock:
+            self.requests.append({'method': method, 'action': action, 'pathname': pathname,
+                                  'size': size, 'reads': reads})
+
+    def put(self, pathname, body, content_type, base_url):
+        blob = {
+            'pathname': pathname,
+            'url': f'{base_url}/blobs/{pathname}',
+            'downloadUrl': f'{base_url}/blobs/{pathname}?download=1',
+            'contentType': content_type,
+            'size': len(body),
+            'uploadedAt': datetime.now(timezone.utc).isoformat(),
+        }
+        with self.lock:
+            self.blobs[pathname] = (blob, body)
+        return blob
+
+
+class FakeBlobHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    store = FakeBlobStore()
+
+    def _base_url(self):
+        return f"http://{self.headers.get('Host', 'localhost')}"
+
+    def _authorized(self):
+        token = self.store.token
+        if token and self.headers.get('Authorization') != f'Bearer {token}':
+            self._json(403, {'error': {'code': 'forbidden', 'message': 'Invalid token'}})
+            return False
+        return True
+
+    def _client_claims(self):
+        """Claims of a valid client token in the request, None if there is none"""
+        auth = self.headers.get('Authorization', '')
+        if not (self.store.token and auth.startswith(f'Bearer {blob_store.CLIENT_TOKEN_PREFIX}')):
+            return None
+        claims = blob_store.read_client_token(self.store.token, auth[len('Bearer '):])
+        return claims or {}
+
+    def _client_error(self, claims, pathname, size, content_type):
+        if not claims:
+            return 'Invalid client token'
+        if claims.get('validUntil', 0) < time.time() * 1000:
+            return 'Client token expired'
+        if claims.get('pathname') != pathname:
+            return f'Client token is for {claims.get("pathname")}'
+        if size > claims.get('maximumSizeInBytes', 0):
+            return f'File exceeds {claims.get("maximumSizeInBytes")} bytes'
+        allowed = claims.get('allowedContentTypes')
+        if allowed and content_type not in allowed:
+            return f'Content type {content_type} not allowed'
+        return None
+
+    def _send_callback(self, claims, blob):
+        callback = claims.get('onUploadCompleted') or {}
+        if not callback.get('callbackUrl'):
+            return
+        body = json.dumps({'type': blob_store.UPLOAD_COMPLETED,
+                           'payload': {'blob': blob, 'tokenPayload': callback.get('tokenPayload')}}).encode()
+        request = urllib.request.Request(callback['callbackUrl'], data=body, method='POST', headers={
+            'Content-Type': 'application/json',
+            'x-vercel-signature': blob_store.signature(self.store.token, body),
+        })
+        try:
+            with urllib.request.urlopen(request, timeout=10) as response:
+                print(f"Callback {callback['callbackUrl']}: {response.status}")
+        except Exception as e:
+            print(f"Callback {callback['callbackUrl']} failed: {e}")
+
+    def _cors(self):
+        self.send_header('Access-Control-Allow-Origin', '*')
+
+    def _read_body(self):
+        """Body in READ_CHUNK reads (Content-Length or chunked); (bytes, reads)"""
+        parts, reads = [], 0
+        if 'chunked' in self.headers.get('Transfer-Encoding', '').lower():
+            while True:
+                size = int(self.rfile.readline().split(b';')[0].strip(), 16)
+                if size == 0:
+                    self.rfile.readline()
+                    break
+                parts.append(self.rfile.read(size))
+                self.rfile.readline()
+                reads += 1
+        else:
+            left = int(self.headers.get('Content-Length') or 0)
+            while left > 0:
+                data = self.rfile.read(min(left, READ_CHUNK))
+                if not data:
+                    break
+                parts.append(data)
+                left -= len(data)
+                reads += 1
+        return b''.join(parts), reads
+
+    def _json(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self._cors()
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_OPTIONS(self):
+        self.send_response(204)
+        self._cors()
+        self.send_header('Access-Control-Allow-Methods', 'GET, PUT, POST, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', 'Authorization, Content-Type, x-content-type, x-api-version')
+        self.end_headers()
+
+    def do_PUT(self):
+        claims = self._client_claims()
+        if claims is None and not self._authorized():
+            return
+        path = urlsplit(self.path)
+        pathname = parse_qs(path.query).get('pathname', [unquote(path.path.lstrip('/'))])[0]
+        content_type = self.headers.get('x-content-type') or self.headers.get('Content-Type') or 'application/octet-stream'
+        if claims is not None:
+            error = self._client_error(claims, pathname, int(self.headers.get('Content-Length') or 0), content_type)
+            if error:
+                self.close_connection = True
+                self._json(403, {'error': {'code': 'forbidden', 'message': error}})
+                return
+        body, reads = self._read_body()
+        if claims is not None and len(body) > claims['maximumSizeInBytes']:
+            self._json(403, {'error': {'code': 'forbidden', 'message': 'File too large'}})
+            return
+        blob = self.store.put(pathname, body, content_type, self._base_url())
+        self.store.record('PUT', 'put', pathname, len(body), reads)
+        print(f"PUT {pathname}: {len(body)} bytes in {reads} reads{' (client token)' if claims else ''}")
+        self._json(200, blob)
+        if claims:
+            threading.Thread(target=self._send_callback, args=(claims, blob), daemon=True).start()
+
+    def do_POST(self):
+        path = urlsplit(self.path)
+        if path.path.rstrip('/') != '/mpu':
+            self._json(404, {'error': {'code': 'not_found'}})
+            return
+        if not self._authorized():
+            return
+        pathname = parse_qs(path.query).get('pathname', [''])[0]
+        action = self.headers.get('x-mpu-action')
+        body, reads = self._read_body()
+        store = self.store
+        store.record('POST', f'mpu-{action}', pathname, len(body), reads)
+        if action == 'create':
+            key, upload_id = uuid.uuid4().hex, uuid.uuid4().hex
+            with store.lock:
+                store.uploads[upload_id] = {'pathname': pathname, 'parts': {},
+                                            'contentType': self.headers.get('x-content-type')}
+            print(f"MPU create {pathname}")
+            self._json(200, {'key': key, 'uploadId': upload_id})
+            return
+        upload = store.uploads.get(self.headers.get('x-mpu-upload-id', ''))
+        if upload is None:
+            self._json(404, {'error': {'code': 'not_found', 'message': 'Unknown upload'}})
+            return
+        if action == 'upload':
+            number = int(self.headers.get('x-mpu-part-number', '0'))
+            etag = uuid.uuid4().hex
+            with store.lock:
+                upload['parts'][etag] = (number, body)
+            print(f"MPU part {number} of {pathname}: {len(body)} bytes in {reads} reads")
+            self._json(200, {'etag': etag, 'partNumber': number})
+        elif action == 'complete':
+            listed = json.loads(body or b'[]')
+            with store.lock:
+                chunks = [upload['parts'][part['etag']] for part in listed]
+                store.uploads.pop(self.headers.get('x-mpu-upload-id'), None)
+            data = b''.join(part for _, part in sorted(chunks))
+            blob = store.put(pathname, data, upload['contentType'] or 'application/octet-stream', self._base_url())
+            print(f"MPU complete {pathname}: {len(data)} bytes in {len(chunks)} parts")
+            self._json(200, blob)
+        else:
+            self._json(400, {'error': {'code': 'bad_request', 'message': f'Unknown action {action}'}})
+
+    def do_GET(self):
+        path = urlsplit(self.path)
+        if path.path.startswith('/blobs/'):
+            found = self.store.blobs.get(unquote(path.path[len('/blobs/'):]))
+            if found is None:
+                self._json(404, {'error': {'code': 'not_found'}})
+                return
+            blob, body = found
+            self.send_response(200)
+            self.send_header('Content-Type', blob['contentType'])
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        if path.path.rstrip('/') not in ('', '/list'):
+            self._json(404, {'error': {'code': 'not_found'}})
+            return
+        if not self._authorized():
+            return
+        query = parse_qs(path.query)
+        prefix = query.get('prefix', [''])[0]
+        self.store.record('GET', 'list', prefix)
+        limit = int(query.get('limit', ['1000'])[0])
+        start = int(query.get('cursor', ['0'])[0] or 0)
+        with self.store.lock:
+            names = sorted(name for name in self.store.blobs if name.startswith(prefix))
+            page = [self.store.blobs[name][0] for name in names[start:start + limit]]
+        has_more = start + limit < len(names)
+        self._json(200, {'blobs': page, 'hasMore': has_more,
+                         'cursor': str(start + limit) if has_more else None})
+
+
+def serve(port: int = 8765, token=None) -> ThreadingHTTPServer:
+    """Start the fake server in a background thread and return it"""
+    FakeBlobHandler.store = FakeBlobStore(token)
+    server = ThreadingHTTPServer(('127.0.0.1', port), FakeBlobHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == '__main__':
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8765
+    FakeBlobHandler.store = FakeBlobStore(sys.argv[2] if len(sys.argv) > 2 else None)
+    print(f"Fake Blob API on http://127.0.0.1:{port}")
+    ThreadingHTTPServer(('127.0.0.1', port), FakeBlobHandler).serve_forever()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Pluggable JSON codec.
+
+Uses orjson or msgspec when one of them is installed and falls back to the
+stdlib `json` module otherwise. The data loader, the body-scan reader, the
+training-data consolidation script and Flask's JSON provider all go through
+this module, so installing a fast codec speeds up both ingest and responses
+without code changes.
+
+Set JSON_CODEC=orjson|msgspec|stdlib to force a backend (e.g. for
+benchmarks); an unavailable choice falls back to the default order.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+
+class StdlibCodec:
+    """The stdlib json module"""
+
+    name = 'stdlib'
+
+    def loads(self, data) -> Any:
+        return json.loads(data)
+
+    def dumps(self, obj: Any, indent: Optional[int] = None, sort_keys: bool = False,
+              default: Optional[Callable] = None) -> bytes:
+        return json.dumps(
+            obj, indent=indent, sort_keys=sort_keys, default=default, ensure_ascii=False,
+            separators=None if indent else (',', ':')
+        ).encode('utf-8')
+
+
+class OrjsonCodec:
+    """orjson: Rust-backed, returns bytes. Only 2-space indentation is supported."""
+
+    name = 'orjson'
+
+    def __init__(self):
+        import orjson
+        self._orjson = orjson
+
+    def loads(self, data) -> Any:
+        return self._orjson.loads(data)
+
+    def dumps(self, obj: Any, indent: Optional[int] = None, sort_keys: bool = False,
+              default: Optional[Callable] = None) -> bytes:
+        orjson = self._orjson
+        # Hand datetimes/dataclasses to `default` so callers keep their own formatting
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=default, option=option)
+
+
+class MsgspecCodec:
+    """msgspec.json: C-backed encoder/decoder"""
+
+    name = 'msgspec'
+
+    def __init__(self):
+        import msgspec
+        self._msgspec = msgspec
+        self._decoder = msgspec.json.Decoder()
+        self._encoders: Dict = {}
+
+    def loads(self, data) -> Any:
+        return self._decoder.decode(data)
+
+    def dumps(self, obj: Any, indent: Optional[int] = None, sort_keys: bool = False,
+              default: Optional[Callable] = None) -> bytes:
+        key = (sort_keys, default)
+        encoder = self._encoders.get(key)
+        if encoder is None:
+            encoder = self._msgspec.json.Encoder(
+                enc_hook=default, order='sorted' if sort_keys else None
+            )
+            self._encoders[key] = encoder
+        body = encoder.encode(obj)
+        if indent:
+            body = self._msgspec.json.format(body, indent=indent)
+        return body
+
+
+BACKENDS = {
+    'orjson': OrjsonCodec,
+    'msgspec': MsgspecCodec,
+    'stdlib': StdlibCodec,
+}
+
+
+def get_codec(name: str):
+    """Instantiate a backend by name; raises ImportError if it isn't installed"""
+    return BACKENDS[name]()
+
+
+def available_codecs() -> Dict[str, Any]:
+    """Every installed backend, fastest first"""
+    codecs = {}
+    for name in BACKENDS:
+        try:
+            codecs[name] = get_codec(name)
+        except ImportError:
+            continue
+    return codecs
+
+
+def _select():
+    preferred = os.getenv('JSON_CODEC', '').strip().lower()
+    order = [preferred] if preferred in BACKENDS else []
+    order += [name for name in BACKENDS if name != preferred]
+    for name in order:
+        try:
+            return get_codec(name)
+        except ImportError:
+            continue
+    return StdlibCodec()
+
+
+codec = _select()
+BACKEND = codec.name
+
+
+def loads(data) -> Any:
+    """Decode JSON from str or bytes"""
+    return codec.loads(data)
+
+
+def dumps(obj: Any, indent: Optional[int] = None, sort_keys: bool = False,
+          default: Optional[Callable] = None) -> bytes:
+    """Encode to UTF-8 JSON bytes (compact unless `indent` is given)"""
+    return codec.dumps(obj, indent=indent, sort_keys=sort_keys, default=default)
+
+
+def load_file(path: Path) -> Any:
+    """Read and decode a JSON file (bytes go straight to the decoder)"""
+    return codec.loads(Path(path).read_bytes())
+
+
+def dump_file(path: Path, obj: Any, indent: Optional[int] = 2):
+    """Encode and write a JSON file"""
+    Path(path).write_bytes(dumps(obj, indent=indent))
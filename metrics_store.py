@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Columnar store of daily metrics.
+
+Each metric is kept as one contiguous float64 `array('d')`, one slot per
+logged day in day order, with NaN marking a missing value. Next to every
+column sit prefix sums and prefix counts of its logged values, so the total,
+count or average over any range of days is O(1).
+
+The store is maintained alongside the dataset cache: when days change, a
+new store copies the columns and prefix arrays up to the first affected
+position (a flat memory copy) and re-fills only the tail, so appending a day
+computes one new slot per array. Stores are never modified once handed to a
+dataset snapshot. Re-filling a tail uses
+NumPy cumulative sums over a zero-copy view of the columns when NumPy is
+installed, and plain loops over the arrays otherwise.
+
+In cold-start mode (cold_start.py) NumPy is only imported once a tail is
+long enough to repay the import (tens of milliseconds, more than summing
+years of days in Python), so serverless cold starts don't load it; a
+long-lived server imports it on the first re-fill.
+"""
+
+import sys
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Optional, Tuple
+
+import cold_start
+
+# Cold-start mode: tail length (days) from which NumPy is imported for a re-fill
+NUMPY_IMPORT_MIN_TAIL = 10000
+
+# None until first needed; False when NumPy is not installed
+_np = None
+
+
+def _numpy(tail: int):
+    """NumPy if installed; in cold-start mode, only if already loaded or worth importing for a `tail`-day re-fill"""
+    global _np
+    if _np is None:
+        if cold_start.ENABLED and 'numpy' not in sys.modules and tail < NUMPY_IMPORT_MIN_TAIL:
+            return None
+        try:
+            import numpy
+            _np = numpy
+        except ImportError:
+            _np = False
+    return _np or None
+
+NAN = float('nan')
+
+# Column name -> how to read it from a DayRecord
+METRICS = {
+    'protein': lambda r: r.totals.protein,
+    'carbs': lambda r: r.totals.carbs,
+    'fat': lambda r: r.totals.fat,
+    'kcal': lambda r: r.totals.kcal,
+    'seafoodKg': lambda r: r.totals.seafood_kg,
+    'fastedWeight': lambda r: r.fasted_weight,
+    'waist': lambda r: r.waist,
+}
+
+
+class MetricsStore:
+    """One float64 column per metric (NaN = not logged), kept in day order with prefix sums"""
+
+    def __init__(self):
+        # Held while resizing or while a NumPy view borrows a column's buffer
+        self._lock = threading.Lock()
+        self.dates: List[str] = []
+        self.columns: Dict[str, array] = {name: array('d') for name in METRICS}
+        # prefix_sum[m][i] / prefix_count[m][i] cover the logged (> 0) values of days [0, i)
+        self.prefix_sum: Dict[str, array] = {name: array('d', [0.0]) for name in METRICS}
+        self.prefix_count: Dict[str, array] = {name: array('q', [0]) for name in METRICS}
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def updated(self, records: List, first_changed: Optional[int]) -> 'MetricsStore':
+        """Store with the columns re-filled from `first_changed` onwards (None = nothing changed, self)
+
+        The days before `first_changed` are copied, not shared, so this store
+        (still held by older dataset snapshots) is never modified.
+        """
+        if first_changed is None:
+            return self
+        store = MetricsStore()
+        with self._lock:
+            store.dates = self.dates[:first_changed]
+            for name in METRICS:
+                store.columns[name] = self.columns[name][:first_changed]
+                store.prefix_sum[name] = self.prefix_sum[name][:first_changed + 1]
+                store.prefix_count[name] = self.prefix_count[name][:first_changed + 1]
+        first_changed = len(store.dates)
+        with store._lock:
+            for record in records[first_changed:]:
+                store.dates.append(record.date)
+                for name, read in METRICS.items():
+                    value = read(record)
+                    store.columns[name].append(NAN if value is None else value)
+            for name in METRICS:
+                store._extend_prefix(name, first_changed)
+        return store
+
+    def _extend_prefix(self, name: str, start: int):
+        """Append prefix sums/counts for column values [start, len)"""
+        column = self.columns[name]
+        prefix_sum = self.prefix_sum[name]
+        prefix_count = self.prefix_count[name]
+        np = _numpy(len(column) - start) if len(column) - start > 1 else None
+        if np is not None:
+            values = np.frombuffer(column, dtype=np.float64)[start:]
+            # NaN > 0 is False, so one comparison drops both missing and zero days
+            with np.errstate(invalid='ignore'):
+                logged = values > 0
+            sums = np.cumsum(np.where(logged, values, 0.0)) + prefix_sum[-1]
+            counts = np.cumsum(logged, dtype=np.int64) + prefix_count[-1]
+            # Release the view before the column can be resized again
+            del values
+            prefix_sum.frombytes(sums.tobytes())
+            prefix_count.frombytes(counts.tobytes())
+            return
+        total = prefix_sum[-1]
+        count = prefix_count[-1]
+        for value in column[start:]:
+            if value > 0:
+                total += value
+                count += 1
+            prefix_sum.append(total)
+            prefix_count.append(count)
+
+    def aggregate(self, metric: str, start: int = 0, stop: Optional[int] = None) -> Tuple[int, float]:
+        """(count, sum) of the logged, non-zero values of a metric in days [start, stop)"""
+        with self._lock:
+            size = len(self.dates)
+            stop = size if stop is None else min(stop, size)
+            start = max(start, 0)
+            if stop <= start:
+                return 0, 0.0
+            prefix_sum = self.prefix_sum[metric]
+            prefix_count = self.prefix_count[metric]
+            return prefix_count[stop] - prefix_count[start], prefix_sum[stop] - prefix_sum[start]
+
+    def mean(self, metric: str, start: int = 0, stop: Optional[int] = None) -> Optional[float]:
+        """Average of the logged, non-zero values, or None when nothing was logged"""
+        count, total = self.aggregate(metric, start, stop)
+        return total / count if count else None
+
+    def window(self, metric: str, start: int = 0, stop: Optional[int] = None) -> Tuple[List[str], List[float]]:
+        """Copies of the dates and raw values (NaN = not logged) of days [start, stop)"""
+        with self._lock:
+            stop = len(self.dates) if stop is None else stop
+            return self.dates[start:stop], self.columns[metric][start:stop].tolist()
+
+    def date_range(self, from_date: Optional[str] = None, to_date: Optional[str] = None) -> Tuple[int, int]:
+        """[start, stop) positions of the days between two inclusive YYYY-MM-DD dates"""
+        with self._lock:
+            start = bisect_left(self.dates, from_date) if from_date else 0
+            stop = bisect_right(self.dates, to_date) if to_date else len(self.dates)
+            return start, stop
+
+    def last(self, days: int) -> Tuple[int, int]:
+        """[start, stop) positions of the last `days` logged days"""
+        with self._lock:
+            size = len(self.dates)
+            return max(0, size - days), size
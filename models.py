@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Typed, normalized daily log records.
+
+Daily log files exist in two schemas: the newer one keeps macros under
+`total` (camelCase), older files keep them at the top level and sometimes use
+snake_case. Each file is normalized once at ingest into a slotted DayRecord
+with canonical field names, a parsed date and numeric values, so handlers
+read plain attributes instead of probing both schemas on every request.
+"""
+
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field, replace
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def to_float(value: Any) -> Optional[float]:
+    """Coerce a JSON value to float, or None when missing/unparseable"""
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _first(*values: Any) -> Any:
+    """First truthy value (the old `a or b or c` fallbacks), else the first non-None one"""
+    for value in values:
+        if value:
+            return value
+    for value in values:
+        if value is not None:
+            return value
+    return None
+
+
+# Keys of the compact per-day payload built by DayRecord.slim()
+SLIM_FIELDS = ('date', 'day', 'date_display', 'totals', 'fastedWeight', 'waist', 'feeling')
+
+
+@dataclass(slots=True)
+class DayTotals:
+    """Daily macro totals in canonical units (grams, kcal, kilograms of seafood)"""
+    protein: Optional[float] = None
+    carbs: Optional[float] = None
+    fat: Optional[float] = None
+    kcal: Optional[float] = None
+    seafood_kg: Optional[float] = None
+
+    @classmethod
+    def from_log(cls, data: Dict) -> 'DayTotals':
+        total = data.get('total') or {}
+        if not isinstance(total, dict):
+            total = {}
+        return cls(
+            protein=to_float(_first(total.get('protein'), data.get('protein'))),
+            carbs=to_float(_first(total.get('carbs'), data.get('carbs'))),
+            fat=to_float(_first(total.get('fat'), data.get('fat'))),
+            kcal=to_float(_first(total.get('kcal'), data.get('kcal'))),
+            seafood_kg=to_float(_first(
+                total.get('seafoodKg'), total.get('seafood_kg'),
+                data.get('seafoodKg'), data.get('seafood_kg')
+            )),
+        )
+
+    def to_dict(self) -> Dict:
+        """Canonical camelCase payload, matching the newer `total` schema"""
+        return {
+            'protein': self.protein,
+            'carbs': self.carbs,
+            'fat': self.fat,
+            'kcal': self.kcal,
+            'seafoodKg': self.seafood_kg,
+        }
+
+
+@dataclass(slots=True)
+class DayRecord:
+    """One normalized daily log. `raw` keeps the original JSON for full-payload endpoints."""
+    date: str
+    date_obj: Optional[date]
+    date_display: str
+    totals: DayTotals
+    fasted_weight: Optional[float] = None
+    waist: Optional[float] = None
+    training: Any = None
+    feeling: Any = None
+    day: int = 0
+    raw: Dict = field(default_factory=dict, repr=False)
+    _slim: Optional[Dict] = field(default=None, init=False, repr=False, compare=False)
+
+    @classmethod
+    def from_log(cls, data: Dict) -> 'DayRecord':
+        """Normalize a parsed daily log file; also fills `date_display` on the raw dict"""
+        date_str = data.get('date', '')
+        try:
+            date_obj = datetime.strptime(date_str, '%Y-%m-%d').date()
+            date_display = date_obj.strftime('%b %d, %Y')
+        except Exception as e:
+            print(f"Error parsing date {date_str}: {e}")
+            date_obj = None
+            date_display = date_str or 'Unknown'
+        data['date_display'] = date_display
+        return cls(
+            date=date_str,
+            date_obj=date_obj,
+            date_display=date_display,
+            totals=DayTotals.from_log(data),
+            fasted_weight=to_float(data.get('fastedWeight')),
+            waist=to_float(data.get('waist')),
+            training=data.get('training'),
+            feeling=data.get('feeling'),
+            raw=data,
+        )
+
+    def renumbered(self, day: int) -> 'DayRecord':
+        """Copy at another 1-based position in the log (mirrored into the raw payload)
+
+        Records are shared with dataset snapshots already handed out, so they
+        are never renumbered in place.
+        """
+        return replace(self, day=day, raw={**self.raw, 'day': day})
+
+    def slim(self) -> Dict:
+        """Compact payload (identity, normalized totals, weight, waist, feeling), built once"""
+        if self._slim is None:
+            self._slim = {
+                'date': self.date,
+                'day': self.day,
+                'date_display': self.date_display,
+                'totals': self.totals.to_dict(),
+                'fastedWeight': self.raw.get('fastedWeight'),
+                'waist': self.raw.get('waist'),
+                'feeling': self.feeling,
+            }
+        return self._slim
+
+
+class DayIndex:
+    """date -> DayRecord for O(1) single-day lookups (the first record wins for a repeated date)
+
+    Also keeps the record dates in order, parallel to the records, so date
+    range queries bisect the index itself rather than another store's copy of
+    the dates. Daily log files are named by date, so the ingest index keeps
+    records in date order.
+
+    Never modified once built: updated() re-indexes the records from the first
+    changed position onwards into a new index, so dataset snapshots holding
+    the old one keep a consistent view.
+    """
+
+    def __init__(self):
+        self._records: List[DayRecord] = []
+        self._by_date: Dict[str, DayRecord] = {}
+        self._dates: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self._by_date)
+
+    def updated(self, records: List[DayRecord], first_changed: Optional[int]) -> 'DayIndex':
+        """Index with records from `first_changed` onwards re-indexed (None = nothing changed, self)"""
+        if first_changed is None:
+            return self
+        by_date = dict(self._by_date)
+        for record in self._records[first_changed:]:
+            if by_date.get(record.date) is record:
+                del by_date[record.date]
+        for record in records[first_changed:]:
+            by_date.setdefault(record.date, record)
+        index = DayIndex()
+        index._by_date = by_date
+        index._dates = self._dates[:first_changed] + [record.date for record in records[first_changed:]]
+        # The ingest index replaces its list on change, so this stays the old view
+        index._records = records
+        return index
+
+    def get(self, date_str: str) -> Optional[DayRecord]:
+        return self._by_date.get(date_str)
+
+    def date_range(self, from_date: Optional[str] = None, to_date: Optional[str] = None) -> Tuple[int, int]:
+        """[start, stop) positions of the days between two inclusive YYYY-MM-DD dates"""
+        start = bisect_left(self._dates, from_date) if from_date else 0
+        stop = bisect_right(self._dates, to_date) if to_date else len(self._dates)
+        return start, stop
+
+    def between(self, from_date: Optional[str] = None, to_date: Optional[str] = None) -> List[DayRecord]:
+        """Records between two inclusive YYYY-MM-DD dates (either end may be open)"""
+        start, stop = self.date_range(from_date, to_date)
+        return self._records[start:stop]
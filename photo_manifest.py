@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Photo manifest for the gallery (/api/photos).
+
+The photo list merges three sources: every blob in Vercel Blob storage
+(all pages of the list API, following its cursors), local uploads in
+static/uploads, and the URLs recorded in uploaded_photos.txt. Merging is
+keyed by URL, and the result is kept newest first. It is cached for
+PHOTO_MANIFEST_TTL seconds:
+
+- a stale manifest is still served while one background thread rebuilds it;
+- uploads handled by the app are added straight away (PhotoManifest.add),
+  without waiting for the next rebuild, and kept until a listing includes
+  them (the Blob list API is eventually consistent) or ADDED_TTL passes;
+- if Blob can't be listed, the last successful listing is kept.
+
+Pages are keyed on the last photo returned, (date, url), not an offset, so
+photos uploaded while someone scrolls don't shift the pages after it. Keys
+must therefore not move between rebuilds: a photo keeps the date it was
+first listed with, and a blob without an upload time is dated from the
+timestamp in its file name (YYYYmmdd_HHMMSS_<name>, as the upload handlers
+name them) or, failing that, UNKNOWN_DATE, never the time of the rebuild.
+"""
+
+import base64
+import os
+import re
+import threading
+import time
+from bisect import bisect_left
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import blob_store
+
+PHOTO_MANIFEST_TTL = float(os.getenv('PHOTO_MANIFEST_TTL', 60))
+# How long an added photo missing from the listings is still served
+ADDED_TTL = 600
+# Blob list API page size (its maximum) and a bound on pages per rebuild
+BLOB_LIST_LIMIT = 1000
+MAX_LIST_PAGES = 100
+MAX_PAGE_SIZE = 1000
+
+PHOTO_SUFFIXES = ('.jpg', '.jpeg', '.png', '.gif', '.webp')
+
+# Sorts before every real date: photos whose upload time is unknown
+UNKNOWN_DATE = '1970-01-01T00:00:00'
+_NAME_TIMESTAMP = re.compile(r'(\d{8})_(\d{6})_[^/]*$')
+
+Key = Tuple[str, str]
+
+
+def encode_cursor(key: Key) -> str:
+    date, url = key
+    return base64.urlsafe_b64encode(f"{date}|{url}".encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Key:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+    except ValueError:
+        raw = ''
+    date, sep, url = raw.partition('|')
+    if not sep or not url:
+        raise ValueError(f"Invalid cursor={cursor}")
+    return date, url
+
+
+def name_date(url: str) -> Optional[str]:
+    """Upload time from a YYYYmmdd_HHMMSS_<name> file name, if the URL has one"""
+    match = _NAME_TIMESTAMP.search(urlsplit(url).path)
+    if match is None:
+        return None
+    try:
+        return datetime.strptime(''.join(match.groups()), '%Y%m%d%H%M%S').isoformat()
+    except ValueError:
+        return None
+
+
+def _blob_photo(blob: Dict, api_url: str) -> Optional[Dict]:
+    # Get URL - try different possible fields
+    url = blob.get('url') or blob.get('downloadUrl') or blob.get('pathname') or blob.get('key')
+    if not url:
+        return None
+    # Construct full URL if it's just a pathname
+    if not url.startswith('http'):
+        url = f'{api_url}/{url}'
+    return {
+        'url': url,
+        'date': (blob.get('uploadedAt') or
+                 blob.get('createdAt') or
+                 blob.get('uploaded') or
+                 name_date(url) or
+                 UNKNOWN_DATE),
+    }
+
+
+class PhotoManifest:
+    """Merged, de-duplicated, newest-first photo list with a TTL and background rebuilds"""
+
+    def __init__(self, ttl: float = PHOTO_MANIFEST_TTL,
+                 upload_folder: Path = Path('static/uploads'),
+                 photos_file: Path = Path('uploaded_photos.txt')):
+        self.ttl = ttl
+        self.upload_folder = Path(upload_folder)
+        self.photos_file = Path(photos_file)
+        self._lock = threading.Lock()
+        self._build_lock = threading.RLock()
+        # Oldest first, parallel to their (date, url) keys, for bisecting
+        self._keys: List[Key] = []
+        self._photos: List[Dict] = []
+        self._urls: Dict[str, Key] = {}
+        self._newest_first: Optional[List[Dict]] = None
+        self._built_at: Optional[float] = None
+        self._refreshing = False
+        # url -> (date, time.monotonic() when added)
+        self._added: Dict[str, Tuple[str, float]] = {}
+        self._blob_photos: List[Dict] = []
+
+    # Sources
+
+    def _list_blobs(self) -> List[Dict]:
+        blob_token = os.getenv('BLOB_READ_WRITE_TOKEN')
+        if not blob_token:
+            return []
+        client = blob_store.store(blob_token)
+        photos = []
+        cursor = None
+        try:
+            for _ in range(MAX_LIST_PAGES):
+                page = client.list(limit=BLOB_LIST_LIMIT, cursor=cursor)
+                for blob in page.get('blobs') or page.get('data') or []:
+                    photo = _blob_photo(blob, client.api_url)
+                    if photo is not None:
+                        photos.append(photo)
+                cursor = page.get('cursor')
+                if not page.get('hasMore') or not cursor:
+                    break
+        except Exception as e:
+            print(f"Error fetching from Blob (keeping the last listing): {e}")
+            import traceback
+            traceback.print_exc()
+            return self._blob_photos
+        self._blob_photos = photos
+        return photos
+
+    def _local_photos(self) -> List[Dict]:
+        # Local uploads folder (development/fallback)
+        photos = []
+        if self.upload_folder.exists():
+            for file in self.upload_folder.glob('*'):
+                if file.suffix.lower() in PHOTO_SUFFIXES:
+                    photos.append({
+                        'url': f"/static/uploads/{file.name}",
+                        'date': datetime.fromtimestamp(file.stat().st_mtime).isoformat()
+                    })
+        return photos
+
+    def _recorded_photos(self) -> List[Dict]:
+        # The simple text file with uploaded URLs (fallback)
+        photos = []
+        if self.photos_file.exists():
+            try:
+                with open(self.photos_file, 'r') as f:
+                    for line in f:
+                        line = line.strip()
+                        if '|' in line:
+                            url, date = line.split('|', 1)
+                            photos.append({'url': url, 'date': date})
+            except Exception as e:
+                print(f"Error reading photos file: {e}")
+        return photos
+
+    # Building
+
+    def rebuild(self):
+        """List every source now and swap in the merged manifest"""
+        with self._build_lock:
+            merged: Dict[str, Dict] = {}
+            for photos in (self._list_blobs(), self._local_photos(), self._recorded_photos()):
+                for photo in photos:
+                    merged.setdefault(photo['url'], photo)
+            with self._lock:
+                # Added uploads the listings don't show yet are kept until they do
+                now = time.monotonic()
+                for url, (date, added_at) in list(self._added.items()):
+                    if url in merged or now - added_at > ADDED_TTL:
+                        del self._added[url]
+                    else:
+                        merged[url] = {'url': url, 'date': date}
+                # Photos already served keep their key, so cursors stay valid
+                for url, photo in merged.items():
+                    known = self._urls.get(url)
+                    if known is not None and known[0] != UNKNOWN_DATE and known[0] != photo['date']:
+                        merged[url] = {'url': url, 'date': known[0]}
+                ordered = sorted(merged.values(), key=lambda p: (p['date'], p['url']))
+                self._photos = ordered
+                self._keys = [(p['date'], p['url']) for p in ordered]
+                self._urls = dict(zip((p['url'] for p in ordered), self._keys))
+                self._newest_first = None
+                self._built_at = time.monotonic()
+                self._refreshing = False
+            print(f"Photo manifest rebuilt: {len(ordered)} photos")
+
+    def _background_rebuild(self):
+        try:
+            self.rebuild()
+        except Exception as e:
+            print(f"Error rebuilding photo manifest: {e}")
+            with self._lock:
+                self._refreshing = False
+
+    def _fresh(self):
+        """Build on first use; past the TTL, start a background rebuild and serve what we have"""
+        if self._built_at is None:
+            with self._build_lock:
+                if self._built_at is None:
+                    self.rebuild()
+            return
+        if time.monotonic() - self._built_at < self.ttl:
+            return
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(target=self._background_rebuild, daemon=True).start()
+
+    def add(self, url: str, date: Optional[str] = None):
+        """Register a photo uploaded through the app without waiting for a rebuild"""
+        date = date or name_date(url) or datetime.now().isoformat()
+        with self._lock:
+            self._added[url] = (date, time.monotonic())
+            if url in self._urls:
+                return
+            key = (date, url)
+            index = bisect_left(self._keys, key)
+            # Copy-on-write so pages being served keep a consistent list
+            self._keys = self._keys[:index] + [key] + self._keys[index:]
+            self._photos = self._photos[:index] + [{'url': url, 'date': date}] + self._photos[index:]
+            self._urls[url] = key
+            self._newest_first = None
+
+    # Reading
+
+    def photos(self) -> List[Dict]:
+        """Every photo, newest first"""
+        self._fresh()
+        with self._lock:
+            if self._newest_first is None:
+                self._newest_first = self._photos[::-1]
+            return self._newest_first
+
+    def page(self, limit: int, cursor: Optional[str] = None) -> Tuple[List[Dict], Optional[str], int]:
+        """(photos, next_cursor, total): up to `limit` photos older than `cursor`, newest first"""
+        self._fresh()
+        with self._lock:
+            keys, photos = self._keys, self._photos
+        stop = bisect_left(keys, decode_cursor(cursor)) if cursor else len(keys)
+        start = max(0, stop - limit)
+        next_cursor = encode_cursor(keys[start]) if start > 0 else None
+        return photos[start:stop][::-1], next_cursor, len(keys)
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Pre-rendered responses for the read endpoints.
+
+`python prerender.py` renders /api/data, /api/stats, /api/training and
+/api/body-scans (no query string) through the app itself and writes each
+body, plus gzip and (with the optional `brotli` package) br variants, to
+public/prerendered/<version>/. public/prerendered/manifest.json maps each
+version to its files. The directory is a build artifact, not tracked in
+git: the Render build runs `python prerender.py`, deploy.sh also runs
+`python prerender.py --vercel` (the Vercel bundle reads api/data rather
+than public/data). Vercel's git builds have no build step, so there the
+routes render dynamically unless a bundle was deployed with the files.
+
+A version is the content version of the dataset (see
+DatasetCache.content_version) joined with a digest of the code that renders
+it (render_version). The routes serve a pre-rendered file only while both
+match what is being served; any edit to the data or to the app's modules
+makes them fall back to rendering dynamically until the command is run
+again, so a deploy that skipped it is slower but never stale.
+"""
+
+import hashlib
+import os
+import shutil
+import sys
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import json_codec
+from response_cache import MIN_COMPRESS_BYTES, available_encodings, compress
+
+PRERENDER_DIR = Path(os.getenv('PRERENDER_DIR', Path(__file__).parent / 'public' / 'prerendered'))
+MANIFEST_NAME = 'manifest.json'
+# Versions kept in the manifest (one per data layout, plus the previous ones)
+MAX_VERSIONS = 4
+
+PRERENDERED_PATHS = ('/api/data', '/api/stats', '/api/training', '/api/body-scans')
+
+_SUFFIXES = {'identity': '', 'gzip': '.gz', 'br': '.br'}
+
+_code_digest: Optional[str] = None
+
+
+def code_digest() -> str:
+    """Digest of the app's modules and JSON backend, the same on every host running this code
+
+    Hashed once per process. Unlike app.BUILD_ID it doesn't depend on file
+    mtimes or the deploy platform, so a render made at build time still
+    matches at runtime.
+    """
+    global _code_digest
+    if _code_digest is None:
+        digest = hashlib.sha1(json_codec.BACKEND.encode('utf-8'))
+        for module in sorted(Path(__file__).parent.glob('*.py')):
+            digest.update(module.name.encode('utf-8'))
+            digest.update(module.read_bytes())
+        _code_digest = digest.hexdigest()[:12]
+    return _code_digest
+
+
+def render_version(content_version: Optional[str]) -> Optional[str]:
+    """Manifest key for a dataset content version rendered by this code"""
+    return f"{content_version}-{code_digest()}" if content_version else None
+
+
+class PrerenderedResponses:
+    """The manifest and file bodies under a pre-render directory, reloaded when the manifest changes"""
+
+    def __init__(self, directory: Path = PRERENDER_DIR):
+        self.directory = Path(directory)
+        self._lock = threading.Lock()
+        self._signature = None
+        self._manifest: Dict = {}
+        self._bodies: Dict[str, bytes] = {}
+
+    def _current(self) -> Dict:
+        try:
+            st = os.stat(self.directory / MANIFEST_NAME)
+            signature = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            signature = None
+        if signature == self._signature:
+            return self._manifest
+        with self._lock:
+            if signature != self._signature:
+                manifest = {}
+                if signature is not None:
+                    try:
+                        manifest = json_codec.load_file(self.directory / MANIFEST_NAME)
+                    except Exception as e:
+                        print(f"Error loading pre-render manifest: {e}")
+                self._manifest = manifest
+                self._bodies = {}
+                self._signature = signature
+            return self._manifest
+
+    def has_versions(self) -> bool:
+        return bool(self._current().get('versions'))
+
+    def lookup(self, content_version: Optional[str], path: str, encodings: List[str]) -> Optional[Tuple[bytes, str]]:
+        """(body, content coding) of `path` for `content_version`, in the first available encoding
+
+        None when nothing was pre-rendered for that exact dataset version,
+        code and path.
+        """
+        version = render_version(content_version)
+        entry = self._current().get('versions', {}).get(version) if version else None
+        files = entry.get('files', {}).get(path) if entry else None
+        if not files:
+            return None
+        for encoding in encodings:
+            name = files.get(encoding)
+            if not name:
+                continue
+            body = self._bodies.get(name)
+            if body is None:
+                try:
+                    body = (self.directory / name).read_bytes()
+                except OSError as e:
+                    print(f"Pre-rendered file missing for {path}: {e}")
+                    continue
+                with self._lock:
+                    self._bodies[name] = body
+            return body, encoding
+        return None
+
+
+def _slug(path: str) -> str:
+    return path.strip('/').replace('/', '-') + '.json'
+
+
+def render(directory: Path = PRERENDER_DIR) -> Tuple[str, Dict]:
+    """Render every pre-rendered path for the current dataset; returns (version, manifest)"""
+    import app as webapp
+
+    # Render from the code, never from an earlier pre-render of the same data
+    webapp._prerendered = PrerenderedResponses(directory / 'disabled')
+    client = webapp.app.test_client()
+    version = render_version(webapp.TransformationDataLoader().get_content_version())
+    if not version:
+        raise RuntimeError("dataset content version unavailable")
+
+    target = directory / version
+    target.mkdir(parents=True, exist_ok=True)
+    files = {}
+    for path in PRERENDERED_PATHS:
+        response = client.get(path, headers={'Accept-Encoding': 'identity'})
+        if response.status_code != 200 or response.is_json and 'error' in (response.get_json() or {}):
+            raise RuntimeError(f"{path} returned {response.status_code}")
+        body = response.get_data()
+        variants = {'identity': body}
+        if len(body) >= MIN_COMPRESS_BYTES:
+            for encoding in available_encodings():
+                variants[encoding] = compress(body, encoding)
+        files[path] = {}
+        for encoding, data in variants.items():
+            name = f"{version}/{_slug(path)}{_SUFFIXES[encoding]}"
+            (directory / name).write_bytes(data)
+            files[path][encoding] = name
+
+    manifest = {'versions': {}}
+    if (directory / MANIFEST_NAME).is_file():
+        try:
+            manifest = json_codec.load_file(directory / MANIFEST_NAME)
+        except Exception as e:
+            print(f"Replacing unreadable pre-render manifest: {e}")
+    versions = manifest.setdefault('versions', {})
+    versions[version] = {'generated_at': datetime.now().isoformat(), 'files': files}
+    # Keep the newest renders only
+    for stale in sorted(versions, key=lambda v: versions[v]['generated_at'])[:-MAX_VERSIONS]:
+        del versions[stale]
+    tmp = directory / (MANIFEST_NAME + '.tmp')
+    tmp.write_bytes(json_codec.dumps(manifest, indent=2))
+    os.replace(tmp, directory / MANIFEST_NAME)
+
+    for entry in directory.iterdir():
+        if entry.is_dir() and entry.name not in versions:
+            shutil.rmtree(entry)
+    return version, manifest
+
+
+def main(argv: List[str]) -> int:
+    if '--vercel' in argv:
+        # Resolve data paths the way the deployed bundle does (api/data first)
+        os.environ['VERCEL'] = '1'
+    try:
+        version, manifest = render()
+    except Exception as e:
+        print(f"Pre-render failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+    print(f"Pre-rendered version {version} to {PRERENDER_DIR}:")
+    for path, files in manifest['versions'][version]['files'].items():
+        print(f"  {path}: {', '.join(sorted(files))}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
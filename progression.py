@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Strength progression for one exercise, computed from its training sessions.
+
+For every session: the top set (heaviest load, then most reps), estimated
+one-rep max by the Epley and Brzycki formulas, and tonnage (load x reps over
+every set except warm-ups). From the last two sessions with a load it
+suggests the next load with the same rules the training tracker used on the
+client. It continues a rising trend, steps up after 8+ average reps at an
+unchanged load, holds after a drop, and otherwise takes a small step.
+
+Loads are compared in kg. The suggestion steps in the unit the latest
+session was logged in, and every figure is returned in both kg and lbs.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+LBS_PER_KG = 2.20462
+
+# Suggestion steps per logged unit: (after solid reps at the same load, small step)
+STEPS = {'lbs': (5.0, 2.5), 'kg': (2.5, 1.25)}
+
+
+def _positive(value) -> Optional[float]:
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0:
+        return None
+    return float(value)
+
+
+def set_load(set_info: Dict) -> Tuple[Optional[float], Optional[str], bool]:
+    """(load in kg, logged unit, logged per side) for one set; load is None when unweighted"""
+    for field, unit, per_side in (
+        ('total_added_weight_kg', 'kg', False),
+        ('total_added_weight_lbs', 'lbs', False),
+        ('weight_each_side_kg', 'kg', True),
+        ('weight_each_side_lbs', 'lbs', True),
+    ):
+        value = _positive(set_info.get(field))
+        if value is None:
+            continue
+        if per_side:
+            value *= 2
+        return (value if unit == 'kg' else value / LBS_PER_KG), unit, per_side
+    return None, None, False
+
+
+def epley(load: float, reps: int) -> float:
+    return load if reps == 1 else load * (1 + reps / 30)
+
+
+def brzycki(load: float, reps: int) -> Optional[float]:
+    # Diverges at 37 reps; meaningless well before that
+    return load * 36 / (37 - reps) if reps < 37 else None
+
+
+def _kg_lbs(value: Optional[float], digits: int = 1) -> Dict:
+    if value is None:
+        return {'kg': None, 'lbs': None}
+    return {'kg': round(value, digits), 'lbs': round(value * LBS_PER_KG, digits)}
+
+
+def summarize_session(session: Dict) -> Dict:
+    """Top set, e1RM and tonnage of one session from TrainingIndex.exercise_groups"""
+    top = None
+    tonnage = 0.0
+    reps_logged = []
+    for set_info in session.get('sets_reps') or []:
+        load, unit, per_side = set_load(set_info)
+        reps = _positive(set_info.get('reps'))
+        reps = int(reps) if reps is not None else None
+        if reps:
+            reps_logged.append(reps)
+        if load is None:
+            continue
+        if reps and set_info.get('set') != 'warm-up':
+            tonnage += load * reps
+        if top is None or (load, reps or 0) > (top['load'], top['reps'] or 0):
+            top = {'load': load, 'reps': reps, 'unit': unit, 'per_side': per_side, 'set': set_info.get('set')}
+
+    summary = {
+        'date': session.get('date'),
+        'day': session.get('day'),
+        'top_set': None,
+        'e1rm_epley': _kg_lbs(None),
+        'e1rm_brzycki': _kg_lbs(None),
+        'tonnage': _kg_lbs(tonnage if tonnage else None, 0),
+        'sets': len(session.get('sets_reps') or []),
+        'avg_reps': round(sum(reps_logged) / len(reps_logged), 1) if reps_logged else None,
+    }
+    if top is not None:
+        summary['top_set'] = {
+            'set': top['set'],
+            'reps': top['reps'],
+            'weight': _kg_lbs(top['load']),
+            'logged_in': top['unit'],
+            'per_side': top['per_side'],
+        }
+        if top['reps']:
+            summary['e1rm_epley'] = _kg_lbs(epley(top['load'], top['reps']))
+            summary['e1rm_brzycki'] = _kg_lbs(brzycki(top['load'], top['reps']))
+        # Unrounded, for the suggestion
+        summary['_load'] = top['load']
+    return summary
+
+
+def suggest_next(summaries: List[Dict]) -> Dict:
+    """Next load from the last two sessions that recorded one"""
+    loaded = [s for s in summaries if s.get('_load')]
+    if len(loaded) < 2:
+        return {'weight': _kg_lbs(None), 'each_side': _kg_lbs(None), 'basis': 'insufficient_data',
+                'message': 'Need at least 2 sessions with weight data to suggest progression'}
+
+    latest, previous = loaded[-1], loaded[-2]
+    unit = latest['top_set']['logged_in']
+    per_side = latest['top_set']['per_side']
+    scale = LBS_PER_KG if unit == 'lbs' else 1.0
+    latest_load = round(latest['_load'] * scale, 1)
+    difference = round(latest_load - previous['_load'] * scale, 1)
+    # The tracker judged reps on the latest session overall, loaded or not
+    avg_reps = summaries[-1]['avg_reps'] or 0
+    solid_step, small_step = STEPS[unit]
+
+    if difference > 0:
+        suggested, basis = latest_load + difference, 'progression'
+        message = f"Based on your progression (+{difference:g} {unit}), try {suggested:g} {unit} next session."
+    elif difference == 0 and avg_reps >= 8:
+        suggested, basis = latest_load + solid_step, 'reps'
+        message = (f"You've been hitting {round(avg_reps)} reps consistently. "
+                   f"Try {suggested:g} {unit} for progressive overload.")
+    elif difference < 0:
+        suggested, basis = latest_load, 'maintain'
+        message = f"Weight decreased last session. Maintain {suggested:g} {unit} and focus on form/volume."
+    else:
+        suggested, basis = latest_load + small_step, 'small_step'
+        message = f"Try a small increase to {suggested:g} {unit} if you're hitting 8+ reps consistently."
+
+    suggested_kg = suggested / scale
+    return {
+        'weight': _kg_lbs(suggested_kg),
+        'each_side': _kg_lbs(suggested_kg / 2) if per_side else _kg_lbs(None),
+        'unit': unit,
+        'basis': basis,
+        'message': message,
+    }
+
+
+def build_progression(name: str, category: str, sessions: List[Dict]) -> Dict:
+    """Full progression payload for /api/training/<exercise>/progression"""
+    summaries = [summarize_session(session) for session in sessions]
+    next_weight = suggest_next(summaries)
+    best = max((s for s in summaries if s['e1rm_epley']['kg'] is not None),
+               key=lambda s: s['e1rm_epley']['kg'], default=None)
+    for summary in summaries:
+        summary.pop('_load', None)
+    return {
+        'exercise': name,
+        'category': category,
+        'total_sessions': len(summaries),
+        'sessions': summaries,
+        'best_e1rm': {'date': best['date'], 'epley': best['e1rm_epley'], 'brzycki': best['e1rm_brzycki']} if best else None,
+        'next_weight': next_weight,
+    }
+
+
+def chart_summary(result: Dict) -> Dict:
+    """The part of a build_progression() payload the training tracker renders for every exercise
+
+    Next-weight suggestion, best e1RM and one point (top-set load, e1RM) per
+    session, small enough to ship for every exercise inside /api/training.
+    """
+    return {
+        'next_weight': result['next_weight'],
+        'best_e1rm': result['best_e1rm'],
+        'series': [
+            {
+                'date': session['date'],
+                'day': session['day'],
+                'weight': session['top_set']['weight'] if session['top_set'] else _kg_lbs(None),
+                'e1rm': session['e1rm_epley'],
+            }
+            for session in result['sessions']
+        ],
+    }
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+LRU cache of serialized API responses and their compressed variants.
+
+Read endpoints are keyed by (path, query string, dataset ETag), so an entry is
+only ever served for the exact dataset it was rendered from; stale entries are
+simply never hit again and age out. Each entry keeps the JSON bytes plus the
+gzip (and, when the optional `brotli` package is installed, br) encodings,
+built lazily the first time a client asks for them. Eviction is least
+recently used under a byte budget covering every stored variant.
+"""
+
+import gzip
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Bodies smaller than this are not worth compressing
+MIN_COMPRESS_BYTES = 1024
+
+
+def available_encodings() -> Tuple[str, ...]:
+    """Content codings this process can produce, in order of preference"""
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(body, quality=5)
+    # mtime=0 keeps the bytes identical across workers
+    return gzip.compress(body, compresslevel=6, mtime=0)
+
+
+class ResponseCache:
+    """Byte-budgeted LRU of {encoding: body} variants per response"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Dict]" = OrderedDict()
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def get(self, key: Hashable, encoding: str = 'identity') -> Optional[Tuple[bytes, str, str]]:
+        """(body, content_coding, mimetype) for a cached response, or None on a miss
+
+        The requested encoding is built and stored on first use. Small bodies
+        are always returned uncompressed.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            variants = entry['variants']
+            identity = variants['identity']
+            if encoding == 'identity' or len(identity) < MIN_COMPRESS_BYTES:
+                return identity, 'identity', entry['mimetype']
+            body = variants.get(encoding)
+            if body is not None:
+                return body, encoding, entry['mimetype']
+
+        # Compress outside the lock; a concurrent duplicate is harmless
+        body = compress(identity, encoding)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and encoding not in entry['variants']:
+                entry['variants'][encoding] = body
+                entry['size'] += len(body)
+                self._size += len(body)
+                self._evict()
+        return body, encoding, entry['mimetype'] if entry else 'application/json'
+
+    def put(self, key: Hashable, body: bytes, mimetype: str):
+        """Store the uncompressed body of a response"""
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= previous['size']
+            self._entries[key] = {'variants': {'identity': body}, 'mimetype': mimetype, 'size': len(body)}
+            self._size += len(body)
+            self._evict()
+
+    def _evict(self):
+        while self._size > self.max_bytes and self._entries:
+            _, entry = self._entries.popitem(last=False)
+            self._size -= entry['size']
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._size,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'encodings': list(available_encodings()),
+            }
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Chart series with server-side downsampling.
+
+Largest-Triangle-Three-Buckets (Steinarsson, 2013) keeps the first and last
+point and, from each of the buckets in between, the point forming the
+largest triangle with the previously kept point and the next bucket's
+average. Peaks and dips survive, so a chart of thousands of daily values can
+be drawn from a few hundred points without visibly changing shape.
+
+x is the calendar day (date ordinal), so gaps in logging keep their width.
+"""
+
+from datetime import date
+from typing import List, Optional, Sequence, Tuple
+
+# Endpoint names -> MetricsStore columns
+SERIES_METRICS = {
+    'fastedWeight': 'fastedWeight',
+    'waist': 'waist',
+    'protein': 'protein',
+    'carbs': 'carbs',
+    'fat': 'fat',
+    'kcal': 'kcal',
+    'seafood': 'seafoodKg',
+    'seafoodKg': 'seafoodKg',
+}
+
+DEFAULT_POINTS = 200
+MAX_POINTS = 2000
+
+
+def lttb(xs: Sequence[float], ys: Sequence[float], threshold: int) -> List[int]:
+    """Indices of the points kept when downsampling (xs, ys) to `threshold` points"""
+    n = len(xs)
+    if threshold >= n or threshold < 3:
+        return list(range(n))
+
+    kept = [0]
+    # Buckets cover the points between the fixed first and last ones
+    bucket_size = (n - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        start = int(i * bucket_size) + 1
+        stop = int((i + 1) * bucket_size) + 1
+
+        # Average of the next bucket (the last point for the final bucket)
+        next_start = stop
+        next_stop = min(int((i + 2) * bucket_size) + 1, n)
+        if next_start >= next_stop:
+            next_start, next_stop = n - 1, n
+        count = next_stop - next_start
+        avg_x = sum(xs[next_start:next_stop]) / count
+        avg_y = sum(ys[next_start:next_stop]) / count
+
+        ax, ay = xs[a], ys[a]
+        best, best_area = start, -1.0
+        for j in range(start, stop):
+            area = abs((ax - avg_x) * (ys[j] - ay) - (ax - xs[j]) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = j, area
+        kept.append(best)
+        a = best
+    kept.append(n - 1)
+    return kept
+
+
+def downsample(dates: Sequence[str], values: Sequence[float], points: int,
+               days: Optional[Sequence[int]] = None) -> Tuple[List[dict], int]:
+    """Logged (> 0) values as [{date, day, value}] downsampled to `points`; also the raw count"""
+    xs, ys, positions = [], [], []
+    for i, (date_str, value) in enumerate(zip(dates, values)):
+        # NaN > 0 is False, so missing days drop out with the zero ones
+        if not value > 0:
+            continue
+        try:
+            xs.append(date.fromisoformat(date_str).toordinal())
+        except (TypeError, ValueError):
+            continue
+        ys.append(value)
+        positions.append(i)
+
+    series = []
+    for k in lttb(xs, ys, points):
+        i = positions[k]
+        series.append({
+            'date': dates[i],
+            'day': days[i] if days is not None else None,
+            'value': ys[k],
+        })
+    return series, len(xs)
@@ -131,6 +131,36 @@ function selectDashboardToday() {
     loadDashboardDay();
 }
 
+// Full day payloads by date, filled by prefetchDashboardDays
+const dashboardDayCache = {};
+const DAY_PREFETCH_RADIUS = 3;
+
+async function prefetchDashboardDays(date) {
+    // availableDates is most recent first
+    const index = availableDates.indexOf(date);
+    if (index === -1) return;
+    const neighbours = availableDates.slice(
+        Math.max(0, index - DAY_PREFETCH_RADIUS),
+        index + DAY_PREFETCH_RADIUS + 1
+    );
+    if (neighbours.every(d => dashboardDayCache[d])) return;
+    
+    try {
+        const from = neighbours[neighbours.length - 1];
+        const to = neighbours[0];
+        const response = await fetch(`/api/days?from=${from}&to=${to}`);
+        if (!response.ok) return;
+        const data = await response.json();
+        (data.days || []).forEach(day => {
+            if (day.date) {
+                dashboardDayCache[day.date] = day;
+            }
+        });
+    } catch (error) {
+        console.log('Day prefetch failed:', error);
+    }
+}
+
 async function loadDashboardDay() {
     const datePicker = document.getElementById('dashboardDatePicker');
     if (!datePicker) return;
@@ -149,12 +179,18 @@ async function loadDashboardDay() {
         }
     });
     
-    // Try to load full day data from API
+    // Try to load full day data from API (neighbouring days are prefetched)
     try {
-        const response = await fetch(`/api/day/${selectedDate}`);
-        if (response.ok) {
-            const fullDayData = await response.json();
+        let fullDayData = dashboardDayCache[selectedDate];
+        if (!fullDayData) {
+            const response = await fetch(`/api/day/${selectedDate}`);
+            if (response.ok) {
+                fullDayData = await response.json();
+            }
+        }
+        if (fullDayData) {
             renderDashboardFullDayView(fullDayData);
+            prefetchDashboardDays(selectedDate);
             return;
         }
     } catch (error) {
@@ -482,21 +518,21 @@ function animateStreakNumber(element, start, end) {
 
 async function loadDashboardBodyScanRings() {
     try {
-        const response = await fetch('/api/body-scans');
-        if (!response.ok) {
+        // Only the two scans being compared, not the whole history (404 = no scans yet)
+        const response = await fetch('/api/body-scans/compare?a=first&b=latest');
+        if (!response.ok && response.status !== 404) {
             throw new Error(`HTTP error! status: ${response.status}`);
         }
-        const data = await response.json();
-        const scans = data.scans || [];
+        const data = response.ok ? await response.json() : { total: 0 };
         
-        if (scans.length < 2) {
+        if ((data.total || 0) < 2) {
             document.getElementById('dashboardRingsContainer').innerHTML = 
                 '<div class="rings-empty">Need at least 2 scans to show progress</div>';
             return;
         }
         
-        const baseline = scans[0];
-        const latest = scans[scans.length - 1];
+        const baseline = data.a;
+        const latest = data.b;
         
         if (!baseline || !latest) {
             document.getElementById('dashboardRingsContainer').innerHTML = 
@@ -677,49 +713,69 @@ function setDashboardTimeframe(days) {
     }
 }
 
-function renderDashboardWeightChart() {
+// Upper bound on plotted points; the server downsamples longer histories
+const DASHBOARD_CHART_POINTS = 150;
+let dashboardWeightChartRequest = 0;
+
+async function renderDashboardWeightChart() {
     const canvas = document.getElementById('dashboardWeightChart');
     if (!canvas || !dashboardData || !dashboardData.daily_logs) return;
     
-    // Destroy existing chart
-    if (window.dashboardWeightChartInstance) {
-        window.dashboardWeightChartInstance.destroy();
-    }
+    const timeframe = (window.chartState && window.chartState.timeframe) || 7;
+    const request = ++dashboardWeightChartRequest;
     
-    const dailyLogs = dashboardData.daily_logs || [];
-    const baseline = dashboardData.baseline || {};
+    // Downsampled series from the server (keeps peaks/dips, stays small as history grows)
+    let points = null;
+    try {
+        const response = await fetch(`/api/series/fastedWeight?timeframe=${timeframe}&points=${DASHBOARD_CHART_POINTS}`);
+        if (response.ok) {
+            points = (await response.json()).series;
+        }
+    } catch (error) {
+        console.log('Series API not available, using loaded logs');
+    }
     
-    // Filter logs based on timeframe
-    const timeframe = (window.chartState && window.chartState.timeframe) || 7;
-    let logsForChart = dailyLogs;
-    if (timeframe !== 'all') {
-        const numDays = parseInt(timeframe);
-        if (!isNaN(numDays) && numDays > 0) {
-            logsForChart = dailyLogs.slice(-numDays);
+    // Fallback: filter the loaded logs based on timeframe
+    if (!points) {
+        let logsForChart = dashboardData.daily_logs || [];
+        if (timeframe !== 'all') {
+            const numDays = parseInt(timeframe);
+            if (!isNaN(numDays) && numDays > 0) {
+                logsForChart = logsForChart.slice(-numDays);
+            }
         }
+        points = logsForChart.map(log => {
+            const weight = log.fastedWeight || log.fasted_weight;
+            return { date: log.date, value: weight ? parseFloat(weight) : null };
+        });
     }
     
-    if (logsForChart.length === 0) {
+    // A newer timeframe was picked while this one was loading
+    if (request !== dashboardWeightChartRequest) return;
+    
+    // Destroy existing chart
+    if (window.dashboardWeightChartInstance) {
+        window.dashboardWeightChartInstance.destroy();
+    }
+    
+    if (points.length === 0) {
         canvas.parentElement.innerHTML = '<p style="text-align: center; color: #999; padding: 40px;">Add data to see trend</p>';
         return;
     }
     
-    const labels = logsForChart.map(log => {
-        if (log.date) {
+    const labels = points.map(point => {
+        if (point.date) {
             try {
-                const date = new Date(log.date);
+                const date = new Date(point.date);
                 return date.toLocaleDateString('en-US', { month: 'short', day: 'numeric' });
             } catch (e) {
-                return log.date;
+                return point.date;
             }
         }
         return '';
     });
     
-    const weightData = logsForChart.map(log => {
-        const weight = log.fastedWeight || log.fasted_weight;
-        return weight ? parseFloat(weight) : null;
-    });
+    const weightData = points.map(point => point.value);
     
     window.dashboardWeightChartInstance = new Chart(canvas, {
         type: 'line',
@@ -1173,7 +1229,55 @@ function filterLogsByTimeframe(logs, timeframe) {
     return logs.slice(-numDays);
 }
 
-function renderWeightChart(dailyLogs = [], baseline = {}) {
+// Chart metrics -> /api/series metric names; the server downsamples each to WEIGHT_CHART_POINTS
+const WEIGHT_CHART_SERIES = { weight: 'fastedWeight', waist: 'waist', protein: 'protein' };
+const WEIGHT_CHART_POINTS = 200;
+let weightChartRequest = 0;
+
+async function loadChartRows(metrics, timeframe, points) {
+    // Downsampled series per metric, merged by date: [{date, day, values: {metric: value}}]
+    try {
+        const responses = await Promise.all(metrics.map(metric =>
+            fetch(`/api/series/${WEIGHT_CHART_SERIES[metric]}?timeframe=${timeframe}&points=${points}`)
+        ));
+        if (responses.some(response => !response.ok)) return null;
+        const payloads = await Promise.all(responses.map(response => response.json()));
+        
+        const rows = new Map();
+        payloads.forEach((payload, i) => {
+            for (const point of payload.series || []) {
+                if (!rows.has(point.date)) {
+                    rows.set(point.date, { date: point.date, day: point.day, values: {} });
+                }
+                rows.get(point.date).values[metrics[i]] = point.value;
+            }
+        });
+        return Array.from(rows.values()).sort((a, b) => a.date.localeCompare(b.date));
+    } catch (error) {
+        console.log('Series API not available, using loaded logs');
+        return null;
+    }
+}
+
+function logChartRows(logs) {
+    // Same rows from the loaded logs, when the series API can't be reached
+    return logs.map(log => {
+        const waist = parseNumber(log?.waist);
+        const totals = getDailyTotals(log);
+        return {
+            date: log.date,
+            day: log.day,
+            date_display: log.date_display,
+            values: {
+                weight: parseWeight(log?.fastedWeight ?? log?.fasted_weight),
+                waist: waist > 0 ? waist : null,
+                protein: totals.protein > 0 ? totals.protein : null
+            }
+        };
+    });
+}
+
+async function renderWeightChart(dailyLogs = [], baseline = {}) {
     const canvas = document.getElementById('weightChart');
     if (!canvas) return;
     
@@ -1181,47 +1285,69 @@ function renderWeightChart(dailyLogs = [], baseline = {}) {
     window.chartState.allLogs = dailyLogs;
     window.chartState.baseline = baseline;
     
+    const enabled = Object.keys(WEIGHT_CHART_SERIES).filter(metric => window.chartState.enabledMetrics[metric]);
+    if (enabled.length === 0) {
+        if (window.weightChartInstance) {
+            window.weightChartInstance.destroy();
+        }
+        canvas.parentElement.innerHTML = '<p style="text-align: center; color: #999; padding: 40px; font-size: 14px;">Enable at least one metric to view</p>';
+        return;
+    }
+    
+    // Downsampled series from the server; fall back to the loaded logs
+    const request = ++weightChartRequest;
+    const timeframe = window.chartState.timeframe;
+    let rows = await loadChartRows(enabled, timeframe, WEIGHT_CHART_POINTS);
+    if (!rows) {
+        rows = logChartRows(filterLogsByTimeframe(dailyLogs, timeframe));
+    }
+    
+    // A newer timeframe or metric toggle was picked while this one was loading
+    if (request !== weightChartRequest) return;
+    
     // Destroy existing chart if it exists
     if (window.weightChartInstance) {
         window.weightChartInstance.destroy();
     }
     
-    // Filter logs based on timeframe
-    const logsForChart = filterLogsByTimeframe(dailyLogs, window.chartState.timeframe);
-    
-    if (logsForChart.length === 0) {
+    if (rows.length === 0) {
         canvas.parentElement.innerHTML = '<p style="text-align: center; color: #999; padding: 40px; font-size: 14px;">Add data to see trend</p>';
         return;
     }
     
+    // Logs by date, for the tooltip details of each plotted day
+    const logsByDate = new Map(dailyLogs.map(log => [log.date, log]));
+    
     // Create labels with full date info
-    const labels = logsForChart.map(log => {
-        if (log.day) return `Day ${log.day}`;
-        if (log.date_display) return log.date_display;
-        if (log.date) {
+    const labels = rows.map(row => {
+        if (row.day) return `Day ${row.day}`;
+        if (row.date_display) return row.date_display;
+        if (row.date) {
             try {
-                const date = new Date(log.date);
+                const date = new Date(row.date);
                 return date.toLocaleDateString('en-US', { month: 'short', day: 'numeric' });
             } catch (e) {
-                return log.date;
+                return row.date;
             }
         }
         return '';
     });
     
+    const metricData = metric => rows.map(row => row.values[metric] ?? null);
+    
     // Build datasets based on enabled metrics
     const datasets = [];
     
     if (window.chartState.enabledMetrics.weight) {
-        const weightData = logsForChart.map(log => parseWeight(log?.fastedWeight ?? log?.fasted_weight));
         datasets.push({
             label: 'Weight (kg)',
-            data: weightData,
+            data: metricData('weight'),
             borderColor: '#0066ff',
             backgroundColor: 'rgba(0, 102, 255, 0.15)',
             borderWidth: 3,
             tension: 0.4,
             fill: true,
+            spanGaps: true,
             pointRadius: 4,
             pointHoverRadius: 8,
             pointBackgroundColor: '#0066ff',
@@ -1233,18 +1359,15 @@ function renderWeightChart(dailyLogs = [], baseline = {}) {
     }
     
     if (window.chartState.enabledMetrics.waist) {
-        const waistData = logsForChart.map(log => {
-            const waist = parseNumber(log?.waist);
-            return waist > 0 ? waist : null;
-        });
         datasets.push({
             label: 'Waist (cm)',
-            data: waistData,
+            data: metricData('waist'),
             borderColor: '#00a3ff',
             backgroundColor: 'rgba(0, 163, 255, 0.15)',
             borderWidth: 2.5,
             tension: 0.4,
             fill: true,
+            spanGaps: true,
             pointRadius: 4,
             pointHoverRadius: 8,
             pointBackgroundColor: '#00a3ff',
@@ -1256,18 +1379,15 @@ function renderWeightChart(dailyLogs = [], baseline = {}) {
     }
     
     if (window.chartState.enabledMetrics.protein) {
-        const proteinData = logsForChart.map(log => {
-            const totals = getDailyTotals(log);
-            return totals.protein > 0 ? totals.protein : null;
-        });
         datasets.push({
             label: 'Protein (g)',
-            data: proteinData,
+            data: metricData('protein'),
             borderColor: '#ff6b00',
             backgroundColor: 'rgba(255, 107, 0, 0.15)',
             borderWidth: 2.5,
             tension: 0.4,
             fill: false,
+            spanGaps: true,
             pointRadius: 4,
             pointHoverRadius: 8,
             pointBackgroundColor: '#ff6b00',
@@ -1287,7 +1407,7 @@ function renderWeightChart(dailyLogs = [], baseline = {}) {
         if (baselineWeight !== null && !isNaN(baselineWeight)) {
             datasets.push({
                 label: 'Baseline Weight',
-                data: new Array(logsForChart.length).fill(baselineWeight),
+                data: new Array(rows.length).fill(baselineWeight),
                 borderColor: 'rgba(150, 150, 150, 0.6)',
                 borderWidth: 1.5,
                 borderDash: [8, 4],
@@ -1300,11 +1420,6 @@ function renderWeightChart(dailyLogs = [], baseline = {}) {
         }
     }
     
-    if (datasets.length === 0) {
-        canvas.parentElement.innerHTML = '<p style="text-align: center; color: #999; padding: 40px; font-size: 14px;">Enable at least one metric to view</p>';
-        return;
-    }
-    
     window.weightChartInstance = new Chart(canvas, {
         type: 'line',
         data: {
@@ -1351,10 +1466,10 @@ function renderWeightChart(dailyLogs = [], baseline = {}) {
                     callbacks: {
                         title: function(context) {
                             const idx = context[0].dataIndex;
-                            const log = logsForChart[idx];
-                            if (log?.date) {
+                            const row = rows[idx];
+                            if (row?.date) {
                                 try {
-                                    const date = new Date(log.date);
+                                    const date = new Date(row.date);
                                     return date.toLocaleDateString('en-US', { 
                                         weekday: 'short', 
                                         month: 'short', 
@@ -1362,7 +1477,7 @@ function renderWeightChart(dailyLogs = [], baseline = {}) {
                                         year: 'numeric'
                                     });
                                 } catch (e) {
-                                    return log.date;
+                                    return row.date;
                                 }
                             }
                             return labels[idx] || `Day ${idx + 1}`;
@@ -1381,7 +1496,7 @@ function renderWeightChart(dailyLogs = [], baseline = {}) {
                         },
                         afterBody: function(context) {
                             const idx = context[0].dataIndex;
-                            const log = logsForChart[idx];
+                            const log = logsByDate.get(rows[idx]?.date);
                             if (!log) return [];
                             
                             const extras = [];
@@ -1760,26 +1875,25 @@ function formatMetricValue(value, unit = '', decimals = 1) {
 
 // Progress chart rendering (COMMENTED OUT - may add later)
 /*
-function renderProgressChart(dailyLogs) {
+async function renderProgressChart(dailyLogs) {
     const ctx = document.getElementById('progressChart');
     if (!ctx) return;
     
+    // Downsampled series from the server, merged by date; fall back to the loaded logs
+    const rows = await loadChartRows(['weight', 'waist', 'protein'], 'all', WEIGHT_CHART_POINTS)
+        || logChartRows(dailyLogs);
+    
     // Destroy existing chart
     if (progressChart) {
         progressChart.destroy();
     }
     
-    const labels = dailyLogs.map(d => `Day ${d.day || d.date || ''}`);
-    const weights = dailyLogs.map(d => d.fastedWeight || null);
-    const waists = dailyLogs.map(d => d.waist || null);
-    const proteins = dailyLogs.map(d => d.protein || null);
-    
     // Filter out null values
-    const validData = labels.map((label, i) => ({
-        label,
-        weight: weights[i],
-        waist: waists[i],
-        protein: proteins[i]
+    const validData = rows.map(row => ({
+        label: `Day ${row.day || row.date || ''}`,
+        weight: row.values.weight ?? null,
+        waist: row.values.waist ?? null,
+        protein: row.values.protein ?? null
     })).filter(d => d.weight !== null || d.waist !== null || d.protein !== null);
     
     if (validData.length === 0) {
@@ -2474,21 +2588,21 @@ function toggleWeightGraph() {
 
 async function loadBodyScanRings() {
     try {
-        const response = await fetch('/api/body-scans');
-        if (!response.ok) {
+        // Only the two scans being compared, not the whole history (404 = no scans yet)
+        const response = await fetch('/api/body-scans/compare?a=first&b=latest');
+        if (!response.ok && response.status !== 404) {
             throw new Error(`HTTP error! status: ${response.status}`);
         }
-        const data = await response.json();
-        const scans = data.scans || [];
+        const data = response.ok ? await response.json() : { total: 0 };
         
-        if (scans.length < 2) {
+        if ((data.total || 0) < 2) {
             document.getElementById('dashboardRingsContainer').innerHTML = 
                 '<div class="info-state" style="grid-column: 1 / -1; padding: 1rem; text-align: center; color: #6b7280; font-size: 0.85rem;">Need at least 2 scans to show progress</div>';
             return;
         }
         
-        const baseline = scans[0];
-        const latest = scans[scans.length - 1];
+        const baseline = data.a;
+        const latest = data.b;
         
         if (!baseline || !latest) {
             return;
@@ -3,13 +3,19 @@
 let trainingData = [];
 let exerciseGroups = {};
 let exercisesByCategory = {};
+let exerciseProgressions = {}; // server-computed next weight, best e1RM and chart series per exercise
 let currentFilterCategory = null;
 let currentView = 'progression'; // 'progression' or 'day'
 let availableDates = [];
+// ?exercise= / ?category= on the page URL: load only that slice of /api/training
+let trainingScope = scopeFromUrl();
 
 // Load training data on page load
 document.addEventListener('DOMContentLoaded', async () => {
     await loadTrainingData();
+    if (trainingScope) {
+        document.getElementById('showAllBtn').style.display = 'inline-block';
+    }
     extractAvailableDates();
     setupDatePicker();
     renderExerciseProgression();
@@ -78,9 +84,37 @@ function filterExercisesByCategory(category) {
     });
 }
 
-function showAllExercises() {
+function scopeFromUrl() {
+    const params = new URLSearchParams(window.location.search);
+    for (const key of ['exercise', 'category']) {
+        const value = (params.get(key) || '').trim();
+        if (value) {
+            return { key, value };
+        }
+    }
+    return null;
+}
+
+function trainingUrl() {
+    if (!trainingScope) {
+        return '/api/training';
+    }
+    return `/api/training?${trainingScope.key}=${encodeURIComponent(trainingScope.value)}`;
+}
+
+async function showAllExercises() {
     currentFilterCategory = null;
     
+    if (trainingScope) {
+        // The page was opened for one exercise or category; load everything now
+        trainingScope = null;
+        history.replaceState(null, '', window.location.pathname);
+        await loadTrainingData();
+        extractAvailableDates();
+        setupDatePicker();
+        renderExerciseProgression();
+    }
+    
     // Remove active state from body regions
     document.querySelectorAll('.body-region').forEach(r => {
         r.classList.remove('active');
@@ -109,8 +143,10 @@ function showAllExercises() {
 }
 
 async function loadTrainingData() {
+    // Scoped pages fetch the filtered endpoint instead of filtering the full payload
+
     try {
-        const response = await fetch('/api/training');
+        const response = await fetch(trainingUrl());
         const data = await response.json();
         
         if (data.error) {
@@ -122,6 +158,7 @@ async function loadTrainingData() {
         trainingData = data.training_data || [];
         exerciseGroups = data.exercise_groups || {};
         exercisesByCategory = data.exercises_by_category || {};
+        exerciseProgressions = data.progressions || {};
         
         console.log('Loaded training data:', {
             sessions: trainingData.length,
@@ -431,6 +468,36 @@ function navigateDate(direction) {
     handleDateChange();
 }
 
+// Full day payloads by date, filled by prefetchDays
+const dayViewCache = {};
+const DAY_PREFETCH_RADIUS = 3;
+
+async function prefetchDays(date) {
+    // availableDates is most recent first
+    const index = availableDates.indexOf(date);
+    if (index === -1) return;
+    const neighbours = availableDates.slice(
+        Math.max(0, index - DAY_PREFETCH_RADIUS),
+        index + DAY_PREFETCH_RADIUS + 1
+    );
+    if (neighbours.every(d => dayViewCache[d])) return;
+    
+    try {
+        const from = neighbours[neighbours.length - 1];
+        const to = neighbours[0];
+        const response = await fetch(`/api/days?from=${from}&to=${to}`);
+        if (!response.ok) return;
+        const data = await response.json();
+        (data.days || []).forEach(day => {
+            if (day.date) {
+                dayViewCache[day.date] = day;
+            }
+        });
+    } catch (error) {
+        console.log('Day prefetch failed:', error);
+    }
+}
+
 async function loadDayView() {
     const datePicker = document.getElementById('workoutDatePicker');
     if (!datePicker) return;
@@ -449,12 +516,18 @@ async function loadDayView() {
         }
     });
     
-    // Try to load full day data from API
+    // Try to load full day data from API (neighbouring days are prefetched)
     try {
-        const response = await fetch(`/api/day/${selectedDate}`);
-        if (response.ok) {
-            const fullDayData = await response.json();
+        let fullDayData = dayViewCache[selectedDate];
+        if (!fullDayData) {
+            const response = await fetch(`/api/day/${selectedDate}`);
+            if (response.ok) {
+                fullDayData = await response.json();
+            }
+        }
+        if (fullDayData) {
             renderFullDayView(fullDayData);
+            prefetchDays(selectedDate);
             return;
         }
     } catch (error) {
@@ -899,7 +972,7 @@ function renderExerciseProgression() {
             html += `
                 <div class="exercise-card">
                     <div class="exercise-header">
-                        <h3 class="exercise-name">${escapeHtml(exerciseName)}</h3>
+                        <h3 class="exercise-name"><a href="/training?exercise=${encodeURIComponent(exerciseName)}">${escapeHtml(exerciseName)}</a></h3>
                         <span class="exercise-count">${sessions.length} session${sessions.length !== 1 ? 's' : ''}</span>
                     </div>
                     <div class="exercise-content">
@@ -1065,29 +1138,14 @@ function renderProgressionTable(exerciseName, sessions) {
     return tableHtml;
 }
 
+function progressionPoints(exerciseName) {
+    // Sessions with a top-set load, from the server-side progression summary
+    const progression = exerciseProgressions[exerciseName];
+    return progression ? progression.series.filter(point => point.weight.lbs) : [];
+}
+
 function renderProgressionChart(exerciseName, sessions) {
-    if (sessions.length < 2) {
-        return ''; // Need at least 2 data points for a chart
-    }
-    
-    // Get weights from sessions
-    const weights = sessions
-        .map(s => {
-            if (s.weight_lbs !== null && s.weight_lbs !== undefined && s.weight_lbs > 0) {
-                return s.weight_lbs;
-            }
-            // Try to get weight from working sets
-            if (s.sets_reps && s.sets_reps.length > 0) {
-                const workingSet = s.sets_reps.find(sr => sr.set === 'working' || sr.set === s.sets_reps.length);
-                if (workingSet && workingSet.weight_each_side_lbs) {
-                    return workingSet.weight_each_side_lbs * 2;
-                }
-            }
-            return null;
-        })
-        .filter(w => w !== null && w !== undefined && w > 0);
-    
-    if (weights.length < 2) {
+    if (progressionPoints(exerciseName).length < 2) {
         return ''; // Need at least 2 weights for a chart
     }
     
@@ -1148,45 +1206,12 @@ function createProgressionChart(chartId, canvas) {
     
     const exerciseName = exerciseCard.querySelector('.exercise-name').textContent;
     
-    // Find sessions for this exercise
-    const sessions = exerciseGroups[exerciseName];
-    if (!sessions || sessions.length < 2) return;
-    
-    // Prepare data
-    const labels = [];
-    const weightData = [];
-    const dates = [];
-    
-    for (const session of sessions) {
-        const date = new Date(session.date);
-        dates.push(date);
-        labels.push(`Day ${session.day}`);
-        
-        // Get weight
-        let weight = null;
-        if (session.weight_lbs !== null && session.weight_lbs !== undefined && session.weight_lbs > 0) {
-            weight = session.weight_lbs;
-        } else if (session.sets_reps && session.sets_reps.length > 0) {
-            const workingSet = session.sets_reps.find(sr => sr.set === 'working' || sr.set === session.sets_reps.length);
-            if (workingSet && workingSet.weight_each_side_lbs) {
-                weight = workingSet.weight_each_side_lbs * 2;
-            }
-        }
-        
-        weightData.push(weight);
-    }
-    
-    // Filter out null values but keep labels aligned
-    const filteredData = [];
-    const filteredLabels = [];
-    for (let i = 0; i < weightData.length; i++) {
-        if (weightData[i] !== null && weightData[i] !== undefined) {
-            filteredData.push(weightData[i]);
-            filteredLabels.push(labels[i]);
-        }
-    }
+    // Top-set load per session, computed server-side
+    const points = progressionPoints(exerciseName);
+    if (points.length < 2) return;
     
-    if (filteredData.length < 2) return;
+    const filteredData = points.map(point => point.weight.lbs);
+    const filteredLabels = points.map(point => `Day ${point.day}`);
     
     // Create chart
     const ctx = canvas.getContext('2d');
@@ -1230,10 +1255,11 @@ function createProgressionChart(chartId, canvas) {
                     },
                     callbacks: {
                         label: function(context) {
-                            const session = sessions[context.dataIndex];
-                            const date = new Date(session.date);
+                            const point = points[context.dataIndex];
+                            const date = new Date(point.date);
                             const dateStr = date.toLocaleDateString('en-US', { month: 'short', day: 'numeric' });
-                            return `${dateStr}: ${context.parsed.y.toFixed(1)} lbs`;
+                            const e1rm = point.e1rm.lbs ? ` (e1RM ${point.e1rm.lbs.toFixed(1)} lbs)` : '';
+                            return `${dateStr}: ${context.parsed.y.toFixed(1)} lbs${e1rm}`;
                         }
                     }
                 }
@@ -1276,81 +1302,24 @@ function renderNextWeightSuggestion(exerciseName, sessions) {
         return '<div class="next-weight-suggestion"><p>Need at least 2 sessions to suggest progression</p></div>';
     }
     
-    // Get weights from sessions (filter out null/undefined)
-    // Use weight_lbs if available, otherwise try to extract from sets
-    const weights = sessions
-        .map(s => {
-            if (s.weight_lbs !== null && s.weight_lbs !== undefined && s.weight_lbs > 0) {
-                return s.weight_lbs;
-            }
-            // Try to get weight from working sets
-            if (s.sets_reps && s.sets_reps.length > 0) {
-                const workingSet = s.sets_reps.find(sr => sr.set === 'working' || sr.set === s.sets_reps.length);
-                if (workingSet && workingSet.weight_each_side_lbs) {
-                    return workingSet.weight_each_side_lbs * 2;
-                }
-            }
-            return null;
-        })
-        .filter(w => w !== null && w !== undefined && w > 0);
-    
-    if (weights.length < 2) {
+    // Suggestion is computed server-side and comes with /api/training
+    const progression = exerciseProgressions[exerciseName];
+    const next = progression ? progression.next_weight : null;
+    if (!next || next.basis === 'insufficient_data') {
         return '<div class="next-weight-suggestion"><p>Need weight data to suggest progression</p></div>';
     }
     
-    // Calculate progression
-    const latestWeight = weights[weights.length - 1];
-    const previousWeight = weights[weights.length - 2];
-    const weightDiff = latestWeight - previousWeight;
-    
-    // Get latest sets/reps to determine if we should increase weight
-    const latestSession = sessions[sessions.length - 1];
-    const latestSetsReps = latestSession.sets_reps || [];
-    
-    // Calculate average reps from latest session
-    let avgReps = 0;
-    if (latestSetsReps.length > 0) {
-        const reps = latestSetsReps.map(sr => sr.reps || 0).filter(r => r > 0);
-        if (reps.length > 0) {
-            avgReps = reps.reduce((a, b) => a + b, 0) / reps.length;
-        }
-    }
-    
-    // Suggest next weight based on progression pattern
-    let suggestedWeight = latestWeight;
-    let suggestion = '';
-    
-    if (weightDiff > 0) {
-        // Progressive overload detected - suggest continuing the pattern
-        suggestedWeight = latestWeight + weightDiff;
-        suggestion = `Based on your progression (+${weightDiff} lbs), try <strong>${suggestedWeight} lbs</strong> next session.`;
-    } else if (weightDiff === 0 && avgReps >= 8) {
-        // Same weight, good reps - suggest small increase
-        suggestedWeight = latestWeight + 5; // Conservative 5lb increase
-        suggestion = `You've been hitting ${Math.round(avgReps)} reps consistently. Try <strong>${suggestedWeight} lbs</strong> for progressive overload.`;
-    } else if (weightDiff < 0) {
-        // Weight decreased - suggest returning to previous or maintaining
-        suggestedWeight = latestWeight;
-        suggestion = `Weight decreased last session. Maintain <strong>${suggestedWeight} lbs</strong> and focus on form/volume.`;
-    } else {
-        // No clear pattern - conservative suggestion
-        suggestedWeight = latestWeight + 2.5;
-        suggestion = `Try a small increase to <strong>${suggestedWeight} lbs</strong> if you're hitting 8+ reps consistently.`;
-    }
-    
-    // Check if using each-side format
-    let displayWeight = suggestedWeight;
-    if (latestSession.weight_each_side_lbs) {
-        displayWeight = `${suggestedWeight / 2} lbs each side (${suggestedWeight} lbs total)`;
-    } else {
-        displayWeight = `${suggestedWeight} lbs`;
-    }
-    
+    const unit = next.unit;
+    const total = next.weight[unit];
+    const eachSide = next.each_side[unit];
+    const displayWeight = eachSide !== null
+        ? `${eachSide} ${unit} each side (${total} ${unit} total)`
+        : `${total} ${unit}`;
     return `
         <div class="next-weight-suggestion">
             <h4>💡 Next Weight Suggestion</h4>
             <p class="next-weight-value">${displayWeight}</p>
-            <p>${suggestion}</p>
+            <p>${escapeHtml(next.message)}</p>
         </div>
     `;
 }
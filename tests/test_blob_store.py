@@ -0,0 +1,226 @@
+"""
+Blob client (blob_store.py) against the local stand-in (fake_blob_server.py):
+streamed PUTs, multipart assembly, the duplicate short-circuit, size limits
+and direct browser uploads.
+"""
+
+import hashlib
+import io
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import blob_store
+import fake_blob_server
+
+TOKEN = 'test-read-write-token'
+
+
+class Stream:
+    """A non-seekable body, like a request socket"""
+
+    def __init__(self, data: bytes):
+        self._buffer = io.BytesIO(data)
+        self.reads = 0
+
+    def read(self, size: int = -1) -> bytes:
+        self.reads += 1
+        return self._buffer.read(size)
+
+
+class RecordingFile:
+    """Wraps a spooled file to record the size of every read the HTTP client makes"""
+
+    def __init__(self, file):
+        self.file = file
+        self.reads = []
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.file.read(size)
+        self.reads.append(len(data))
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+@pytest.fixture
+def fake_blob(monkeypatch):
+    server = fake_blob_server.serve(0, TOKEN)
+    host, port = server.server_address
+    monkeypatch.setenv('BLOB_API_URL', f'http://{host}:{port}')
+    try:
+        yield fake_blob_server.FakeBlobHandler.store
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def spooled(data: bytes) -> blob_store.SpooledUpload:
+    upload = blob_store.spool(Stream(data))
+    upload.file = RecordingFile(upload.file)
+    return upload
+
+
+def requests_for(fake, action):
+    return [request for request in fake.requests if request['action'] == action]
+
+
+def test_client_follows_blob_api_url(fake_blob, monkeypatch):
+    api_url = os.environ['BLOB_API_URL']
+    assert blob_store.BlobStore(TOKEN).api_url == api_url
+    assert blob_store.store(TOKEN).api_url == api_url
+
+    monkeypatch.setenv('BLOB_API_URL', 'http://127.0.0.1:9/')
+    assert blob_store.store(TOKEN).api_url == 'http://127.0.0.1:9'
+    assert blob_store.BlobStore(TOKEN, 'http://example.test/').api_url == 'http://example.test'
+
+
+def test_put_is_streamed_in_chunks(fake_blob):
+    data = os.urandom(3 * blob_store.READ_CHUNK + 100)
+    upload = spooled(data)
+    try:
+        result = blob_store.BlobStore(TOKEN).upload_photo(upload, 'front.jpg', 'image/jpeg')
+    finally:
+        upload.close()
+
+    assert not result['duplicate']
+    assert result['sha256'] == hashlib.sha256(data).hexdigest()
+    # The body left the spool file in READ_CHUNK blocks, never as a whole
+    sent = [size for size in upload.file.reads if size]
+    assert sum(sent) == len(data)
+    assert len(sent) >= 4
+    assert max(sent) <= blob_store.READ_CHUNK
+
+    (put,) = requests_for(fake_blob, 'put')
+    assert put['size'] == len(data)
+    assert put['reads'] > 1
+    assert put['pathname'] == result['pathname']
+    assert put['pathname'].startswith(f"{blob_store.PHOTO_PREFIX}{result['sha256'][:20]}/")
+    assert fake_blob.blobs[put['pathname']][1] == data
+
+
+def test_large_upload_is_assembled_from_parts(fake_blob, monkeypatch):
+    monkeypatch.setattr(blob_store, 'PART_SIZE', 64 * 1024)
+    monkeypatch.setattr(blob_store, 'MULTIPART_THRESHOLD', 100 * 1024)
+    data = os.urandom(3 * 64 * 1024 + 5000)
+    upload = spooled(data)
+    try:
+        result = blob_store.BlobStore(TOKEN).upload_photo(upload, 'side.png', 'image/png')
+    finally:
+        upload.close()
+
+    assert [request['action'] for request in fake_blob.requests if request['method'] == 'POST'] == [
+        'mpu-create', 'mpu-upload', 'mpu-upload', 'mpu-upload', 'mpu-upload', 'mpu-complete']
+    assert [part['size'] for part in requests_for(fake_blob, 'mpu-upload')] == [64 * 1024] * 3 + [5000]
+    assert not requests_for(fake_blob, 'put')
+
+    blob, body = fake_blob.blobs[result['pathname']]
+    assert hashlib.sha256(body).hexdigest() == result['sha256'] == hashlib.sha256(data).hexdigest()
+    assert blob['contentType'] == 'image/png'
+    assert max(size for size in upload.file.reads) <= blob_store.READ_CHUNK
+
+
+def test_duplicate_is_not_uploaded_again(fake_blob):
+    data = os.urandom(10_000)
+    first_client = blob_store.BlobStore(TOKEN)
+    upload = spooled(data)
+    first = first_client.upload_photo(upload, 'back.jpg', 'image/jpeg')
+    upload.close()
+
+    # Another process: found with one prefix listing, no second PUT
+    upload = spooled(data)
+    again = blob_store.BlobStore(TOKEN).upload_photo(upload, 'back-again.jpg', 'image/jpeg')
+    upload.close()
+    assert again['duplicate']
+    assert again['url'] == first['url']
+    assert len(requests_for(fake_blob, 'put')) == 1
+    assert upload.file.reads == []
+
+    # Same process: the client remembers it and doesn't even list
+    listings = len(requests_for(fake_blob, 'list'))
+    upload = spooled(data)
+    cached = first_client.upload_photo(upload, 'back.jpg', 'image/jpeg')
+    upload.close()
+    assert cached['duplicate']
+    assert cached['url'] == first['url']
+    assert len(requests_for(fake_blob, 'list')) == listings
+    assert len(requests_for(fake_blob, 'put')) == 1
+
+
+def test_oversize_upload_is_rejected_while_spooling():
+    stream = Stream(b'x' * 5000)
+    with pytest.raises(blob_store.UploadTooLarge):
+        blob_store.spool(stream, max_bytes=4096)
+    # Stopped at the first chunk past the limit
+    assert stream.reads == 1
+
+    # A declared length over the limit is refused before reading anything
+    stream = Stream(b'x' * 5000)
+    with pytest.raises(blob_store.UploadTooLarge):
+        blob_store.spool(stream, max_bytes=4096, length=5000)
+    assert stream.reads == 0
+
+
+def test_oversize_photo_upload_returns_413(fake_blob, monkeypatch):
+    monkeypatch.setenv('BLOB_READ_WRITE_TOKEN', TOKEN)
+    monkeypatch.setattr(blob_store, 'MAX_UPLOAD_BYTES', 4096)
+    import app
+
+    response = app.app.test_client().post(
+        '/api/upload-photo',
+        data={'photo': (io.BytesIO(os.urandom(3 * blob_store.READ_CHUNK)), 'big.jpg', 'image/jpeg')},
+        content_type='multipart/form-data',
+    )
+    assert response.status_code == 413
+    assert response.get_json()['success'] is False
+    assert not requests_for(fake_blob, 'put')
+
+
+def upload_completed(blob: dict, grant: dict) -> bytes:
+    """The callback Blob (and fake_blob_server) posts after a direct upload"""
+    claims = blob_store.read_client_token(TOKEN, grant['token'])
+    return json.dumps({'type': blob_store.UPLOAD_COMPLETED, 'payload': {
+        'blob': blob, 'tokenPayload': claims['onUploadCompleted']['tokenPayload']}}).encode()
+
+
+def test_direct_upload_cannot_claim_another_photos_hash(fake_blob):
+    photo = os.urandom(10_000)
+    claimed = hashlib.sha256(photo).hexdigest()
+    client = blob_store.BlobStore(TOKEN)
+
+    # A browser declares the hash of a photo that was never uploaded, then sends other bytes
+    grant = client.grant_upload('fake.jpg', 'image/jpeg', 100, sha256=claimed, callback_url='http://app.test/cb')
+    assert not grant['duplicate']
+    assert grant['pathname'].startswith(blob_store.DIRECT_PREFIX)
+    assert not grant['pathname'].startswith(f"{blob_store.PHOTO_PREFIX}{claimed[:20]}/")
+    blob = fake_blob.put(grant['pathname'], b'y' * 100, 'image/jpeg', os.environ['BLOB_API_URL'])
+    body = upload_completed(blob, grant)
+    completed = client.complete_upload(body, blob_store.signature(TOKEN, body))
+    assert completed['sha256'] is None
+    assert completed['size'] == 100
+
+    # The real photo is still uploaded, not short-circuited to the other blob
+    upload = spooled(photo)
+    result = client.upload_photo(upload, 'real.jpg', 'image/jpeg')
+    upload.close()
+    assert not result['duplicate']
+    assert result['pathname'].startswith(f"{blob_store.PHOTO_PREFIX}{claimed[:20]}/")
+    assert fake_blob.blobs[result['pathname']][1] == photo
+
+
+def test_direct_upload_of_stored_photo_is_a_duplicate(fake_blob):
+    photo = os.urandom(10_000)
+    upload = spooled(photo)
+    stored = blob_store.BlobStore(TOKEN).upload_photo(upload, 'front.jpg', 'image/jpeg')
+    upload.close()
+
+    grant = blob_store.BlobStore(TOKEN).grant_upload('front.jpg', 'image/jpeg', len(photo),
+                                                     sha256=stored['sha256'])
+    assert grant['duplicate']
+    assert grant['url'] == stored['url']
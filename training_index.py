@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+Per-exercise progression index behind /api/training.
+
+Each day's training is parsed once at ingest into its `training_data` entry
+and one session per exercise, and the sessions are filed under their
+canonical exercise name (see exercise_catalog) in date order. When days are
+added, changed or removed only those days are re-parsed and their sessions
+moved in or out of the affected groups; unchanged days past the change just
+get renumbered copies of their sessions. The endpoint therefore only
+filters and serializes.
+
+An index is never modified once built: updated() returns a new one, copying
+only the groups, entries and sessions that changed, so a dataset snapshot
+serializing an older index is never disturbed by a later load.
+"""
+
+import itertools
+from bisect import bisect_left, insort_right
+from typing import Dict, List, Optional, Tuple
+
+import exercise_catalog
+import progression
+
+
+def training_entry(record) -> Optional[Dict]:
+    """The `training_data` entry for a DayRecord, or None when it has no training"""
+    training = record.training
+    if not training:
+        return None
+    
+    # Handle both string and object formats
+    if isinstance(training, str):
+        # Simple string format - try to extract basic info
+        return {
+            'date': record.date,
+            'day': record.day,
+            'type': 'string',
+            'content': training,
+            'exercises': []
+        }
+    if isinstance(training, dict):
+        # Structured format
+        exercises = []
+        for exercise_obj in training.get('workout', []):
+            if not isinstance(exercise_obj, dict):
+                continue
+            # Preserve all weight fields (both kg and lbs) for later processing
+            exercises.append({
+                'name': exercise_obj.get('exercise', ''),
+                'weight_each_side_lbs': exercise_obj.get('weight_each_side_lbs'),
+                'total_added_weight_lbs': exercise_obj.get('total_added_weight_lbs'),
+                'weight_each_side_kg': exercise_obj.get('weight_each_side_kg'),
+                'total_added_weight_kg': exercise_obj.get('total_added_weight_kg'),
+                'sets': exercise_obj.get('sets', []),
+                'notes': exercise_obj.get('notes', '')
+            })
+        return {
+            'date': record.date,
+            'day': record.day,
+            'type': 'structured',
+            'session': training.get('session', ''),
+            'exercises': exercises
+        }
+    return None
+
+
+def exercise_session(entry: Dict, ex: Dict) -> Dict:
+    """One exercise of a structured entry as a progression session (weights and sets)"""
+    # Extract weight info - keep kg as kg, lbs as lbs
+    weight = None
+    weight_each_side = None
+    weight_unit = None
+    weight_each_side_unit = None
+
+    # Check for lbs values first
+    if ex.get('total_added_weight_lbs'):
+        weight = ex['total_added_weight_lbs']
+        weight_unit = 'lbs'
+    elif ex.get('weight_each_side_lbs'):
+        weight_each_side = ex['weight_each_side_lbs']
+        weight_each_side_unit = 'lbs'
+        weight = ex['weight_each_side_lbs'] * 2  # Approximate total
+        weight_unit = 'lbs'
+
+    # Check for kg values - keep as kg (don't convert)
+    if weight is None:
+        if ex.get('total_added_weight_kg'):
+            weight = ex['total_added_weight_kg']
+            weight_unit = 'kg'
+        elif ex.get('weight_each_side_kg'):
+            weight_each_side = ex['weight_each_side_kg']
+            weight_each_side_unit = 'kg'
+            weight = ex['weight_each_side_kg'] * 2  # Approximate total
+            weight_unit = 'kg'
+
+    # Extract sets/reps - handle flexible structures
+    sets_reps = []
+    sets_data = ex.get('sets', [])
+
+    # Handle case where sets might be an integer (number of sets) instead of array
+    if isinstance(sets_data, int):
+        # If sets is just a number, create placeholder entries
+        for i in range(sets_data):
+            sets_reps.append({
+                'set': i + 1,
+                'reps': None,
+                'distance': None,
+                'weight_each_side_kg': None,
+                'weight_each_side_lbs': None
+            })
+    elif isinstance(sets_data, list):
+        # Normal case: sets is an array of set objects
+        # Track first set weight to propagate to subsequent sets if needed
+        first_set_weight_lbs = None
+        first_set_weight_kg = None
+        first_set_weight_each_side_lbs = None
+        first_set_weight_each_side_kg = None
+
+        for idx, s in enumerate(sets_data):
+            # Handle case where set item might be a dict or other structure
+            if isinstance(s, dict):
+                set_info = {
+                    'set': s.get('set', 0),
+                    'reps': s.get('reps'),
+                    'distance': s.get('distance'),
+                    'weight_each_side_lbs': s.get('weight_each_side_lbs'),
+                    'weight_each_side_kg': s.get('weight_each_side_kg'),
+                    'total_added_weight_lbs': s.get('total_added_weight_lbs'),
+                    'total_added_weight_kg': s.get('total_added_weight_kg')
+                }
+
+                # If first set, capture its weight
+                if idx == 0:
+                    first_set_weight_lbs = set_info['total_added_weight_lbs'] or set_info['weight_each_side_lbs']
+                    first_set_weight_kg = set_info['total_added_weight_kg'] or set_info['weight_each_side_kg']
+                    first_set_weight_each_side_lbs = set_info['weight_each_side_lbs']
+                    first_set_weight_each_side_kg = set_info['weight_each_side_kg']
+
+                # If set doesn't have weight, try to get from exercise level or first set
+                has_weight = (set_info['total_added_weight_lbs'] is not None and set_info['total_added_weight_lbs'] > 0) or \
+                            (set_info['total_added_weight_kg'] is not None and set_info['total_added_weight_kg'] > 0) or \
+                            (set_info['weight_each_side_lbs'] is not None and set_info['weight_each_side_lbs'] > 0) or \
+                            (set_info['weight_each_side_kg'] is not None and set_info['weight_each_side_kg'] > 0)
+
+                if not has_weight:
+                    # First try exercise level weight
+                    if ex.get('total_added_weight_lbs'):
+                        set_info['total_added_weight_lbs'] = ex['total_added_weight_lbs']
+                    elif ex.get('total_added_weight_kg'):
+                        set_info['total_added_weight_kg'] = ex['total_added_weight_kg']
+                    elif ex.get('weight_each_side_lbs'):
+                        set_info['weight_each_side_lbs'] = ex['weight_each_side_lbs']
+                    elif ex.get('weight_each_side_kg'):
+                        set_info['weight_each_side_kg'] = ex['weight_each_side_kg']
+                    # If still no weight, propagate from first set
+                    elif first_set_weight_lbs:
+                        set_info['total_added_weight_lbs'] = first_set_weight_lbs
+                    elif first_set_weight_kg:
+                        set_info['total_added_weight_kg'] = first_set_weight_kg
+                    elif first_set_weight_each_side_lbs:
+                        set_info['weight_each_side_lbs'] = first_set_weight_each_side_lbs
+                    elif first_set_weight_each_side_kg:
+                        set_info['weight_each_side_kg'] = first_set_weight_each_side_kg
+
+                sets_reps.append(set_info)
+            else:
+                # Fallback: treat as simple value
+                sets_reps.append({
+                    'set': len(sets_reps) + 1,
+                    'reps': s if isinstance(s, (int, float)) else None,
+                    'distance': None,
+                    'weight_each_side_kg': None,
+                    'weight_each_side_lbs': None
+                })
+
+    return {
+        'date': entry['date'],
+        'day': entry['day'],
+        'weight_lbs': weight if weight_unit == 'lbs' else None,
+        'weight_kg': weight if weight_unit == 'kg' else None,
+        'weight_each_side_lbs': weight_each_side if weight_each_side_unit == 'lbs' else None,
+        'weight_each_side_kg': weight_each_side if weight_each_side_unit == 'kg' else (ex.get('weight_each_side_kg')),
+        'total_added_weight_lbs': ex.get('total_added_weight_lbs'),
+        'total_added_weight_kg': ex.get('total_added_weight_kg'),
+        'sets_reps': sets_reps,
+        'notes': ex.get('notes', ''),
+        'original_name': ex['name']  # Keep original for reference
+    }
+
+
+class _TrainedDay:
+    """Parsed training of one DayRecord: its entry and (exercise, session) pairs"""
+
+    __slots__ = ('record', 'entry', 'sessions')
+
+    def __init__(self, record, catalog: 'exercise_catalog.ExerciseCatalog'):
+        self.record = record
+        self.entry = training_entry(record)
+        self.sessions: List[Tuple[str, Dict]] = []
+        if self.entry is None or self.entry['type'] != 'structured':
+            return
+        for ex in self.entry['exercises']:
+            if not ex['name']:
+                continue
+            name, _ = catalog.lookup(ex['name'], exercise_catalog.has_weight_each_side(ex))
+            self.sessions.append((name, exercise_session(self.entry, ex)))
+
+    @staticmethod
+    def key(record) -> Tuple[str, int]:
+        """Identifies a record's training across renumbered copies of the record"""
+        return record.date, id(record.training)
+
+    def renumbered(self, record) -> '_TrainedDay':
+        """This day's parsed training for a renumbered copy of its record (this day is left as is)"""
+        day = _TrainedDay.__new__(_TrainedDay)
+        day.record = record
+        day.entry = None if self.entry is None else {**self.entry, 'day': record.day}
+        day.sessions = [(name, {**session, 'day': record.day}) for name, session in self.sessions]
+        return day
+
+
+def _locate(sessions: List[Dict], session: Dict) -> int:
+    """Position of this very session object in a date-sorted group"""
+    i = bisect_left(sessions, session['date'], key=lambda s: s['date'])
+    while sessions[i] is not session:
+        i += 1
+    return i
+
+
+class TrainingIndex:
+    """Training entries in day order plus exercise -> date-sorted sessions"""
+
+    def __init__(self):
+        self._days: List[_TrainedDay] = []
+        self.catalog = None
+        self.training_data: List[Dict] = []
+        self.exercise_groups: Dict[str, List[Dict]] = {}
+        self.categories: Dict[str, str] = {}
+        # Set per exercise whenever its sessions change, to validate derived caches
+        self.revisions: Dict[str, int] = {}
+        # Shared by every index updated() from this one; entries are checked against revisions
+        self._revision_counter = itertools.count(1)
+        self._progressions: Dict[str, Tuple[int, Dict]] = {}
+
+    @property
+    def catalog_signature(self):
+        return self.catalog.signature if self.catalog is not None else None
+
+    def updated(self, records: List, first_changed: Optional[int],
+                catalog: Optional['exercise_catalog.ExerciseCatalog'] = None) -> 'TrainingIndex':
+        """Index with days from `first_changed` onwards re-indexed (None = nothing changed, self)
+
+        A different catalog (the alias table was edited) re-indexes every day.
+        """
+        catalog = catalog or exercise_catalog.catalog()
+        same_catalog = catalog is self.catalog
+        if not same_catalog:
+            first_changed = 0
+        if first_changed is None:
+            return self
+        groups = dict(self.exercise_groups) if same_catalog else {}
+        categories = dict(self.categories) if same_catalog else {}
+        tail = self._days[first_changed:] if same_catalog else []
+        reusable = {_TrainedDay.key(day.record): day for day in tail}
+        copied = set()
+
+        def group(name: str) -> List[Dict]:
+            if name not in copied:
+                groups[name] = list(groups.get(name, []))
+                copied.add(name)
+            return groups[name]
+
+        kept = {_TrainedDay.key(record) for record in records[first_changed:]}
+        for day in tail:
+            if _TrainedDay.key(day.record) in kept:
+                continue
+            for name, session in day.sessions:
+                sessions = group(name)
+                del sessions[_locate(sessions, session)]
+
+        days = self._days[:first_changed]
+        for record in records[first_changed:]:
+            day = reusable.get(_TrainedDay.key(record))
+            if day is None:
+                day = _TrainedDay(record, catalog)
+                for name, session in day.sessions:
+                    insort_right(group(name), session, key=lambda s: s['date'])
+                    categories.setdefault(name, catalog.categorize(name))
+            elif day.record is not record:
+                # Same training on a renumbered copy of the record
+                moved = day.renumbered(record)
+                for (name, session), (_, renumbered) in zip(day.sessions, moved.sessions):
+                    sessions = group(name)
+                    sessions[_locate(sessions, session)] = renumbered
+                day = moved
+            days.append(day)
+
+        index = TrainingIndex()
+        index._revision_counter = self._revision_counter
+        index._progressions = self._progressions
+        index.revisions = dict(self.revisions)
+        for name in copied:
+            index.revisions[name] = next(self._revision_counter)
+            if not groups.get(name):
+                groups.pop(name, None)
+                self._progressions.pop(name, None)
+        if not same_catalog:
+            categories = {name: catalog.categorize(name) for name in groups}
+        index._days = days
+        index.catalog = catalog
+        index.categories = categories
+        index.training_data = [day.entry for day in days if day.entry is not None]
+        index.exercise_groups = groups
+        return index
+
+    def find_exercise(self, name: str) -> Optional[str]:
+        """Canonical group name for an exercise query (case-insensitive, aliases resolved)"""
+        groups = self.exercise_groups
+        if name in groups:
+            return name
+        wanted = name.strip().lower()
+        for candidate in groups:
+            if candidate.lower() == wanted:
+                return candidate
+        if self.catalog is not None:
+            for dumbbells in (False, True):
+                canonical = self.catalog.normalize(name, dumbbells)
+                if canonical in groups:
+                    return canonical
+        return None
+
+    def progression(self, name: str) -> Dict:
+        """Progression payload of an exercise, recomputed only after its sessions change"""
+        revision = self.revisions.get(name)
+        cached = self._progressions.get(name)
+        if cached is not None and cached[0] == revision:
+            return cached[1]
+        result = progression.build_progression(
+            name, self.categories.get(name, 'Other'), self.exercise_groups.get(name, [])
+        )
+        self._progressions[name] = (revision, result)
+        return result
+
+    def exercises_by_category(self, names: Optional[List[str]] = None) -> Dict[str, List[Dict]]:
+        """{category: [{name, sessions}]} sorted by name, for all or the given exercises"""
+        groups = self.exercise_groups
+        order = self.catalog.category_order if self.catalog is not None else []
+        by_category = {category: [] for category in order}
+        for name in sorted(groups if names is None else names):
+            category = self.categories.get(name, 'Other')
+            if category in by_category:
+                by_category[category].append({'name': name, 'sessions': groups[name]})
+        return by_category